@@ -2,61 +2,179 @@
 Implementação de Árvore AVL
 """
 
+# Marca "valor ausente" em pop(), já que None é um valor válido
+_MISSING = object()
+
+def _is_sorted(keys):
+    """Indica se a sequência está em ordem não decrescente"""
+    return all(a <= b for a, b in zip(keys, keys[1:]))
+
 class AVLNode:
-    def __init__(self, key):
+    __slots__ = ('key', 'value', 'left', 'right', 'height', 'size')
+    
+    def __init__(self, key, value=None):
         self.key = key
+        self.value = value
         self.left = None
         self.right = None
         self.height = 1
+        self.size = 1
 
 class AVL:
-    def __init__(self):
+    def __init__(self, order_statistics=False, key=None):
+        """Com order_statistics=True cada nó mantém o tamanho da sua subárvore,
+        habilitando rank() e select() em O(log n). Com key=f os elementos são
+        ordenados por f(elemento), calculada só na inserção (ver keyed.py)."""
         self.root = None
         self.comparisons = 0
         self.rotations = 0
+        self.order_statistics = order_statistics
+        self._size = 0
+        # Observador opcional dos casos de rebalanceamento (ver metrics.py)
+        self.hooks = None
+        self.key = key
+        if key is not None:
+            from keyed import attach_key
+            attach_key(self, key)
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, order_statistics=False, key=None):
+        """Constrói uma árvore AVL perfeitamente balanceada em O(n), sem rotações.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        if key is not None:
+            tree = cls(order_statistics, key)
+            tree._load_items(iterable, assume_sorted)
+            return tree
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls(order_statistics)
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pela árvore balanceada das chaves já ordenadas"""
+        self.root = self._build_balanced(keys, 0, len(keys))
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi):
+        """Monta a subárvore de keys[lo:hi] com as alturas já corretas"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = AVLNode(keys[mid])
+        left = node.left = self._build_balanced(keys, lo, mid)
+        right = node.right = self._build_balanced(keys, mid + 1, hi)
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        node.size = hi - lo
+        return node
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
     
     def insert(self, key):
         """Insere um elemento na árvore AVL"""
-        self.root = self._insert_recursive(self.root, key)
+        self._insert_node(key)
     
-    def _insert_recursive(self, node, key):
-        if node is None:
-            return AVLNode(key)
-        
-        self.comparisons += 1
-        if key < node.key:
-            node.left = self._insert_recursive(node.left, key)
-        elif key > node.key:
-            node.right = self._insert_recursive(node.right, key)
-        else:
-            return node
-        
-        # Atualiza altura
-        node.height = 1 + max(self._get_height(node.left), 
-                              self._get_height(node.right))
-        
-        # Calcula fator de balanceamento
-        balance = self._get_balance(node)
-        
-        # Rotação à direita (Left-Left)
-        if balance > 1 and key < node.left.key:
-            return self._rotate_right(node)
+    def _insert_node(self, key):
+        """Insere a chave se ausente e retorna o seu nó (novo ou existente)"""
+        path = []
+        node = self.root
         
-        # Rotação à esquerda (Right-Right)
-        if balance < -1 and key > node.right.key:
-            return self._rotate_left(node)
+        # Descida iterativa guardando o caminho para o rebalanceamento
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                path.append(node)
+                node = node.left
+            elif key > node_key:
+                path.append(node)
+                node = node.right
+            else:
+                self.comparisons += comparisons
+                return node
+        self.comparisons += comparisons
         
-        # Rotação dupla esquerda-direita (Left-Right)
-        if balance > 1 and key > node.left.key:
-            node.left = self._rotate_left(node.left)
-            return self._rotate_right(node)
+        new_node = AVLNode(key)
+        self._size += 1
+        if not path:
+            self.root = new_node
+            return new_node
         
-        # Rotação dupla direita-esquerda (Right-Left)
-        if balance < -1 and key < node.right.key:
-            node.right = self._rotate_right(node.right)
-            return self._rotate_left(node)
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
         
-        return node
+        if self.order_statistics:
+            for node in path:
+                node.size += 1
+        self._rebalance_insert(path, key)
+        return new_node
+    
+    def _rebalance_insert(self, path, key):
+        """Sobe pela pilha do caminho atualizando alturas e rotacionando"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            left = node.left
+            right = node.right
+            left_height = left.height if left is not None else 0
+            right_height = right.height if right is not None else 0
+            new_height = 1 + (left_height if left_height > right_height else right_height)
+            
+            balance = left_height - right_height
+            if balance > 1:
+                if key < left.key:
+                    # Rotação à direita (Left-Left)
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('insert_LL')
+                    subtree = self._rotate_right(node)
+                else:
+                    # Rotação dupla esquerda-direita (Left-Right)
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('insert_LR')
+                    node.left = self._rotate_left(left)
+                    subtree = self._rotate_right(node)
+            elif balance < -1:
+                if key > right.key:
+                    # Rotação à esquerda (Right-Right)
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('insert_RR')
+                    subtree = self._rotate_left(node)
+                else:
+                    # Rotação dupla direita-esquerda (Right-Left)
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('insert_RL')
+                    node.right = self._rotate_right(right)
+                    subtree = self._rotate_left(node)
+            else:
+                if new_height == node.height:
+                    # Altura inalterada: ancestrais não mudam
+                    return
+                node.height = new_height
+                continue
+            
+            # Após uma rotação na inserção a subárvore volta à altura original
+            self._replace_child(path, i, node, subtree)
+            return
+    
+    def _replace_child(self, path, i, old, new):
+        """Liga a nova raiz de subárvore ao pai registrado na pilha"""
+        if i == 0:
+            self.root = new
+        else:
+            parent = path[i - 1]
+            if parent.left is old:
+                parent.left = new
+            else:
+                parent.right = new
     
     def _rotate_left(self, z):
         """Rotação simples à esquerda"""
@@ -67,10 +185,16 @@ class AVL:
         y.left = z
         z.right = T2
         
-        z.height = 1 + max(self._get_height(z.left), 
-                           self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), 
-                           self._get_height(y.right))
+        # Alturas lidas diretamente (sem _get_height) no caminho crítico
+        left_height = z.left.height if z.left is not None else 0
+        right_height = T2.height if T2 is not None else 0
+        z_height = z.height = 1 + (left_height if left_height > right_height else right_height)
+        right_height = y.right.height if y.right is not None else 0
+        y.height = 1 + (z_height if z_height > right_height else right_height)
+        
+        if self.order_statistics:
+            y.size = z.size
+            z.size = 1 + (z.left.size if z.left is not None else 0) + (T2.size if T2 is not None else 0)
         
         return y
     
@@ -83,10 +207,15 @@ class AVL:
         y.right = z
         z.left = T3
         
-        z.height = 1 + max(self._get_height(z.left), 
-                           self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), 
-                           self._get_height(y.right))
+        left_height = T3.height if T3 is not None else 0
+        right_height = z.right.height if z.right is not None else 0
+        z_height = z.height = 1 + (left_height if left_height > right_height else right_height)
+        left_height = y.left.height if y.left is not None else 0
+        y.height = 1 + (left_height if left_height > z_height else z_height)
+        
+        if self.order_statistics:
+            y.size = z.size
+            z.size = 1 + (T3.size if T3 is not None else 0) + (z.right.size if z.right is not None else 0)
         
         return y
 
@@ -105,120 +234,524 @@ class AVL:
     
     def search(self, key):
         """Busca um elemento na árvore"""
-        return self._search_recursive(self.root, key)
-    
-    def _search_recursive(self, node, key):
-        if node is None:
-            return False
-        
-        self.comparisons += 1
-        if key == node.key:
-            return True
-        elif key < node.key:
-            return self._search_recursive(node.left, key)
-        else:
-            return self._search_recursive(node.right, key)
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key == node_key:
+                self.comparisons += comparisons
+                return True
+            elif key < node_key:
+                node = node.left
+            else:
+                node = node.right
+        self.comparisons += comparisons
+        return False
     
     def remove(self, key):
         """Remove um elemento da árvore"""
-        self.root = self._remove_recursive(self.root, key)
+        self._remove_node(key)
     
-    def _remove_recursive(self, node, key):
+    def _remove_node(self, key):
+        """Remove a chave e retorna o valor que ela guardava (_MISSING se ausente)"""
+        path = []
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                path.append(node)
+                node = node.left
+            elif key > node_key:
+                path.append(node)
+                node = node.right
+            else:
+                break
+        self.comparisons += comparisons
+        
         if node is None:
-            return None
+            return _MISSING
+        self._size -= 1
+        value = node.value
         
-        self.comparisons += 1
-        if key < node.key:
-            node.left = self._remove_recursive(node.left, key)
-        elif key > node.key:
-            node.right = self._remove_recursive(node.right, key)
+        if node.left is not None and node.right is not None:
+            # Nó com dois filhos: copia o sucessor e o remove da subárvore direita
+            path.append(node)
+            succ = node.right
+            comparisons = 1
+            while succ.left is not None:
+                path.append(succ)
+                succ = succ.left
+                comparisons += 1
+            self.comparisons += comparisons
+            node.key = succ.key
+            node.value = succ.value
+            removed = succ
+            child = succ.right
         else:
-            # Nó encontrado
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
-            
-            # Nó com dois filhos
-            min_node = self._find_min(node.right)
-            node.key = min_node.key
-            node.right = self._remove_recursive(node.right, min_node.key)
+            removed = node
+            child = node.left if node.left is not None else node.right
         
-        if node is None:
-            return None
+        if not path:
+            self.root = child
+            return value
         
-        # Atualiza altura
-        node.height = 1 + max(self._get_height(node.left), 
-                              self._get_height(node.right))
+        parent = path[-1]
+        if parent.left is removed:
+            parent.left = child
+        else:
+            parent.right = child
         
-        # Rebalanceia
-        balance = self._get_balance(node)
+        if self.order_statistics:
+            for node in path:
+                node.size -= 1
+        self._rebalance_remove(path)
+        return value
+    
+    def _rebalance_remove(self, path):
+        """Sobe pela pilha do caminho rebalanceando após uma remoção"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            left = node.left
+            right = node.right
+            left_height = left.height if left is not None else 0
+            right_height = right.height if right is not None else 0
+            balance = left_height - right_height
+            
+            if balance > 1:
+                left_balance = ((left.left.height if left.left is not None else 0) -
+                                (left.right.height if left.right is not None else 0))
+                if left_balance >= 0:
+                    # Left-Left
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('remove_LL')
+                    subtree = self._rotate_right(node)
+                else:
+                    # Left-Right
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('remove_LR')
+                    node.left = self._rotate_left(left)
+                    subtree = self._rotate_right(node)
+            elif balance < -1:
+                right_balance = ((right.left.height if right.left is not None else 0) -
+                                 (right.right.height if right.right is not None else 0))
+                if right_balance <= 0:
+                    # Right-Right
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('remove_RR')
+                    subtree = self._rotate_left(node)
+                else:
+                    # Right-Left
+                    if self.hooks is not None:
+                        self.hooks.on_fixup('remove_RL')
+                    node.right = self._rotate_right(right)
+                    subtree = self._rotate_left(node)
+            else:
+                new_height = 1 + (left_height if left_height > right_height else right_height)
+                if new_height == node.height:
+                    # Altura inalterada e balanceado: ancestrais não mudam
+                    return
+                node.height = new_height
+                continue
+            
+            # Na remoção a rotação pode reduzir a altura: continua subindo
+            self._replace_child(path, i, node, subtree)
+    
+    def rank(self, key):
+        """Quantidade de chaves estritamente menores que key, em O(log n)"""
+        self._require_order_statistics('rank')
+        return self._count_below(key, False)
+    
+    def _count_below(self, key, inclusive):
+        """Conta as chaves < key (ou <= key, se inclusive) somando tamanhos de subárvores"""
+        count = 0
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                count += 1 + (node.left.size if node.left is not None else 0)
+                node = node.right
+            else:
+                count += (node.left.size if node.left is not None else 0) + (1 if inclusive else 0)
+                break
+        self.comparisons += comparisons
+        return count
+    
+    def select(self, k):
+        """Retorna a k-ésima menor chave (k a partir de 0; negativos contam do fim)"""
+        self._require_order_statistics('select')
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError("índice fora do intervalo da árvore")
+        node = self.root
+        while True:
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo.
         
-        # Left-Left
-        if balance > 1 and self._get_balance(node.left) >= 0:
-            return self._rotate_right(node)
+        Custo O(altura + k) para k chaves no intervalo.
+        """
+        for node in self._range_nodes(lo, hi):
+            yield node.key
+    
+    def _range_nodes(self, lo, hi):
+        """Gera os nós com chave em [lo, hi] em ordem (ver range)"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key < lo:
+                    # Toda a subárvore esquerda é menor que lo
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi].
         
-        # Left-Right
-        if balance > 1 and self._get_balance(node.left) < 0:
-            node.left = self._rotate_left(node.left)
-            return self._rotate_right(node)
+        Com order_statistics=True usa os tamanhos das subárvores (O(log n));
+        caso contrário percorre o intervalo com range().
+        """
+        if hi < lo:
+            return 0
+        if self.order_statistics:
+            return self._count_below(hi, True) - self._count_below(lo, False)
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def _require_order_statistics(self, operation):
+        if not self.order_statistics:
+            raise RuntimeError(f"{operation}() requer a árvore criada com order_statistics=True")
+    
+    def insert_many(self, keys):
+        """Insere um lote de chaves; retorna quantas eram novas.
         
-        # Right-Right
-        if balance < -1 and self._get_balance(node.right) <= 0:
-            return self._rotate_left(node)
+        Em uma árvore vazia o lote é ordenado uma vez e a árvore é montada
+        já balanceada em O(n), sem rotações.
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        before = self._size
+        if self._size == 0:
+            self._load_sorted(sorted(set(keys)))
+            return self._size
+        insert = self.insert
+        for key in keys:
+            insert(key)
+        return self._size - before
+    
+    def search_many(self, keys):
+        """Busca um lote de chaves; retorna um bytearray com 1 para cada encontrada.
         
-        # Right-Left
-        if balance < -1 and self._get_balance(node.right) > 0:
-            node.right = self._rotate_right(node.right)
-            return self._rotate_left(node)
+        Se o lote estiver ordenado, cada busca recomeça do ponto mais baixo do
+        caminho anterior cujo intervalo ainda contém a chave (busca com dedo),
+        em vez de recomeçar da raiz.
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        found = bytearray(len(keys))
+        if not _is_sorted(keys):
+            search = self.search
+            for i, key in enumerate(keys):
+                if search(key):
+                    found[i] = 1
+            return found
         
+        # Pilha = caminho a partir da raiz; cada nó leva o limite superior
+        # (exclusivo) da sua subárvore, ou None se ilimitado
+        stack = []
+        comparisons = 0
+        for i, key in enumerate(keys):
+            while stack:
+                upper = stack[-1][1]
+                if upper is None or key < upper:
+                    break
+                stack.pop()
+            if stack:
+                node, upper = stack[-1]
+            else:
+                node = self.root
+                upper = None
+                if node is None:
+                    break
+                stack.append((node, None))
+            
+            while True:
+                comparisons += 1
+                node_key = node.key
+                if key == node_key:
+                    found[i] = 1
+                    break
+                if key < node_key:
+                    child = node.left
+                    upper = node_key
+                else:
+                    child = node.right
+                if child is None:
+                    break
+                node = child
+                stack.append((node, upper))
+        self.comparisons += comparisons
+        return found
+    
+    def remove_many(self, keys):
+        """Remove um lote de chaves; retorna quantas existiam"""
+        before = self._size
+        remove = self.remove
+        for key in keys:
+            remove(key)
+        return before - self._size
+    
+    def _find_node(self, key):
+        """Encontra o nó da chave (ou None), contando comparações como search()"""
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key == node_key:
+                break
+            elif key < node_key:
+                node = node.left
+            else:
+                node = node.right
+        self.comparisons += comparisons
         return node
     
+    # --- Modo mapa ordenado: cada nó guarda também um valor ---
+    
+    def put(self, key, value):
+        """Associa value à chave, inserindo-a se necessário (uma única descida)"""
+        self._insert_node(key).value = value
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not None else default
+    
+    def pop(self, key, default=_MISSING):
+        """Remove a chave e retorna seu valor (KeyError se ausente e sem default)"""
+        value = self._remove_node(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def floor_entry(self, key):
+        """Par (chave, valor) com a maior chave <= key, ou None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.right
+        return (best.key, best.value) if best is not None else None
+    
+    def ceiling_entry(self, key):
+        """Par (chave, valor) com a menor chave >= key, ou None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key > node.key:
+                node = node.right
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.left
+        return (best.key, best.value) if best is not None else None
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        self.pop(key)
+    
     def _find_min(self, node):
         """Encontra o nó com valor mínimo"""
         while node.left is not None:
             node = node.left
         return node
     
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente usando uma pilha explícita (memória O(h))"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    
+    def _iter_nodes_reversed(self):
+        """Gera os nós em ordem decrescente usando uma pilha explícita"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (esquerda, raiz, direita)"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (raiz, esquerda, direita)"""
+        for node in self._iter_nodes_preorder():
+            yield node.key
+    
+    def _iter_nodes_preorder(self):
+        """Gera os nós em pre-order (ver iter_preorder)"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso (esquerda, direita, raiz)"""
+        for node in self._iter_nodes_postorder():
+            yield node.key
+    
+    def _iter_nodes_postorder(self):
+        """Gera os nós em post-order (ver iter_postorder)"""
+        stack = []
+        node = self.root
+        last = None
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not None and top.right is not last:
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.key
+    
     def inorder(self):
         """Percurso in-order"""
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
-    
-    def _inorder_recursive(self, node, result):
-        if node:
-            self._inorder_recursive(node.left, result)
-            result.append(node.key)
-            self._inorder_recursive(node.right, result)
+        return list(self.iter_inorder())
     
     def preorder(self):
         """Percurso pre-order"""
-        result = []
-        self._preorder_recursive(self.root, result)
-        return result
-    
-    def _preorder_recursive(self, node, result):
-        if node:
-            result.append(node.key)
-            self._preorder_recursive(node.left, result)
-            self._preorder_recursive(node.right, result)
+        return list(self.iter_preorder())
     
     def postorder(self):
         """Percurso post-order"""
-        result = []
-        self._postorder_recursive(self.root, result)
-        return result
-    
-    def _postorder_recursive(self, node, result):
-        if node:
-            self._postorder_recursive(node.left, result)
-            self._postorder_recursive(node.right, result)
-            result.append(node.key)
+        return list(self.iter_postorder())
     
     def height(self):
         """Retorna a altura da árvore"""
-        return self._get_height(self.root)
+        return self.root.height if self.root is not None else 0
+    
+    def save(self, path):
+        """Grava um snapshot binário da árvore (ver snapshot.py)"""
+        from snapshot import save_tree
+        save_tree(self, path)
+    
+    @classmethod
+    def load(cls, path, order_statistics=False, key=None):
+        """Carrega um snapshot via mmap, sem reinserir nem rotacionar.
+        
+        Snapshots de árvores com key= exigem a mesma função em key.
+        """
+        from snapshot import load_tree
+        return load_tree(path, cls, order_statistics, key)
+    
+    def union(self, other):
+        """Passa a conter as chaves das duas árvores, em O(m log(n/m + 1)).
+        
+        Destrutiva: reaproveita os nós de other, que fica vazia (ver setops.py).
+        """
+        from setops import union
+        union(self, other)
+    
+    def intersection(self, other):
+        """Mantém só as chaves presentes também em other; other fica vazia"""
+        from setops import intersection
+        intersection(self, other)
+    
+    def difference(self, other):
+        """Remove as chaves presentes em other; other fica vazia"""
+        from setops import difference
+        difference(self, other)
+    
+    def merge(self, other):
+        """Nova árvore com as chaves das duas, montada em O(n + m); não altera as entradas"""
+        from setops import merge
+        return merge(self, other)
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
     
     def reset_metrics(self):
         """Reseta as métricas de comparações e rotações"""
@@ -0,0 +1,410 @@
+"""
+Implementação de Árvore AVL com armazenamento compacto em arrays
+
+Os nós não são objetos Python: cada campo fica numa coluna array.array
+(chave, filho esquerdo, filho direito, altura) e um nó é apenas um índice.
+O índice 0 é o nó nulo (altura 0). Posições liberadas por remoções formam
+uma lista livre encadeada pela coluna de filhos esquerdos e são reutilizadas.
+Aceita apenas chaves inteiras de 64 bits.
+"""
+
+from array import array
+
+NIL = 0
+
+class ArrayAVL:
+    def __init__(self):
+        self.keys = array('q', [0])
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.heights = array('b', [0])
+        self.root = NIL
+        self._free = NIL
+        self._size = 0
+        self.comparisons = 0
+        self.rotations = 0
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False):
+        """Constrói uma árvore AVL perfeitamente balanceada em O(n), sem rotações.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        Os nós ocupam as posições 1..n na ordem das chaves.
+        """
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        n = len(keys)
+        tree = cls()
+        tree._size = n
+        tree.keys.extend(keys)
+        tree.left = array('i', bytes(4 * (n + 1)))
+        tree.right = array('i', bytes(4 * (n + 1)))
+        tree.heights = array('b', bytes(n + 1))
+        tree.root = tree._build_balanced(1, n + 1)
+        return tree
+    
+    def _build_balanced(self, lo, hi):
+        """Liga as posições lo..hi-1 usando a do meio como raiz"""
+        if lo >= hi:
+            return NIL
+        mid = (lo + hi) // 2
+        left = self.left[mid] = self._build_balanced(lo, mid)
+        right = self.right[mid] = self._build_balanced(mid + 1, hi)
+        heights = self.heights
+        heights[mid] = 1 + max(heights[left], heights[right])
+        return mid
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
+    
+    def _new_node(self, key):
+        """Aloca um nó, reutilizando uma posição da lista livre se houver"""
+        node = self._free
+        if node != NIL:
+            self._free = self.left[node]
+            self.keys[node] = key
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.heights[node] = 1
+            return node
+        self.keys.append(key)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.heights.append(1)
+        return len(self.keys) - 1
+    
+    def _free_node(self, node):
+        """Devolve a posição de um nó removido à lista livre"""
+        self.left[node] = self._free
+        self.right[node] = NIL
+        self.heights[node] = 0
+        self._free = node
+    
+    def insert(self, key):
+        """Insere um elemento na árvore AVL"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        path = []
+        node = self.root
+        
+        while node != NIL:
+            self.comparisons += 1
+            node_key = keys[node]
+            if key < node_key:
+                path.append(node)
+                node = left[node]
+            elif key > node_key:
+                path.append(node)
+                node = right[node]
+            else:
+                return
+        
+        new_node = self._new_node(key)
+        self._size += 1
+        if not path:
+            self.root = new_node
+            return
+        
+        parent = path[-1]
+        if key < keys[parent]:
+            left[parent] = new_node
+        else:
+            right[parent] = new_node
+        
+        self._rebalance_insert(path, key)
+    
+    def _rebalance_insert(self, path, key):
+        """Sobe pela pilha do caminho atualizando alturas e rotacionando"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        heights = self.heights
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            left_height = heights[left[node]]
+            right_height = heights[right[node]]
+            balance = left_height - right_height
+            
+            if balance > 1:
+                if key < keys[left[node]]:
+                    subtree = self._rotate_right(node)
+                else:
+                    left[node] = self._rotate_left(left[node])
+                    subtree = self._rotate_right(node)
+            elif balance < -1:
+                if key > keys[right[node]]:
+                    subtree = self._rotate_left(node)
+                else:
+                    right[node] = self._rotate_right(right[node])
+                    subtree = self._rotate_left(node)
+            else:
+                new_height = 1 + (left_height if left_height > right_height else right_height)
+                if new_height == heights[node]:
+                    return
+                heights[node] = new_height
+                continue
+            
+            self._replace_child(path, i, node, subtree)
+            return
+    
+    def _replace_child(self, path, i, old, new):
+        """Liga a nova raiz de subárvore ao pai registrado na pilha"""
+        if i == 0:
+            self.root = new
+        else:
+            parent = path[i - 1]
+            if self.left[parent] == old:
+                self.left[parent] = new
+            else:
+                self.right[parent] = new
+    
+    def _rotate_left(self, z):
+        """Rotação simples à esquerda"""
+        self.rotations += 1
+        left = self.left
+        right = self.right
+        heights = self.heights
+        y = right[z]
+        right[z] = left[y]
+        left[y] = z
+        heights[z] = 1 + max(heights[left[z]], heights[right[z]])
+        heights[y] = 1 + max(heights[left[y]], heights[right[y]])
+        return y
+    
+    def _rotate_right(self, z):
+        """Rotação simples à direita"""
+        self.rotations += 1
+        left = self.left
+        right = self.right
+        heights = self.heights
+        y = left[z]
+        left[z] = right[y]
+        right[y] = z
+        heights[z] = 1 + max(heights[left[z]], heights[right[z]])
+        heights[y] = 1 + max(heights[left[y]], heights[right[y]])
+        return y
+    
+    def search(self, key):
+        """Busca um elemento na árvore"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        node = self.root
+        while node != NIL:
+            self.comparisons += 1
+            node_key = keys[node]
+            if key == node_key:
+                return True
+            elif key < node_key:
+                node = left[node]
+            else:
+                node = right[node]
+        return False
+    
+    def remove(self, key):
+        """Remove um elemento da árvore"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        path = []
+        node = self.root
+        while node != NIL:
+            self.comparisons += 1
+            node_key = keys[node]
+            if key < node_key:
+                path.append(node)
+                node = left[node]
+            elif key > node_key:
+                path.append(node)
+                node = right[node]
+            else:
+                break
+        
+        if node == NIL:
+            return
+        
+        if left[node] != NIL and right[node] != NIL:
+            # Nó com dois filhos: copia o sucessor e o remove da subárvore direita
+            path.append(node)
+            succ = right[node]
+            self.comparisons += 1
+            while left[succ] != NIL:
+                path.append(succ)
+                succ = left[succ]
+                self.comparisons += 1
+            keys[node] = keys[succ]
+            removed = succ
+            child = right[succ]
+        else:
+            removed = node
+            child = left[node] if left[node] != NIL else right[node]
+        
+        self._free_node(removed)
+        self._size -= 1
+        if not path:
+            self.root = child
+            return
+        
+        parent = path[-1]
+        if left[parent] == removed:
+            left[parent] = child
+        else:
+            right[parent] = child
+        
+        self._rebalance_remove(path)
+    
+    def _rebalance_remove(self, path):
+        """Sobe pela pilha do caminho rebalanceando após uma remoção"""
+        left = self.left
+        right = self.right
+        heights = self.heights
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            left_height = heights[left[node]]
+            right_height = heights[right[node]]
+            balance = left_height - right_height
+            
+            if balance > 1:
+                child = left[node]
+                if heights[left[child]] - heights[right[child]] >= 0:
+                    subtree = self._rotate_right(node)
+                else:
+                    left[node] = self._rotate_left(child)
+                    subtree = self._rotate_right(node)
+            elif balance < -1:
+                child = right[node]
+                if heights[left[child]] - heights[right[child]] <= 0:
+                    subtree = self._rotate_left(node)
+                else:
+                    right[node] = self._rotate_right(child)
+                    subtree = self._rotate_left(node)
+            else:
+                new_height = 1 + (left_height if left_height > right_height else right_height)
+                if new_height == heights[node]:
+                    return
+                heights[node] = new_height
+                continue
+            
+            self._replace_child(path, i, node, subtree)
+    
+    def _iter_nodes(self):
+        """Gera os índices dos nós em ordem crescente (pilha explícita)"""
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            yield node
+            node = right[node]
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso"""
+        keys = self.keys
+        for node in self._iter_nodes():
+            yield keys[node]
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            yield keys[node]
+            if right[node] != NIL:
+                stack.append(right[node])
+            if left[node] != NIL:
+                stack.append(left[node])
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        last = NIL
+        while stack or node != NIL:
+            if node != NIL:
+                stack.append(node)
+                node = left[node]
+            else:
+                top = stack[-1]
+                if right[top] != NIL and right[top] != last:
+                    node = right[top]
+                else:
+                    yield keys[top]
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = right[node]
+            node = stack.pop()
+            yield keys[node]
+            node = left[node]
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                if keys[node] < lo:
+                    node = right[node]
+                else:
+                    stack.append(node)
+                    node = left[node]
+            if not stack:
+                return
+            node = stack.pop()
+            if keys[node] > hi:
+                return
+            yield keys[node]
+            node = right[node]
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi] (percorre o intervalo)"""
+        if hi < lo:
+            return 0
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def inorder(self):
+        """Percurso in-order"""
+        return list(self.iter_inorder())
+    
+    def preorder(self):
+        """Percurso pre-order"""
+        return list(self.iter_preorder())
+    
+    def postorder(self):
+        """Percurso post-order"""
+        return list(self.iter_postorder())
+    
+    def height(self):
+        """Retorna a altura da árvore"""
+        return self.heights[self.root]
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações e rotações"""
+        self.comparisons = 0
+        self.rotations = 0
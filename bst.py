@@ -2,76 +2,486 @@
 Implementação de Árvore Binária de Busca (BST)
 """
 
+# Marca "valor ausente" em pop(), já que None é um valor válido
+_MISSING = object()
+
+def _is_sorted(keys):
+    """Indica se a sequência está em ordem não decrescente"""
+    return all(a <= b for a, b in zip(keys, keys[1:]))
+
 class Node:
-    def __init__(self, key):
+    __slots__ = ('key', 'value', 'left', 'right', 'size')
+    
+    def __init__(self, key, value=None):
         self.key = key
+        self.value = value
         self.left = None
         self.right = None
+        self.size = 1
 
 class BST:
-    def __init__(self):
+    def __init__(self, order_statistics=False, key=None):
+        """Com order_statistics=True cada nó mantém o tamanho da sua subárvore,
+        habilitando rank() e select() em O(altura). Com key=f os elementos são
+        ordenados por f(elemento), calculada só na inserção (ver keyed.py)."""
         self.root = None
         self.comparisons = 0
+        self.order_statistics = order_statistics
+        self._size = 0
+        self.key = key
+        if key is not None:
+            from keyed import attach_key
+            attach_key(self, key)
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, order_statistics=False, key=None):
+        """Constrói uma árvore perfeitamente balanceada em O(n).
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        if key is not None:
+            tree = cls(order_statistics, key)
+            tree._load_items(iterable, assume_sorted)
+            return tree
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls(order_statistics)
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pela árvore balanceada das chaves já ordenadas"""
+        self.root = self._build_balanced(keys, 0, len(keys))
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi):
+        """Monta a subárvore de keys[lo:hi] usando o elemento do meio como raiz"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = Node(keys[mid])
+        node.left = self._build_balanced(keys, lo, mid)
+        node.right = self._build_balanced(keys, mid + 1, hi)
+        node.size = hi - lo
+        return node
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
     
     def insert(self, key):
         """Insere um elemento na árvore"""
-        self.root = self._insert_recursive(self.root, key)
+        self._insert_node(key)
     
-    def _insert_recursive(self, node, key):
-        if node is None:
-            return Node(key)
+    def _insert_node(self, key):
+        """Insere a chave se ausente e retorna o seu nó (novo ou existente)"""
+        parent = None
+        node = self.root
         
-        self.comparisons += 1
-        if key < node.key:
-            node.left = self._insert_recursive(node.left, key)
-        elif key > node.key:wwwwwwwwwwwwww
-            node.right = self._insert_recursive(node.right, key)
+        # Descida iterativa: evita RecursionError em árvores degeneradas
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                parent = node
+                node = node.left
+            elif key > node_key:
+                parent = node
+                node = node.right
+            else:
+                self.comparisons += comparisons
+                return node
+        self.comparisons += comparisons
         
-        return node
+        new_node = Node(key)
+        if parent is None:
+            self.root = new_node
+        elif key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        self._size += 1
+        if self.order_statistics:
+            self._update_path_sizes(key, 1)
+        return new_node
     
     def search(self, key):
         """Busca um elemento na árvore"""
-        return self._search_recursive(self.root, key)
-    
-    def _search_recursive(self, node, key):
-        if node is None:
-            return False
-        
-        self.comparisons += 1
-        if key == node.key:
-            return True
-        elif key < node.key:
-            return self._search_recursive(node.left, key)
-        else:
-            return self._search_recursive(node.right, key)
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key == node_key:
+                self.comparisons += comparisons
+                return True
+            elif key < node_key:
+                node = node.left
+            else:
+                node = node.right
+        self.comparisons += comparisons
+        return False
     
     def remove(self, key):
         """Remove um elemento da árvore"""
-        self.root = self._remove_recursive(self.root, key)
+        self._remove_node(key)
     
-    def _remove_recursive(self, node, key):
+    def _remove_node(self, key):
+        """Remove a chave e retorna o valor que ela guardava (_MISSING se ausente)"""
+        parent = None
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                parent = node
+                node = node.left
+            elif key > node_key:
+                parent = node
+                node = node.right
+            else:
+                break
+        self.comparisons += comparisons
+        
         if node is None:
-            return None
+            return _MISSING
+        self._size -= 1
+        value = node.value
+        
+        if node.left is not None and node.right is not None:
+            # Nó com dois filhos: copia o sucessor e remove-o da subárvore direita
+            succ_parent = node
+            succ = node.right
+            comparisons = 1
+            while succ.left is not None:
+                succ_parent = succ
+                succ = succ.left
+                comparisons += 1
+            self.comparisons += comparisons
+            if self.order_statistics:
+                self._update_path_sizes(succ.key, -1)
+            node.key = succ.key
+            node.value = succ.value
+            if succ_parent is node:
+                succ_parent.right = succ.right
+            else:
+                succ_parent.left = succ.right
+            return value
         
-        self.comparisons += 1
-        if key < node.key:
-            node.left = self._remove_recursive(node.left, key)
-        elif key > node.key:
-            node.right = self._remove_recursive(node.right, key)
+        # Nó com no máximo um filho
+        if self.order_statistics:
+            self._update_path_sizes(key, -1)
+        child = node.left if node.left is not None else node.right
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
         else:
-            # Nó encontrado
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
+            parent.right = child
+        return value
+    
+    def _update_path_sizes(self, key, delta):
+        """Soma delta ao tamanho de cada ancestral do nó com a chave key"""
+        node = self.root
+        while node.key != key:
+            node.size += delta
+            node = node.left if key < node.key else node.right
+    
+    def rank(self, key):
+        """Quantidade de chaves estritamente menores que key, em O(altura)"""
+        self._require_order_statistics('rank')
+        return self._count_below(key, False)
+    
+    def _count_below(self, key, inclusive):
+        """Conta as chaves < key (ou <= key, se inclusive) somando tamanhos de subárvores"""
+        count = 0
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                count += 1 + (node.left.size if node.left is not None else 0)
+                node = node.right
+            else:
+                count += (node.left.size if node.left is not None else 0) + (1 if inclusive else 0)
+                break
+        self.comparisons += comparisons
+        return count
+    
+    def select(self, k):
+        """Retorna a k-ésima menor chave (k a partir de 0; negativos contam do fim)"""
+        self._require_order_statistics('select')
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError("índice fora do intervalo da árvore")
+        node = self.root
+        while True:
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo.
+        
+        Custo O(altura + k) para k chaves no intervalo.
+        """
+        for node in self._range_nodes(lo, hi):
+            yield node.key
+    
+    def _range_nodes(self, lo, hi):
+        """Gera os nós com chave em [lo, hi] em ordem (ver range)"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key < lo:
+                    # Toda a subárvore esquerda é menor que lo
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi].
+        
+        Com order_statistics=True usa os tamanhos das subárvores (O(altura));
+        caso contrário percorre o intervalo com range().
+        """
+        if hi < lo:
+            return 0
+        if self.order_statistics:
+            return self._count_below(hi, True) - self._count_below(lo, False)
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def _require_order_statistics(self, operation):
+        if not self.order_statistics:
+            raise RuntimeError(f"{operation}() requer a árvore criada com order_statistics=True")
+    
+    def insert_many(self, keys):
+        """Insere um lote de chaves; retorna quantas eram novas.
+        
+        Em uma árvore vazia o lote é montado já balanceado em O(n). Se o lote
+        estiver ordenado, cada inserção recomeça do caminho da anterior (a BST
+        não reestrutura nós, então o caminho continua válido).
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        before = self._size
+        if self._size == 0:
+            self._load_sorted(sorted(set(keys)))
+            return self._size
+        if self.order_statistics or not _is_sorted(keys):
+            insert = self.insert
+            for key in keys:
+                insert(key)
+            return self._size - before
+        
+        stack = [(self.root, None)]
+        comparisons = 0
+        for key in keys:
+            while True:
+                upper = stack[-1][1]
+                if upper is None or key < upper:
+                    break
+                stack.pop()
+            node, upper = stack[-1]
             
-            # Nó com dois filhos: pega o sucessor
-            min_node = self._find_min(node.right)
-            node.key = min_node.key
-            node.right = self._remove_recursive(node.right, min_node.key)
+            while True:
+                comparisons += 1
+                node_key = node.key
+                if key == node_key:
+                    break
+                if key < node_key:
+                    child = node.left
+                    if child is None:
+                        child = node.left = Node(key)
+                        self._size += 1
+                        stack.append((child, node_key))
+                        break
+                    upper = node_key
+                else:
+                    child = node.right
+                    if child is None:
+                        child = node.right = Node(key)
+                        self._size += 1
+                        stack.append((child, upper))
+                        break
+                node = child
+                stack.append((node, upper))
+        self.comparisons += comparisons
+        return self._size - before
+    
+    def search_many(self, keys):
+        """Busca um lote de chaves; retorna um bytearray com 1 para cada encontrada.
         
+        Se o lote estiver ordenado, cada busca recomeça do ponto mais baixo do
+        caminho anterior cujo intervalo ainda contém a chave (busca com dedo),
+        em vez de recomeçar da raiz.
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        found = bytearray(len(keys))
+        if not _is_sorted(keys):
+            search = self.search
+            for i, key in enumerate(keys):
+                if search(key):
+                    found[i] = 1
+            return found
+        
+        # Pilha = caminho a partir da raiz; cada nó leva o limite superior
+        # (exclusivo) da sua subárvore, ou None se ilimitado
+        stack = []
+        comparisons = 0
+        for i, key in enumerate(keys):
+            while stack:
+                upper = stack[-1][1]
+                if upper is None or key < upper:
+                    break
+                stack.pop()
+            if stack:
+                node, upper = stack[-1]
+            else:
+                node = self.root
+                upper = None
+                if node is None:
+                    break
+                stack.append((node, None))
+            
+            while True:
+                comparisons += 1
+                node_key = node.key
+                if key == node_key:
+                    found[i] = 1
+                    break
+                if key < node_key:
+                    child = node.left
+                    upper = node_key
+                else:
+                    child = node.right
+                if child is None:
+                    break
+                node = child
+                stack.append((node, upper))
+        self.comparisons += comparisons
+        return found
+    
+    def remove_many(self, keys):
+        """Remove um lote de chaves; retorna quantas existiam"""
+        before = self._size
+        remove = self.remove
+        for key in keys:
+            remove(key)
+        return before - self._size
+    
+    def _find_node(self, key):
+        """Encontra o nó da chave (ou None), contando comparações como search()"""
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key == node_key:
+                break
+            elif key < node_key:
+                node = node.left
+            else:
+                node = node.right
+        self.comparisons += comparisons
         return node
     
+    # --- Modo mapa ordenado: cada nó guarda também um valor ---
+    
+    def put(self, key, value):
+        """Associa value à chave, inserindo-a se necessário (uma única descida)"""
+        self._insert_node(key).value = value
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not None else default
+    
+    def pop(self, key, default=_MISSING):
+        """Remove a chave e retorna seu valor (KeyError se ausente e sem default)"""
+        value = self._remove_node(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def floor_entry(self, key):
+        """Par (chave, valor) com a maior chave <= key, ou None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.right
+        return (best.key, best.value) if best is not None else None
+    
+    def ceiling_entry(self, key):
+        """Par (chave, valor) com a menor chave >= key, ou None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key > node.key:
+                node = node.right
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.left
+        return (best.key, best.value) if best is not None else None
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        self.pop(key)
+    
     def _find_min(self, node):
         """Encontra o nó com valor mínimo"""
         while node.left is not None:
@@ -79,51 +489,125 @@ class BST:
         return node
 
     
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente usando uma pilha explícita (memória O(h))"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    
+    def _iter_nodes_reversed(self):
+        """Gera os nós em ordem decrescente usando uma pilha explícita"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (esquerda, raiz, direita)"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (raiz, esquerda, direita)"""
+        for node in self._iter_nodes_preorder():
+            yield node.key
+    
+    def _iter_nodes_preorder(self):
+        """Gera os nós em pre-order (ver iter_preorder)"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso (esquerda, direita, raiz)"""
+        for node in self._iter_nodes_postorder():
+            yield node.key
+    
+    def _iter_nodes_postorder(self):
+        """Gera os nós em post-order (ver iter_postorder)"""
+        stack = []
+        node = self.root
+        last = None
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not None and top.right is not last:
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.key
+    
     def inorder(self):
         """Percurso in-order (esquerda, raiz, direita)"""
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
-    
-    def _inorder_recursive(self, node, result):
-        if node:
-            self._inorder_recursive(node.left, result)
-            result.append(node.key)
-            self._inorder_recursive(node.right, result)
+        return list(self.iter_inorder())
     
     def preorder(self):
         """Percurso pre-order (raiz, esquerda, direita)"""
-        result = []
-        self._preorder_recursive(self.root, result)
-        return result
-    
-    def _preorder_recursive(self, node, result):
-        if node:
-            result.append(node.key)
-            self._preorder_recursive(node.left, result)
-            self._preorder_recursive(node.right, result)
+        return list(self.iter_preorder())
     
     def postorder(self):
         """Percurso post-order (esquerda, direita, raiz)"""
-        result = []
-        self._postorder_recursive(self.root, result)
-        return result
-    
-    def _postorder_recursive(self, node, result):
-        if node:
-            self._postorder_recursive(node.left, result)
-            self._postorder_recursive(node.right, result)
-            result.append(node.key)
+        return list(self.iter_postorder())
     
     def height(self):
-        """Calcula a altura da árvore"""
-        return self._height_recursive(self.root)
+        """Calcula a altura da árvore (percurso em largura, sem recursão)"""
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
     
-    def _height_recursive(self, node):
-        if node is None:
-            return 0
-        return 1 + max(self._height_recursive(node.left), 
-                       self._height_recursive(node.right))
+    def save(self, path):
+        """Grava um snapshot binário da árvore (ver snapshot.py)"""
+        from snapshot import save_tree
+        save_tree(self, path)
+    
+    @classmethod
+    def load(cls, path, order_statistics=False, key=None):
+        """Carrega um snapshot via mmap, sem reinserir nem rotacionar.
+        
+        Snapshots de árvores com key= exigem a mesma função em key.
+        """
+        from snapshot import load_tree
+        return load_tree(path, cls, order_statistics, key)
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
     
     def reset_metrics(self):
         """Reseta as métricas de comparações"""
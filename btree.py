@@ -0,0 +1,424 @@
+"""
+Implementação de Árvore B (B-tree)
+
+Cada nó guarda até `order - 1` chaves ordenadas numa lista contígua e até
+`order` filhos; a busca dentro do nó é feita com bisect. Com fan-out alto a
+altura fica em torno de log_{order/2}(n), então uma busca visita poucos nós
+em vez de ~log2(n) nós de uma árvore binária.
+
+Inserção e remoção são de passada única, de cima para baixo (CLRS): nós
+cheios são divididos na descida e nós mínimos recebem uma chave emprestada
+de um irmão ou são fundidos com ele antes de descer.
+"""
+
+from bisect import bisect_left
+
+class BTreeNode:
+    __slots__ = ('keys', 'children')
+    
+    def __init__(self, keys=None, children=None):
+        self.keys = keys if keys is not None else []
+        # Lista vazia de filhos indica folha
+        self.children = children if children is not None else []
+
+class BTree:
+    def __init__(self, order=64):
+        """order é o número máximo de filhos por nó (par, mínimo 4).
+        
+        A divisão de cima para baixo usa grau mínimo t = order / 2; um order
+        ímpar seria arredondado para baixo em silêncio, então é recusado.
+        """
+        if order < 4 or order % 2:
+            raise ValueError("order deve ser par e pelo menos 4")
+        self.order = order
+        # Grau mínimo t: nós não raiz têm entre t - 1 e 2t - 1 chaves
+        self._min_degree = order // 2
+        self._max_keys = 2 * self._min_degree - 1
+        self.root = BTreeNode()
+        self.comparisons = 0
+        self.splits = 0
+        self.merges = 0
+        self.borrows = 0
+        self._size = 0
+    
+    @property
+    def rotations(self):
+        """Equivalente às rotações das árvores binárias: reestruturações de nós"""
+        return self.splits + self.merges + self.borrows
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, order=64):
+        """Constrói a árvore de baixo para cima em O(n), sem divisões.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls(order)
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pelas chaves já ordenadas, nível a nível"""
+        max_keys = self._max_keys
+        count = len(keys)
+        self._size = count
+        if count <= max_keys:
+            self.root = BTreeNode(list(keys))
+            return
+        
+        # Folhas com ocupação uniforme; as chaves entre elas sobem como separadores
+        leaves = -(-(count + 1) // (max_keys + 1))
+        in_leaves = count - (leaves - 1)
+        nodes, separators = [], []
+        pos = 0
+        for j in range(leaves):
+            take = in_leaves // leaves + (1 if j < in_leaves % leaves else 0)
+            nodes.append(BTreeNode(keys[pos:pos + take]))
+            pos += take
+            if j < leaves - 1:
+                separators.append(keys[pos])
+                pos += 1
+        
+        # Agrupa os nós de cada nível sob pais com até max_keys + 1 filhos
+        while len(nodes) > max_keys + 1:
+            count = len(nodes)
+            groups = -(-count // (max_keys + 1))
+            parents, parent_separators = [], []
+            pos = 0
+            for j in range(groups):
+                take = count // groups + (1 if j < count % groups else 0)
+                parents.append(BTreeNode(separators[pos:pos + take - 1], nodes[pos:pos + take]))
+                pos += take
+                if j < groups - 1:
+                    parent_separators.append(separators[pos - 1])
+            nodes, separators = parents, parent_separators
+        self.root = BTreeNode(separators, nodes)
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
+    
+    def insert(self, key):
+        """Insere um elemento na árvore (duplicatas são ignoradas)"""
+        max_keys = self._max_keys
+        node = self.root
+        if len(node.keys) == max_keys:
+            # Raiz cheia: a árvore cresce para cima
+            node = self.root = BTreeNode([], [node])
+            self._split_child(node, 0)
+        
+        comparisons = 0
+        while True:
+            keys = node.keys
+            i = bisect_left(keys, key)
+            # bisect faz ~log2(len + 1) comparações dentro do nó
+            comparisons += len(keys).bit_length()
+            if i < len(keys) and keys[i] == key:
+                break
+            if not node.children:
+                keys.insert(i, key)
+                self._size += 1
+                break
+            if len(node.children[i].keys) == max_keys:
+                self._split_child(node, i)
+                comparisons += 1
+                if key == keys[i]:
+                    break
+                if key > keys[i]:
+                    i += 1
+            node = node.children[i]
+        self.comparisons += comparisons
+    
+    def _split_child(self, parent, i):
+        """Divide o filho cheio parent.children[i], subindo a chave do meio"""
+        t = self._min_degree
+        child = parent.children[i]
+        right = BTreeNode(child.keys[t:], child.children[t:])
+        parent.keys.insert(i, child.keys[t - 1])
+        parent.children.insert(i + 1, right)
+        del child.keys[t - 1:]
+        del child.children[t:]
+        self.splits += 1
+    
+    def search(self, key):
+        """Busca um elemento na árvore"""
+        node = self.root
+        comparisons = 0
+        while True:
+            keys = node.keys
+            i = bisect_left(keys, key)
+            comparisons += len(keys).bit_length()
+            if i < len(keys) and keys[i] == key:
+                self.comparisons += comparisons
+                return True
+            if not node.children:
+                self.comparisons += comparisons
+                return False
+            node = node.children[i]
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def remove(self, key):
+        """Remove um elemento da árvore"""
+        t = self._min_degree
+        node = self.root
+        comparisons = 0
+        while True:
+            keys = node.keys
+            i = bisect_left(keys, key)
+            comparisons += len(keys).bit_length()
+            found = i < len(keys) and keys[i] == key
+            
+            if not node.children:
+                if found:
+                    del keys[i]
+                    self._size -= 1
+                break
+            
+            children = node.children
+            if found:
+                left = children[i]
+                right = children[i + 1]
+                if len(left.keys) >= t:
+                    # Troca pela predecessora e a remove da subárvore esquerda
+                    key = keys[i] = self._max_key(left)
+                    node = left
+                elif len(right.keys) >= t:
+                    # Troca pela sucessora e a remove da subárvore direita
+                    key = keys[i] = self._min_key(right)
+                    node = right
+                else:
+                    # Ambos mínimos: funde e continua no nó fundido
+                    self._merge_children(node, i)
+                    node = left
+                continue
+            
+            child = children[i]
+            if len(child.keys) < t:
+                # Garante ao menos t chaves no filho antes de descer
+                if i > 0 and len(children[i - 1].keys) >= t:
+                    self._borrow_from_left(node, i)
+                elif i + 1 < len(children) and len(children[i + 1].keys) >= t:
+                    self._borrow_from_right(node, i)
+                else:
+                    if i + 1 == len(children):
+                        i -= 1
+                    self._merge_children(node, i)
+                child = children[i]
+            node = child
+        
+        self.comparisons += comparisons
+        root = self.root
+        if not root.keys and root.children:
+            # Raiz esvaziada por fusão: a árvore encolhe
+            self.root = root.children[0]
+    
+    def _merge_children(self, parent, i):
+        """Funde children[i + 1] e a chave separadora em children[i]"""
+        left = parent.children[i]
+        right = parent.children.pop(i + 1)
+        left.keys.append(parent.keys.pop(i))
+        left.keys.extend(right.keys)
+        left.children.extend(right.children)
+        self.merges += 1
+    
+    def _borrow_from_left(self, parent, i):
+        """Rotaciona uma chave do irmão esquerdo, via pai, para children[i]"""
+        child = parent.children[i]
+        sibling = parent.children[i - 1]
+        child.keys.insert(0, parent.keys[i - 1])
+        parent.keys[i - 1] = sibling.keys.pop()
+        if sibling.children:
+            child.children.insert(0, sibling.children.pop())
+        self.borrows += 1
+    
+    def _borrow_from_right(self, parent, i):
+        """Rotaciona uma chave do irmão direito, via pai, para children[i]"""
+        child = parent.children[i]
+        sibling = parent.children[i + 1]
+        child.keys.append(parent.keys[i])
+        parent.keys[i] = sibling.keys.pop(0)
+        if sibling.children:
+            child.children.append(sibling.children.pop(0))
+        self.borrows += 1
+    
+    def _max_key(self, node):
+        while node.children:
+            node = node.children[-1]
+        return node.keys[-1]
+    
+    def _min_key(self, node):
+        while node.children:
+            node = node.children[0]
+        return node.keys[0]
+    
+    def _iter_keys(self, lo=None):
+        """Gera as chaves em ordem a partir de lo (ou do início).
+        
+        A pilha guarda [nó, i]: a próxima chave do nó a emitir é keys[i],
+        depois de esgotada a subárvore children[i].
+        """
+        stack = []
+        node = self.root
+        while True:
+            i = 0 if lo is None else bisect_left(node.keys, lo)
+            if not node.children:
+                keys = node.keys
+                for j in range(i, len(keys)):
+                    yield keys[j]
+                break
+            stack.append([node, i])
+            node = node.children[i]
+        
+        while stack:
+            entry = stack[-1]
+            parent, i = entry
+            if i == len(parent.keys):
+                stack.pop()
+                continue
+            yield parent.keys[i]
+            entry[1] = i + 1
+            # Desce pela borda esquerda de children[i + 1]
+            node = parent.children[i + 1]
+            while node.children:
+                stack.append([node, 0])
+                node = node.children[0]
+            yield from node.keys
+    
+    def _iter_keys_reversed(self):
+        """Gera as chaves em ordem decrescente"""
+        stack = []
+        node = self.root
+        while node.children:
+            stack.append([node, len(node.keys) - 1])
+            node = node.children[-1]
+        yield from reversed(node.keys)
+        
+        while stack:
+            entry = stack[-1]
+            parent, i = entry
+            if i < 0:
+                stack.pop()
+                continue
+            yield parent.keys[i]
+            entry[1] = i - 1
+            node = parent.children[i]
+            while node.children:
+                stack.append([node, len(node.keys) - 1])
+                node = node.children[-1]
+            yield from reversed(node.keys)
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (gerador)"""
+        return self._iter_keys()
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso: chaves do nó antes das subárvores"""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield from node.keys
+            stack.extend(reversed(node.children))
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso: subárvores antes das chaves do nó"""
+        stack = [(self.root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded or not node.children:
+                yield from node.keys
+                continue
+            stack.append((node, True))
+            for child in reversed(node.children):
+                stack.append((child, False))
+    
+    def __iter__(self):
+        return self._iter_keys()
+    
+    def __reversed__(self):
+        return self._iter_keys_reversed()
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, em O(log n + k)"""
+        for key in self._iter_keys(lo):
+            if key > hi:
+                return
+            yield key
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi]"""
+        if lo > hi:
+            return 0
+        count = 0
+        for _ in self.range(lo, hi):
+            count += 1
+        return count
+    
+    def inorder(self):
+        """Percurso in-order"""
+        return list(self._iter_keys())
+    
+    def preorder(self):
+        """Percurso pre-order"""
+        return list(self.iter_preorder())
+    
+    def postorder(self):
+        """Percurso post-order"""
+        return list(self.iter_postorder())
+    
+    def height(self):
+        """Retorna a altura da árvore em nós (todas as folhas têm a mesma profundidade)"""
+        if not self.root.keys:
+            return 0
+        height = 1
+        node = self.root
+        while node.children:
+            node = node.children[0]
+            height += 1
+        return height
+    
+    def is_valid(self):
+        """Verifica ocupação dos nós, ordem das chaves e folhas no mesmo nível"""
+        t = self._min_degree
+        leaf_depth = None
+        count = 0
+        stack = [(self.root, 1, None, None)]
+        while stack:
+            node, depth, lo, hi = stack.pop()
+            keys = node.keys
+            count += len(keys)
+            if node is not self.root and not t - 1 <= len(keys) <= self._max_keys:
+                return False
+            if len(keys) > self._max_keys:
+                return False
+            if any(keys[j] >= keys[j + 1] for j in range(len(keys) - 1)):
+                return False
+            if keys and ((lo is not None and keys[0] <= lo) or
+                         (hi is not None and keys[-1] >= hi)):
+                return False
+            if not node.children:
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    return False
+                continue
+            if len(node.children) != len(keys) + 1:
+                return False
+            bounds = [lo] + keys + [hi]
+            for j, child in enumerate(node.children):
+                stack.append((child, depth + 1, bounds[j], bounds[j + 1]))
+        return count == self._size
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações, divisões, fusões e empréstimos"""
+        self.comparisons = 0
+        self.splits = 0
+        self.merges = 0
+        self.borrows = 0
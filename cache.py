@@ -0,0 +1,335 @@
+"""
+Cache de chaves quentes na frente da busca das árvores
+
+CachedTree guarda o resultado das últimas buscas (presença e valor) num
+cache limitado, com política de descarte LRU, LFU ou CLOCK. Buscas
+repetidas da mesma chave não descem mais pela árvore. Toda mutação feita
+pelo wrapper invalida a entrada da chave afetada; mutações feitas direto
+na árvore embrulhada não são vistas pelo cache.
+
+Com uma árvore key= (keyed.py) o cache é indexado pela chave de ordenação:
+search, insert e remove recebem elementos e os convertem com tree.key antes
+de consultar ou invalidar, então elementos com a mesma chave (o mesmo nó)
+compartilham a entrada.
+"""
+
+from collections import OrderedDict
+
+# Marca "chave fora do cache" / "chave ausente na árvore"
+_MISSING = object()
+
+class LRUCache:
+    """Descarta a entrada usada há mais tempo"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._move_to_end = self._entries.move_to_end
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        try:
+            self._move_to_end(key)
+        except KeyError:
+            return _MISSING
+        return self._entries[key]
+    
+    def put(self, key, entry):
+        entries = self._entries
+        entries[key] = entry
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+    
+    def discard(self, key):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+
+class LFUCache:
+    """Descarta a entrada menos usada (empate: a mais antiga), em O(1)"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = {}
+        self._counts = {}
+        # Frequência -> chaves com essa frequência, em ordem de chegada
+        self._buckets = {}
+        self._min_count = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _touch(self, key):
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+    
+    def get(self, key):
+        entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING:
+            self._touch(key)
+        return entry
+    
+    def put(self, key, entry):
+        if key in self._entries:
+            self._entries[key] = entry
+            self._touch(key)
+            return
+        if len(self._entries) >= self.capacity:
+            bucket = self._buckets[self._min_count]
+            victim, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_count]
+            del self._entries[victim]
+            del self._counts[victim]
+            self.evictions += 1
+        self._entries[key] = entry
+        self._counts[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+    
+    def discard(self, key):
+        if key not in self._entries:
+            return
+        count = self._counts.pop(key)
+        del self._entries[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                # Recalculado só quando o menor balde esvazia por invalidação
+                self._min_count = min(self._buckets, default=0)
+    
+    def clear(self):
+        self._entries.clear()
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+class ClockCache:
+    """Aproximação de LRU com um bit de referência por posição (segunda chance)"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._slots = {}
+        self._keys = [_MISSING] * capacity
+        self._entries = [None] * capacity
+        self._referenced = bytearray(capacity)
+        self._hand = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def get(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return _MISSING
+        self._referenced[slot] = 1
+        return self._entries[slot]
+    
+    def put(self, key, entry):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._find_slot()
+            self._slots[key] = slot
+            self._keys[slot] = key
+        self._entries[slot] = entry
+        self._referenced[slot] = 1
+    
+    def _find_slot(self):
+        """Avança o ponteiro até uma posição livre ou sem referência recente"""
+        keys = self._keys
+        referenced = self._referenced
+        while True:
+            slot = self._hand
+            self._hand = (slot + 1) % self.capacity
+            if keys[slot] is _MISSING:
+                return slot
+            if referenced[slot]:
+                referenced[slot] = 0
+                continue
+            del self._slots[keys[slot]]
+            keys[slot] = _MISSING
+            self._entries[slot] = None
+            self.evictions += 1
+            return slot
+    
+    def discard(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._keys[slot] = _MISSING
+            self._entries[slot] = None
+            self._referenced[slot] = 0
+    
+    def clear(self):
+        self._slots.clear()
+        self._keys = [_MISSING] * self.capacity
+        self._entries = [None] * self.capacity
+        self._referenced = bytearray(self.capacity)
+        self._hand = 0
+
+POLICIES = {'lru': LRUCache, 'lfu': LFUCache, 'clock': ClockCache}
+
+class CachedTree:
+    """Árvore com cache de buscas.
+    
+    Uso:
+        tree = CachedTree(AVL(), capacity=1024, policy='lfu')
+        tree.insert(10)
+        tree.search(10)
+        tree.stats()
+    
+    Cada entrada guarda (presente, valor), então search e get (modo mapa)
+    compartilham o cache, inclusive para chaves ausentes.
+    """
+    
+    def __init__(self, tree, capacity=1024, policy='lru'):
+        if policy not in POLICIES:
+            raise ValueError(f"política de cache inválida: {policy!r}")
+        if capacity < 1:
+            raise ValueError("capacity deve ser pelo menos 1")
+        self.tree = tree
+        self.policy = policy
+        self.cache = POLICIES[policy](capacity)
+        self._cache_get = self.cache.get
+        self.hits = 0
+        self.misses = 0
+        self._has_values = hasattr(tree, 'get')
+        # Função de chave da árvore key= (elemento -> chave de ordenação)
+        self._key = getattr(tree, 'key', None)
+    
+    def _lookup(self, key):
+        entry = self._cache_get(key)
+        if entry is not _MISSING:
+            self.hits += 1
+            return entry
+        return self._miss(key)
+    
+    def _miss(self, key):
+        """Busca na árvore e guarda o resultado no cache"""
+        self.misses += 1
+        if self._has_values:
+            # Uma única descida responde presença e valor
+            value = self.tree.get(key, _MISSING)
+            entry = (value is not _MISSING, None if value is _MISSING else value)
+        else:
+            entry = (self.tree.search(key), None)
+        self.cache.put(key, entry)
+        return entry
+    
+    def search(self, key):
+        """Busca um elemento, consultando o cache antes da árvore"""
+        if self._key is not None:
+            key = self._key(key)
+        # Caminho de acerto sem chamadas intermediárias
+        entry = self._cache_get(key)
+        if entry is not _MISSING:
+            self.hits += 1
+            return entry[0]
+        return self._miss(key)[0]
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def get(self, key, default=None):
+        """Valor associado à chave (modo mapa), via cache"""
+        present, value = self._lookup(key)
+        return value if present else default
+    
+    def __getitem__(self, key):
+        present, value = self._lookup(key)
+        if not present:
+            raise KeyError(key)
+        return value
+    
+    def _cache_keys(self, items):
+        """Chaves do cache dos elementos (as próprias chaves fora do modo key=)"""
+        return items if self._key is None else map(self._key, items)
+    
+    def insert(self, key):
+        self.tree.insert(key)
+        self.cache.discard(key if self._key is None else self._key(key))
+    
+    def remove(self, key):
+        self.tree.remove(key)
+        self.cache.discard(key if self._key is None else self._key(key))
+    
+    def put(self, key, value):
+        self.tree.put(key, value)
+        self.cache.discard(key)
+    
+    def pop(self, key, *default):
+        try:
+            return self.tree.pop(key, *default)
+        finally:
+            self.cache.discard(key)
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        try:
+            del self.tree[key]
+        finally:
+            self.cache.discard(key)
+    
+    def insert_many(self, keys):
+        keys = list(keys)
+        self.tree.insert_many(keys)
+        for key in self._cache_keys(keys):
+            self.cache.discard(key)
+    
+    def remove_many(self, keys):
+        keys = list(keys)
+        try:
+            return self.tree.remove_many(keys)
+        finally:
+            for key in self._cache_keys(keys):
+                self.cache.discard(key)
+    
+    def clear_cache(self):
+        self.cache.clear()
+    
+    def stats(self):
+        """Estatísticas de acertos e falhas do cache"""
+        lookups = self.hits + self.misses
+        return {
+            'policy': self.policy,
+            'capacity': self.cache.capacity,
+            'size': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.cache.evictions,
+        }
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.cache.evictions = 0
+    
+    def __len__(self):
+        return len(self.tree)
+    
+    def __iter__(self):
+        return iter(self.tree)
+    
+    def __getattr__(self, name):
+        if name == 'tree':
+            raise AttributeError(name)
+        return getattr(self.tree, name)
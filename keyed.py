@@ -0,0 +1,163 @@
+"""
+Chaves derivadas para as árvores: key=, como em sorted()
+
+Com AVL(key=f) (idem BST, RBT, SplayTree e Treap) a árvore guarda elementos
+quaisquer ordenados por f(elemento). f é avaliada uma única vez, na
+inserção: o resultado fica em node.key e o elemento em node.value. As
+descidas comparam só as chaves já calculadas, sem chamar f de novo e sem
+passar pela comparação (possivelmente escrita em Python) dos elementos.
+
+No modo key= insert, search, remove, *_many e __contains__ recebem
+elementos; a iteração, os percursos (inorder, preorder, postorder) e range
+devolvem elementos. Os limites de
+range/count_range e as operações do modo mapa (put, get, pop, rank,
+floor_entry...) continuam em termos da chave de ordenação. Dois elementos
+com a mesma chave ocupam o mesmo nó: o último inserido prevalece.
+
+int_key empacota tuplas de inteiros limitados num único int que preserva a
+ordem: a comparação em cada nível vira uma comparação de inteiros, em vez
+da comparação elemento a elemento das tuplas.
+"""
+
+from operator import itemgetter
+
+# Classe com key= de cada tipo de árvore (criada na primeira vez)
+_KEYED_CLASSES = {}
+
+def int_key(*bits):
+    """Função de chave que empacota uma tupla de inteiros num único int.
+    
+    bits dá a largura de cada campo: int_key(32, 16) aceita (a, b) com
+    0 <= a < 2**32 e 0 <= b < 2**16 e devolve (a << 16) | b, que ordena
+    exatamente como a tupla. Campos fora da faixa geram ValueError.
+    """
+    if not bits or any(width <= 0 for width in bits):
+        raise ValueError("int_key requer larguras positivas")
+    shifts = []
+    shift = sum(bits)
+    for width in bits:
+        shift -= width
+        shifts.append((shift, 1 << width))
+    
+    def pack(values):
+        if len(values) != len(shifts):
+            raise ValueError(f"int_key espera {len(shifts)} campos, recebeu {len(values)}")
+        result = 0
+        for value, (shift, limit) in zip(values, shifts):
+            if not 0 <= value < limit:
+                raise ValueError(f"campo {value!r} fora da faixa [0, {limit})")
+            result |= value << shift
+        return result
+    
+    if len(bits) == 2:
+        # Caso mais comum, sem o laço: (a, b) -> a << largura(b) | b
+        (high_shift, high_limit), (_, low_limit) = shifts
+        
+        def pack(values, general=pack):
+            a, b = values
+            if 0 <= a < high_limit and 0 <= b < low_limit:
+                return a << high_shift | b
+            return general(values)
+    
+    return pack
+
+def attach_key(tree, key):
+    """Passa a instância para a variante com key= do seu tipo (KeyedTree)"""
+    cls = type(tree)
+    if not isinstance(tree, KeyedTree):
+        keyed = _KEYED_CLASSES.get(cls)
+        if keyed is None:
+            keyed = type(cls.__name__, (KeyedTree, cls),
+                         {'__module__': cls.__module__, '__doc__': cls.__doc__})
+            _KEYED_CLASSES[cls] = keyed
+        tree.__class__ = keyed
+    tree.key = key
+
+class KeyedTree:
+    """Operações por elemento do modo key= (combinada com a classe da árvore).
+    
+    Não é usada diretamente: a árvore criada com key= troca de classe para
+    uma subclasse de KeyedTree e do seu próprio tipo, então isinstance e os
+    demais métodos continuam valendo.
+    """
+    
+    def _load_items(self, items, assume_sorted=False):
+        """Monta a árvore balanceada com os elementos (chave calculada uma vez)"""
+        key = self.key
+        pairs = [(key(item), item) for item in items]
+        if not assume_sorted:
+            # Ordenação estável: entre chaves iguais o último elemento fica por último
+            pairs.sort(key=itemgetter(0))
+            unique = []
+            for pair in pairs:
+                if unique and not unique[-1][0] < pair[0]:
+                    unique[-1] = pair
+                else:
+                    unique.append(pair)
+            pairs = unique
+        self._load_sorted([sort_key for sort_key, _ in pairs])
+        for node, (_, item) in zip(self._iter_nodes(), pairs):
+            node.value = item
+    
+    def insert(self, item):
+        self.put(self.key(item), item)
+    
+    def search(self, item):
+        return super().search(self.key(item))
+    
+    def remove(self, item):
+        super().remove(self.key(item))
+    
+    def insert_many(self, items):
+        """Insere um lote de elementos; retorna quantas chaves eram novas"""
+        before = len(self)
+        if before == 0:
+            self._load_items(items)
+            return len(self)
+        key = self.key
+        put = self.put
+        for item in items:
+            put(key(item), item)
+        return len(self) - before
+    
+    def search_many(self, items):
+        """Busca um lote; bytearray com 1 para cada elemento encontrado"""
+        key = self.key
+        search = super().search
+        return bytearray(1 if search(key(item)) else 0 for item in items)
+    
+    def remove_many(self, items):
+        """Remove um lote; retorna quantas chaves existiam"""
+        before = len(self)
+        key = self.key
+        remove = super().remove
+        for item in items:
+            remove(key(item))
+        return before - len(self)
+    
+    def iter_inorder(self):
+        """Elementos em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.value
+    
+    def iter_preorder(self):
+        for node in self._iter_nodes_preorder():
+            yield node.value
+    
+    def iter_postorder(self):
+        for node in self._iter_nodes_postorder():
+            yield node.value
+    
+    def keys(self):
+        """Chaves de ordenação (já calculadas) em ordem crescente"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def range(self, lo, hi):
+        """Elementos com chave em [lo, hi], em ordem"""
+        for node in self._range_nodes(lo, hi):
+            yield node.value
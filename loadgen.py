@@ -0,0 +1,191 @@
+"""
+Gerador de carga para o server.py: vazão e latência de cauda em localhost
+
+Abre várias conexões, cada uma com até `depth` requisições em voo
+(pipelining), e mede a latência de cada requisição do envio até a resposta
+num LatencyHistogram.
+
+Uso:
+    python server.py --port 7070 &
+    python loadgen.py --port 7070 --connections 8 --depth 32 --requests 200000
+    python loadgen.py --spawn ...        # sobe o servidor num subprocesso
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+from collections import deque
+
+from metrics import LatencyHistogram
+
+class TreeClient:
+    """Cliente assíncrono do protocolo de linhas, com pipelining.
+    
+    request() envia sem esperar as anteriores; as respostas chegam na ordem
+    dos envios e são entregues aos futures na mesma ordem.
+    """
+    
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._waiting = deque()
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+    
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=7070, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+    
+    async def _receive(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            self._waiting.popleft().set_result(line.decode().rstrip("\n"))
+        for future in self._waiting:
+            future.set_exception(ConnectionError("conexão encerrada pelo servidor"))
+    
+    def send(self, line):
+        """Envia uma requisição; devolve o future da resposta"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(future)
+        self._writer.write(line.encode() + b"\n")
+        return future
+    
+    async def drain(self):
+        """Espera o buffer de saída esvaziar (backpressure do servidor)"""
+        await self._writer.drain()
+    
+    async def request(self, line):
+        future = self.send(line)
+        await self.drain()
+        return await future
+    
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+
+async def _connection_load(client, plan, depth, histogram):
+    """Executa o plano de uma conexão mantendo até `depth` requisições em voo"""
+    in_flight = deque()
+    for line in plan:
+        if len(in_flight) >= depth:
+            start, future = in_flight.popleft()
+            await future
+            histogram.record(time.perf_counter_ns() - start)
+        in_flight.append((time.perf_counter_ns(), client.send(line)))
+        await client.drain()
+    while in_flight:
+        start, future = in_flight.popleft()
+        await future
+        histogram.record(time.perf_counter_ns() - start)
+
+def build_plans(args, rng):
+    """Requisições de cada conexão: buscas e escritas sobre um espaço de chaves"""
+    space = args.keys * 2
+    per_connection = args.requests // args.connections
+    plans = []
+    for _ in range(args.connections):
+        plan = []
+        for _ in range(per_connection):
+            keys = " ".join(str(rng.randrange(space)) for _ in range(args.batch))
+            if rng.random() < args.read_ratio:
+                plan.append(f"SEARCH {args.name} {keys}")
+            elif rng.random() < 0.5:
+                plan.append(f"INSERT {args.name} {keys}")
+            else:
+                plan.append(f"REMOVE {args.name} {keys}")
+        plans.append(plan)
+    return plans
+
+async def run(args):
+    connect = dict(host=args.host, port=args.port, path=args.unix)
+    rng = random.Random(args.seed)
+    
+    # Prepara a árvore com metade do espaço de chaves
+    admin = await TreeClient.connect(**connect)
+    await admin.request(f"DROP {args.name}")
+    reply = await admin.request(f"CREATE {args.name} {args.type}")
+    if not reply.startswith("OK"):
+        raise SystemExit(reply)
+    initial = rng.sample(range(args.keys * 2), args.keys)
+    for i in range(0, len(initial), 10000):
+        await admin.request(f"INSERT {args.name} " + " ".join(map(str, initial[i:i + 10000])))
+    await admin.request(f"STATS {args.name}")
+    
+    plans = build_plans(args, rng)
+    clients = [await TreeClient.connect(**connect) for _ in range(args.connections)]
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection_load(client, plan, args.depth, histogram)
+                           for client, plan in zip(clients, plans)))
+    elapsed = time.perf_counter() - start
+    stats = await admin.request(f"STATS {args.name}")
+    for client in clients + [admin]:
+        await client.close()
+    
+    total = histogram.count
+    print(f"Árvore {args.type}, {args.keys} chaves, {args.connections} conexões, "
+          f"profundidade {args.depth}, {args.batch} chave(s)/requisição")
+    print(f"Requisições: {total} em {elapsed:.3f} s -> {total / elapsed:,.0f} req/s "
+          f"({total * args.batch / elapsed:,.0f} chaves/s)")
+    print(f"Latência (µs): p50 {histogram.percentile(50) / 1e3:.1f}  "
+          f"p99 {histogram.percentile(99) / 1e3:.1f}  "
+          f"p99.9 {histogram.percentile(99.9) / 1e3:.1f}  máx {histogram.max / 1e3:.1f}")
+    print(f"Servidor: {stats[3:]}")
+
+async def _wait_for_server(args, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client = await TreeClient.connect(args.host, args.port, args.unix)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+        else:
+            await client.close()
+            return
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gerador de carga para o server.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7070)
+    parser.add_argument('--unix', help="caminho de um socket Unix")
+    parser.add_argument('--spawn', action='store_true',
+                        help="sobe o server.py num subprocesso durante o teste")
+    parser.add_argument('--name', default='loadgen', help="nome da árvore no servidor")
+    parser.add_argument('--type', default='AVL', help="tipo da árvore (BST, AVL, RBT...)")
+    parser.add_argument('--keys', type=int, default=100000, help="chaves carregadas antes")
+    parser.add_argument('--requests', type=int, default=100000)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=32, help="requisições em voo por conexão")
+    parser.add_argument('--batch', type=int, default=1, help="chaves por requisição")
+    parser.add_argument('--read-ratio', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+async def main(args):
+    server = None
+    if args.spawn:
+        command = [sys.executable, 'server.py', '--host', args.host, '--port', str(args.port)]
+        if args.unix:
+            command += ['--unix', args.unix]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        await _wait_for_server(args)
+        await run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -5,6 +5,27 @@ Menu interativo para manipulação de árvores
 from bst import BST
 from avl import AVL
 from rbt import RBT
+from btree import BTree
+from splay import SplayTree
+from treap import Treap
+
+# Tipos disponíveis no menu: opção -> (classe, nome curto, descrição)
+TREE_TYPES = {
+    1: (BST, "BST", "BST (Árvore Binária de Busca)"),
+    2: (AVL, "AVL", "AVL (Árvore Balanceada)"),
+    3: (RBT, "RBT", "RBT (Árvore Rubro-Negra)"),
+    4: (BTree, "B-Tree", "B-Tree (Árvore B, nós com várias chaves)"),
+    5: (SplayTree, "Splay", "Splay (Árvore autoajustável)"),
+    6: (Treap, "Treap", "Treap (Árvore aleatorizada)"),
+}
+
+def parse_key(text):
+    """Inteiro quando possível, senão o próprio texto (sem espaços nas pontas)"""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return text
 
 def print_menu():
     """Imprime o menu principal"""
@@ -26,19 +47,15 @@ def print_tree_menu():
     print("\n" + "="*50)
     print("ESCOLHA O TIPO DE ÁRVORE")
     print("="*50)
-    print("1. BST (Árvore Binária de Busca)")
-    print("2. AVL (Árvore Balanceada)")
-    print("3. RBT (Árvore Rubro-Negra)")
+    for option, (_, _, description) in TREE_TYPES.items():
+        print(f"{option}. {description}")
     print("="*50)
 
 def create_tree(tree_type):
     """Cria uma árvore do tipo especificado"""
-    if tree_type == 1:
-        return BST(), "BST"
-    elif tree_type == 2:
-        return AVL(), "AVL"
-    elif tree_type == 3:
-        return RBT(), "RBT"
+    if tree_type in TREE_TYPES:
+        tree_class, tree_name, _ = TREE_TYPES[tree_type]
+        return tree_class(), tree_name
     return None, None
 
 def main():
@@ -49,8 +66,9 @@ def main():
     print_tree_menu()
     while True:
         try:
-            choice = int(input("\nEscolha (1-3): "))
-            if choice in [1, 2, 3]:
+            choice = int(input(f"\nEscolha (1-{len(TREE_TYPES)}): "))
+            if choice in TREE_TYPES:
+                tree_type = choice
                 tree, tree_name = create_tree(choice)
                 print(f"\n✓ Árvore {tree_name} criada com sucesso!")
                 break
@@ -72,17 +90,17 @@ def main():
                 break
             
             elif option == 1:
-                key = int(input("Digite o valor a inserir: "))
+                key = parse_key(input("Digite o valor a inserir: "))
                 tree.insert(key)
                 print(f"✓ Valor {key} inserido com sucesso!")
             
             elif option == 2:
-                key = int(input("Digite o valor a remover: "))
+                key = parse_key(input("Digite o valor a remover: "))
                 tree.remove(key)
                 print(f"✓ Valor {key} removido (se existia)!")
             
             elif option == 3:
-                key = int(input("Digite o valor a buscar: "))
+                key = parse_key(input("Digite o valor a buscar: "))
                 found = tree.search(key)
                 if found:
                     print(f"✓ Valor {key} ENCONTRADO na árvore!")
@@ -103,16 +121,20 @@ def main():
                 print(f"Tipo: {tree_name}")
                 print(f"Altura: {tree.height()}")
                 print(f"Comparações acumuladas: {tree.comparisons}")
-                if hasattr(tree, 'rotations'):
+                if hasattr(tree, 'splits'):
+                    print(f"Divisões acumuladas: {tree.splits}")
+                    print(f"Fusões acumuladas: {tree.merges}")
+                    print(f"Empréstimos acumulados: {tree.borrows}")
+                elif hasattr(tree, 'rotations'):
                     print(f"Rotações acumuladas: {tree.rotations}")
-                elements = tree.inorder()
-                print(f"Número de elementos: {len(elements)}")
+                print(f"Número de elementos: {len(tree)}")
                 print("="*50)
             
             elif option == 6:
                 print_tree_menu()
-                choice = int(input("\nEscolha o novo tipo (1-3): "))
-                if choice in [1, 2, 3]:
+                choice = int(input(f"\nEscolha o novo tipo (1-{len(TREE_TYPES)}): "))
+                if choice in TREE_TYPES:
+                    tree_type = choice
                     tree, tree_name = create_tree(choice)
                     print(f"\n✓ Trocado para árvore {tree_name}!")
                 else:
@@ -121,9 +143,7 @@ def main():
             elif option == 7:
                 choice = input("Tem certeza que deseja limpar a árvore? (s/n): ")
                 if choice.lower() == 's':
-                    tree, tree_name = create_tree(
-                        1 if tree_name == "BST" else 2 if tree_name == "AVL" else 3
-                    )
+                    tree, tree_name = create_tree(tree_type)
                     print("✓ Árvore limpa!")
             
             else:
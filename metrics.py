@@ -0,0 +1,202 @@
+"""
+Instrumentação opcional das árvores: histogramas de latência e contadores
+de casos de correção (fixup)
+
+Nada aqui é ativado por padrão. TreeMetrics.attach(tree) envolve insert,
+search e remove da instância com cronômetros e registra-se em tree.hooks
+para receber os casos de rebalanceamento; detach() desfaz tudo e a árvore
+volta a executar exatamente o código original.
+"""
+
+import json
+import time
+
+# Bits significativos mantidos por balde: erro relativo máximo de 1/2**SUB_BITS
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+
+class LatencyHistogram:
+    """Histograma log-linear de latências em nanossegundos (estilo HDR).
+    
+    Valores abaixo de 2**SUB_BITS ficam em baldes exatos; acima disso cada
+    potência de 2 é dividida em 2**SUB_BITS baldes, então o erro relativo dos
+    percentis é limitado (~6%) e a memória é O(log max).
+    """
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+    
+    @staticmethod
+    def _bucket(value):
+        if value < SUB_COUNT:
+            return value
+        shift = value.bit_length() - SUB_BITS - 1
+        return ((shift + 1) << SUB_BITS) + (value >> shift) - SUB_COUNT
+    
+    @staticmethod
+    def _bucket_upper(index):
+        """Maior valor que cai no balde"""
+        if index < SUB_COUNT:
+            return index
+        shift = (index >> SUB_BITS) - 1
+        mantissa = (index & (SUB_COUNT - 1)) + SUB_COUNT
+        return ((mantissa + 1) << shift) - 1
+    
+    def record(self, value):
+        """Registra uma latência (ns)"""
+        index = self._bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def percentile(self, p):
+        """Latência no percentil p (0-100), limitada ao máximo observado"""
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._bucket_upper(index), self.max)
+        return self.max
+    
+    def mean(self):
+        return self.total / self.count if self.count else 0
+    
+    def merge(self, other):
+        """Acumula outro histograma neste"""
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+    
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ns': self.mean(),
+            'min_ns': self.min or 0,
+            'max_ns': self.max or 0,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'p999_ns': self.percentile(99.9),
+        }
+
+class TreeMetrics:
+    """Coletor de métricas que pode ser acoplado a qualquer árvore.
+    
+    Uso:
+        metrics = TreeMetrics().attach(tree)
+        ...
+        metrics.snapshot()
+        metrics.detach()
+    
+    Apenas as chamadas diretas às operações em `operations` são cronometradas;
+    operações em lote (insert_many etc.) usam os caminhos internos e contam
+    só nos contadores de fixup.
+    """
+    
+    OPERATIONS = ('insert', 'search', 'remove')
+    
+    def __init__(self, operations=OPERATIONS, clock=time.perf_counter_ns):
+        self.operations = tuple(operations)
+        self.clock = clock
+        self.latencies = {op: LatencyHistogram() for op in self.operations}
+        self.fixups = {}
+        self.tree = None
+    
+    def attach(self, tree):
+        """Instala cronômetros na instância e registra os hooks de fixup"""
+        if self.tree is not None:
+            raise RuntimeError("TreeMetrics já está acoplado a uma árvore")
+        if getattr(tree, 'hooks', None) is not None:
+            raise RuntimeError("a árvore já possui hooks instalados")
+        for op in self.operations:
+            setattr(tree, op, self._timed(getattr(tree, op), self.latencies[op]))
+        if hasattr(tree, 'hooks'):
+            tree.hooks = self
+        self.tree = tree
+        return self
+    
+    def detach(self):
+        """Remove os cronômetros; a árvore volta aos métodos da classe"""
+        tree = self.tree
+        if tree is None:
+            return
+        for op in self.operations:
+            tree.__dict__.pop(op, None)
+        if getattr(tree, 'hooks', None) is self:
+            tree.hooks = None
+        self.tree = None
+    
+    def _timed(self, method, histogram):
+        clock = self.clock
+        record = histogram.record
+        
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(clock() - start)
+        
+        return wrapper
+    
+    def on_fixup(self, case):
+        """Chamado pela árvore a cada caso de rebalanceamento aplicado"""
+        self.fixups[case] = self.fixups.get(case, 0) + 1
+    
+    def reset(self):
+        """Zera histogramas e contadores sem desacoplar"""
+        for histogram in self.latencies.values():
+            histogram.clear()
+        self.fixups = {}
+    
+    def snapshot(self):
+        """Retrato serializável das métricas atuais"""
+        tree = self.tree
+        return {
+            'timestamp': time.time(),
+            'tree': type(tree).__name__ if tree is not None else None,
+            'size': len(tree) if tree is not None else None,
+            'comparisons': getattr(tree, 'comparisons', 0),
+            'rotations': getattr(tree, 'rotations', 0),
+            'latency': {op: h.snapshot() for op, h in self.latencies.items()},
+            'fixups': dict(sorted(self.fixups.items())),
+        }
+    
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+    
+    def to_prometheus(self, prefix='tree'):
+        """Exporta o retrato no formato texto do Prometheus"""
+        snap = self.snapshot()
+        label = snap['tree'] or 'none'
+        lines = [
+            f'{prefix}_comparisons_total{{tree="{label}"}} {snap["comparisons"]}',
+            f'{prefix}_rotations_total{{tree="{label}"}} {snap["rotations"]}',
+        ]
+        for op, lat in snap['latency'].items():
+            for q, field in (('0.5', 'p50_ns'), ('0.99', 'p99_ns'), ('0.999', 'p999_ns')):
+                lines.append(f'{prefix}_op_latency_ns{{tree="{label}",op="{op}",'
+                             f'quantile="{q}"}} {lat[field]}')
+            lines.append(f'{prefix}_op_latency_ns_count{{tree="{label}",op="{op}"}} '
+                         f'{lat["count"]}')
+        for case, n in snap['fixups'].items():
+            lines.append(f'{prefix}_fixups_total{{tree="{label}",case="{case}"}} {n}')
+        return '\n'.join(lines) + '\n'
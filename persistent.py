@@ -0,0 +1,555 @@
+"""
+Variantes persistentes (imutáveis) da AVL e da Rubro-Negra
+
+Cada versão é imutável: insert, put e remove devolvem uma versão nova e a
+antiga continua válida. Só o caminho da raiz até a chave é copiado
+(path copying), então cada atualização cria O(log n) nós e todo o resto é
+compartilhado entre as versões. Guardar o histórico custa O(log n) por
+versão, em vez de uma cópia inteira da árvore.
+
+Versões são comparáveis e hashable pela identidade da raiz: duas versões
+são iguais quando compartilham exatamente a mesma raiz (por exemplo, uma
+remoção de chave ausente devolve a própria versão).
+
+A Rubro-Negra segue a formulação funcional de Okasaki (inserção) e Kahrs
+(remoção), que reconstrói os nós no caminho em vez de rotacioná-los no lugar.
+"""
+
+RED = True
+BLACK = False
+
+class _AVLNode:
+    __slots__ = ('key', 'value', 'left', 'right', 'height')
+    
+    def __init__(self, key, value, left, right):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        self.height = 1 + (left_height if left_height > right_height else right_height)
+
+class _RBNode:
+    __slots__ = ('color', 'left', 'key', 'value', 'right')
+    
+    def __init__(self, color, left, key, value, right):
+        self.color = color
+        self.left = left
+        self.key = key
+        self.value = value
+        self.right = right
+
+class _PersistentTree:
+    """Consultas comuns às duas variantes; os nós nunca são alterados"""
+    
+    def __init__(self):
+        self.root = None
+        self.comparisons = 0
+        self.rotations = 0
+        self._size = 0
+    
+    def _version(self, root, size):
+        """Nova versão com a raiz dada; herda os contadores desta"""
+        version = type(self)()
+        version.root = root
+        version._size = size
+        version.comparisons = self.comparisons
+        version.rotations = self.rotations
+        return version
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False):
+        """Constrói uma versão balanceada em O(n).
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls()
+        tree._load_sorted(keys)
+        return tree
+    
+    def __len__(self):
+        """Número de elementos da versão (O(1))"""
+        return self._size
+    
+    def __eq__(self, other):
+        return type(other) is type(self) and other.root is self.root
+    
+    def __hash__(self):
+        return hash((type(self), id(self.root)))
+    
+    def _find_node(self, key):
+        """Retorna o nó da chave ou None"""
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                node = node.right
+            else:
+                break
+        self.comparisons += comparisons
+        return node
+    
+    def search(self, key):
+        """Busca um elemento nesta versão"""
+        return self._find_node(key) is not None
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not None else default
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, em O(altura + k)"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node.key
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi]"""
+        if hi < lo:
+            return 0
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente usando uma pilha explícita (memória O(h))"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (esquerda, raiz, direita)"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (raiz, esquerda, direita)"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node.key
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def inorder(self):
+        """Percurso in-order (esquerda, raiz, direita)"""
+        return list(self.iter_inorder())
+    
+    def preorder(self):
+        """Percurso pre-order (raiz, esquerda, direita)"""
+        return list(self.iter_preorder())
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações e rotações desta versão"""
+        self.comparisons = 0
+        self.rotations = 0
+
+class PersistentAVL(_PersistentTree):
+    """AVL persistente.
+    
+    Uso:
+        v1 = PersistentAVL().insert(10).insert(20)
+        v2 = v1.remove(10)      # v1 continua com 10 e 20
+    """
+    
+    # Preenchido por _insert_node: a chave já existia na versão
+    _found = False
+    
+    def _load_sorted(self, keys):
+        """Preenche esta versão (ainda vazia) com as chaves já ordenadas"""
+        self.root = self._build_balanced(keys, 0, len(keys))
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi):
+        """Monta a subárvore de keys[lo:hi] usando o elemento do meio como raiz"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        return _AVLNode(keys[mid], None, self._build_balanced(keys, lo, mid),
+                        self._build_balanced(keys, mid + 1, hi))
+    
+    def _balance(self, key, value, left, right):
+        """Novo nó (key, value) sobre left e right, com rotação se desbalanceado"""
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        if left_height > right_height + 1:
+            inner = left.right
+            outer_height = left.left.height if left.left is not None else 0
+            if outer_height >= (inner.height if inner is not None else 0):
+                # LL: rotação simples à direita
+                self.rotations += 1
+                return _AVLNode(left.key, left.value, left.left,
+                                _AVLNode(key, value, inner, right))
+            # LR: rotação dupla
+            self.rotations += 2
+            return _AVLNode(inner.key, inner.value,
+                            _AVLNode(left.key, left.value, left.left, inner.left),
+                            _AVLNode(key, value, inner.right, right))
+        if right_height > left_height + 1:
+            inner = right.left
+            outer_height = right.right.height if right.right is not None else 0
+            if outer_height >= (inner.height if inner is not None else 0):
+                # RR: rotação simples à esquerda
+                self.rotations += 1
+                return _AVLNode(right.key, right.value,
+                                _AVLNode(key, value, left, inner), right.right)
+            # RL: rotação dupla
+            self.rotations += 2
+            return _AVLNode(inner.key, inner.value,
+                            _AVLNode(key, value, left, inner.left),
+                            _AVLNode(right.key, right.value, inner.right, right.right))
+        return _AVLNode(key, value, left, right)
+    
+    def insert(self, key):
+        """Nova versão contendo key (a própria versão se key já existe)"""
+        return self._insert(key, None, False)
+    
+    def put(self, key, value):
+        """Nova versão com value associado a key"""
+        return self._insert(key, value, True)
+    
+    def _insert(self, key, value, replace):
+        # _insert_node registra em self._found se a chave já existia
+        root = self._insert_node(self.root, key, value, replace)
+        if root is self.root:
+            return self
+        return self._version(root, self._size + (0 if self._found else 1))
+    
+    def _insert_node(self, node, key, value, replace):
+        """Copia o caminho até a posição de key; devolve node se nada mudou"""
+        if node is None:
+            self._found = False
+            return _AVLNode(key, value, None, None)
+        self.comparisons += 1
+        if key < node.key:
+            left = self._insert_node(node.left, key, value, replace)
+            if left is node.left:
+                return node
+            return self._balance(node.key, node.value, left, node.right)
+        if key > node.key:
+            right = self._insert_node(node.right, key, value, replace)
+            if right is node.right:
+                return node
+            return self._balance(node.key, node.value, node.left, right)
+        self._found = True
+        if not replace:
+            return node
+        return _AVLNode(key, value, node.left, node.right)
+    
+    def remove(self, key):
+        """Nova versão sem key (a própria versão se key não existe)"""
+        root = self._remove_node(self.root, key)
+        if root is self.root:
+            return self
+        return self._version(root, self._size - 1)
+    
+    def _remove_node(self, node, key):
+        if node is None:
+            return None
+        self.comparisons += 1
+        if key < node.key:
+            left = self._remove_node(node.left, key)
+            if left is node.left:
+                return node
+            return self._balance(node.key, node.value, left, node.right)
+        if key > node.key:
+            right = self._remove_node(node.right, key)
+            if right is node.right:
+                return node
+            return self._balance(node.key, node.value, node.left, right)
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        # Sucessor in-order sobe para o lugar do nó removido
+        right, successor = self._remove_min(node.right)
+        return self._balance(successor.key, successor.value, node.left, right)
+    
+    def _remove_min(self, node):
+        """Devolve (subárvore sem o mínimo, nó mínimo)"""
+        if node.left is None:
+            return node.right, node
+        left, minimum = self._remove_min(node.left)
+        return self._balance(node.key, node.value, left, node.right), minimum
+    
+    def height(self):
+        """Altura da versão"""
+        return self.root.height if self.root is not None else 0
+
+class PersistentRBT(_PersistentTree):
+    """Rubro-Negra persistente (mesma interface de PersistentAVL)"""
+    
+    def _load_sorted(self, keys):
+        """Preenche esta versão (ainda vazia) com as chaves já ordenadas"""
+        root = self._build_balanced(keys, 0, len(keys), 0, len(keys).bit_length() - 1)
+        # Com uma chave só o "último nível" é a raiz, que precisa ser preta
+        self.root = _blacken(root) if root is not None else None
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi, depth, red_depth):
+        """Nós pretos, exceto os do último nível (incompleto), vermelhos"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        return _RBNode(RED if depth == red_depth else BLACK,
+                       self._build_balanced(keys, lo, mid, depth + 1, red_depth),
+                       keys[mid], None,
+                       self._build_balanced(keys, mid + 1, hi, depth + 1, red_depth))
+    
+    def _balance(self, left, key, value, right):
+        """Desfaz vermelho com filho vermelho sob um nó que passa a ser o do meio"""
+        if _is_red(left) and _is_red(right):
+            # Só recoloração, sem rotação
+            return _RBNode(RED, _blacken(left), key, value, _blacken(right))
+        if _is_red(left):
+            if _is_red(left.left):
+                self.rotations += 1
+                return _RBNode(RED, _blacken(left.left), left.key, left.value,
+                               _RBNode(BLACK, left.right, key, value, right))
+            if _is_red(left.right):
+                self.rotations += 2
+                middle = left.right
+                return _RBNode(RED, _RBNode(BLACK, left.left, left.key, left.value, middle.left),
+                               middle.key, middle.value,
+                               _RBNode(BLACK, middle.right, key, value, right))
+        if _is_red(right):
+            if _is_red(right.right):
+                self.rotations += 1
+                return _RBNode(RED, _RBNode(BLACK, left, key, value, right.left),
+                               right.key, right.value, _blacken(right.right))
+            if _is_red(right.left):
+                self.rotations += 2
+                middle = right.left
+                return _RBNode(RED, _RBNode(BLACK, left, key, value, middle.left),
+                               middle.key, middle.value,
+                               _RBNode(BLACK, middle.right, right.key, right.value, right.right))
+        return _RBNode(BLACK, left, key, value, right)
+    
+    def insert(self, key):
+        """Nova versão contendo key (a própria versão se key já existe)"""
+        return self._insert(key, None, False)
+    
+    def put(self, key, value):
+        """Nova versão com value associado a key"""
+        return self._insert(key, value, True)
+    
+    def _insert(self, key, value, replace):
+        # Uma descida só; _insert_node registra em self._found se a chave já existia
+        root = self._insert_node(self.root, key, value, replace)
+        if root is self.root:
+            return self
+        return self._version(_blacken(root), self._size + (0 if self._found else 1))
+    
+    def _insert_node(self, node, key, value, replace):
+        """Copia o caminho até a posição de key; devolve node se nada mudou"""
+        if node is None:
+            self._found = False
+            return _RBNode(RED, None, key, value, None)
+        self.comparisons += 1
+        if key < node.key:
+            left = self._insert_node(node.left, key, value, replace)
+            if left is node.left:
+                return node
+            if node.color == BLACK:
+                return self._balance(left, node.key, node.value, node.right)
+            return _RBNode(RED, left, node.key, node.value, node.right)
+        if key > node.key:
+            right = self._insert_node(node.right, key, value, replace)
+            if right is node.right:
+                return node
+            if node.color == BLACK:
+                return self._balance(node.left, node.key, node.value, right)
+            return _RBNode(RED, node.left, node.key, node.value, right)
+        self._found = True
+        if not replace:
+            return node
+        return _RBNode(node.color, node.left, key, value, node.right)
+    
+    def remove(self, key):
+        """Nova versão sem key (a própria versão se key não existe)"""
+        root = self._remove_node(self.root, key)
+        if not self._found:
+            return self
+        if root is not None and root.color == RED:
+            root = _blacken(root)
+        return self._version(root, self._size - 1)
+    
+    def _remove_node(self, node, key):
+        """Remoção de Kahrs: a subárvore devolvida pode ter altura negra uma a menos
+        quando node era preto; _balance_left/_balance_right compensam no pai.
+        Chave ausente: self._found fica False e node volta intacto."""
+        if node is None:
+            self._found = False
+            return None
+        self.comparisons += 1
+        if key < node.key:
+            left = self._remove_node(node.left, key)
+            if not self._found:
+                return node
+            if _is_black_node(node.left):
+                return self._balance_left(left, node.key, node.value, node.right)
+            return _RBNode(RED, left, node.key, node.value, node.right)
+        if key > node.key:
+            right = self._remove_node(node.right, key)
+            if not self._found:
+                return node
+            if _is_black_node(node.right):
+                return self._balance_right(node.left, node.key, node.value, right)
+            return _RBNode(RED, node.left, node.key, node.value, right)
+        self._found = True
+        return self._append(node.left, node.right)
+    
+    def _balance_left(self, left, key, value, right):
+        """left perdeu um de altura negra"""
+        if _is_red(left):
+            return _RBNode(RED, _blacken(left), key, value, right)
+        if _is_black_node(right):
+            return self._balance(left, key, value, _redden(right))
+        # right é vermelho com filho esquerdo preto
+        inner = right.left
+        return _RBNode(RED, _RBNode(BLACK, left, key, value, inner.left), inner.key, inner.value,
+                       self._balance(inner.right, right.key, right.value, _redden(right.right)))
+    
+    def _balance_right(self, left, key, value, right):
+        """right perdeu um de altura negra"""
+        if _is_red(right):
+            return _RBNode(RED, left, key, value, _blacken(right))
+        if _is_black_node(left):
+            return self._balance(_redden(left), key, value, right)
+        inner = left.right
+        return _RBNode(RED, self._balance(_redden(left.left), left.key, left.value, inner.left),
+                       inner.key, inner.value, _RBNode(BLACK, inner.right, key, value, right))
+    
+    def _append(self, left, right):
+        """Junta os filhos do nó removido (todas as chaves de left < as de right)"""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if _is_red(left) and _is_red(right):
+            middle = self._append(left.right, right.left)
+            if _is_red(middle):
+                return _RBNode(RED, _RBNode(RED, left.left, left.key, left.value, middle.left),
+                               middle.key, middle.value,
+                               _RBNode(RED, middle.right, right.key, right.value, right.right))
+            return _RBNode(RED, left.left, left.key, left.value,
+                           _RBNode(RED, middle, right.key, right.value, right.right))
+        if not _is_red(left) and not _is_red(right):
+            middle = self._append(left.right, right.left)
+            if _is_red(middle):
+                return _RBNode(RED, _RBNode(BLACK, left.left, left.key, left.value, middle.left),
+                               middle.key, middle.value,
+                               _RBNode(BLACK, middle.right, right.key, right.value, right.right))
+            return self._balance_left(left.left, left.key, left.value,
+                                      _RBNode(BLACK, middle, right.key, right.value, right.right))
+        if _is_red(right):
+            return _RBNode(RED, self._append(left, right.left), right.key, right.value, right.right)
+        return _RBNode(RED, left.left, left.key, left.value, self._append(left.right, right))
+    
+    def height(self):
+        """Altura da versão (percurso em largura, sem recursão)"""
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right)
+                     if child is not None]
+        return height
+    
+    def is_valid(self):
+        """Confere raiz preta, ausência de vermelho com filho vermelho, mesma
+        altura negra em todos os caminhos e ordem das chaves"""
+        if self.root is not None and self.root.color != BLACK:
+            return False
+        black_height = {None: 1}
+        stack = [(self.root, False)] if self.root is not None else []
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                for child in (node.left, node.right):
+                    if child is not None:
+                        stack.append((child, False))
+                continue
+            if node.color == RED and (_is_red(node.left) or _is_red(node.right)):
+                return False
+            left_height = black_height[node.left] if node.left is not None else 1
+            right_height = black_height[node.right] if node.right is not None else 1
+            if left_height != right_height:
+                return False
+            black_height[node] = left_height + (1 if node.color == BLACK else 0)
+        keys = self.inorder()
+        return len(keys) == self._size and all(a < b for a, b in zip(keys, keys[1:]))
+
+def _is_red(node):
+    return node is not None and node.color == RED
+
+def _is_black_node(node):
+    """Nó preto de verdade (não a folha vazia)"""
+    return node is not None and node.color == BLACK
+
+def _blacken(node):
+    if node.color == BLACK:
+        return node
+    return _RBNode(BLACK, node.left, node.key, node.value, node.right)
+
+def _redden(node):
+    return _RBNode(RED, node.left, node.key, node.value, node.right)
@@ -5,88 +5,193 @@ Implementação de Árvore Rubro-Negra (Red-Black Tree)
 RED = True
 BLACK = False
 
+# Marca "valor ausente" em pop(), já que None é um valor válido
+_MISSING = object()
+
+def _is_sorted(keys):
+    """Indica se a sequência está em ordem não decrescente"""
+    return all(a <= b for a, b in zip(keys, keys[1:]))
+
 class RBNode:
-    def __init__(self, key, color=RED):
+    __slots__ = ('key', 'value', 'left', 'right', 'parent', 'color', 'size')
+    
+    def __init__(self, key, color=RED, value=None):
         self.key = key
+        self.value = value
         self.left = None
         self.right = None
         self.parent = None
         self.color = color
+        self.size = 1
 
 class RBT:
-    def __init__(self):
+    def __init__(self, order_statistics=False, key=None):
+        """Com order_statistics=True cada nó mantém o tamanho da sua subárvore,
+        habilitando rank() e select() em O(log n). Com key=f os elementos são
+        ordenados por f(elemento), calculada só na inserção (ver keyed.py)."""
         self.nil = RBNode(None, BLACK)
+        self.nil.size = 0
         self.root = self.nil
         self.comparisons = 0
         self.rotations = 0
+        self.order_statistics = order_statistics
+        self._size = 0
+        # Observador opcional dos casos de correção (ver metrics.py)
+        self.hooks = None
+        self.key = key
+        if key is not None:
+            from keyed import attach_key
+            attach_key(self, key)
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, order_statistics=False, key=None):
+        """Constrói uma árvore Rubro-Negra balanceada em O(n), sem rotações.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        Todos os nós são pretos, exceto os do último nível (incompleto),
+        que ficam vermelhos para igualar a altura negra de todos os caminhos.
+        """
+        if key is not None:
+            tree = cls(order_statistics, key)
+            tree._load_items(iterable, assume_sorted)
+            return tree
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls(order_statistics)
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pela árvore balanceada das chaves já ordenadas"""
+        red_depth = len(keys).bit_length() - 1
+        root = self._build_balanced(keys, 0, len(keys), 0, red_depth)
+        if root is not self.nil:
+            root.parent = None
+            root.color = BLACK
+        self.root = root
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi, depth, red_depth):
+        """Monta a subárvore de keys[lo:hi] ligando filhos, pais e o sentinela"""
+        if lo >= hi:
+            return self.nil
+        mid = (lo + hi) // 2
+        node = RBNode(keys[mid], RED if depth == red_depth else BLACK)
+        node.left = self._build_balanced(keys, lo, mid, depth + 1, red_depth)
+        node.right = self._build_balanced(keys, mid + 1, hi, depth + 1, red_depth)
+        if node.left is not self.nil:
+            node.left.parent = node
+        if node.right is not self.nil:
+            node.right.parent = node
+        node.size = hi - lo
+        return node
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
     
     def insert(self, key):
         """Insere um elemento na árvore Rubro-Negra"""
-        node = RBNode(key)
-        node.left = self.nil
-        node.right = self.nil
-        
+        self._insert_node(key)
+    
+    def _insert_node(self, key):
+        """Insere a chave se ausente e retorna o seu nó (novo ou existente)"""
+        nil = self.nil
         parent = None
         current = self.root
+        comparisons = 0
         
-        while current != self.nil:
+        while current is not nil:
             parent = current
-            self.comparisons += 1
-            if node.key < current.key:
+            comparisons += 1
+            current_key = current.key
+            if key < current_key:
                 current = current.left
-            else:
+            elif key > current_key:
                 current = current.right
+            else:
+                # Chave já existe: como BST e AVL, a árvore não guarda duplicatas
+                self.comparisons += comparisons
+                return current
+        self.comparisons += comparisons
         
+        node = RBNode(key)
+        node.left = nil
+        node.right = nil
         node.parent = parent
         
         if parent is None:
             self.root = node
-        elif node.key < parent.key:
+        elif key < parent.key:
             parent.left = node
         else:
             parent.right = node
         
-        node.color = RED
+        self._size += 1
+        if self.order_statistics:
+            ancestor = parent
+            while ancestor is not None:
+                ancestor.size += 1
+                ancestor = ancestor.parent
         self._fix_insert(node)
+        return node
     
     def _fix_insert(self, node):
         """Corrige as propriedades da árvore após inserção"""
-        while node.parent and node.parent.color == RED:
-            if node.parent == node.parent.parent.left:
-                uncle = node.parent.parent.right
+        hooks = self.hooks
+        parent = node.parent
+        while parent is not None and parent.color == RED:
+            grandparent = parent.parent
+            if parent is grandparent.left:
+                uncle = grandparent.right
                 
                 if uncle.color == RED:
                     # Caso 1: tio é vermelho
-                    node.parent.color = BLACK
+                    if hooks is not None:
+                        hooks.on_fixup('insert_case1')
+                    parent.color = BLACK
                     uncle.color = BLACK
-                    node.parent.parent.color = RED
-                    node = node.parent.parent
+                    grandparent.color = RED
+                    node = grandparent
                 else:
-                    if node == node.parent.right:
+                    if node is parent.right:
                         # Caso 2: nó é filho direito
-                        node = node.parent
+                        if hooks is not None:
+                            hooks.on_fixup('insert_case2')
+                        node = parent
                         self._rotate_left(node)
+                        parent = node.parent
                     
                     # Caso 3: nó é filho esquerdo
-                    node.parent.color = BLACK
-                    node.parent.parent.color = RED
-                    self._rotate_right(node.parent.parent)
+                    if hooks is not None:
+                        hooks.on_fixup('insert_case3')
+                    parent.color = BLACK
+                    grandparent.color = RED
+                    self._rotate_right(grandparent)
             else:
-                uncle = node.parent.parent.left
+                uncle = grandparent.left
                 
                 if uncle.color == RED:
-                    node.parent.color = BLACK
+                    if hooks is not None:
+                        hooks.on_fixup('insert_case1')
+                    parent.color = BLACK
                     uncle.color = BLACK
-                    node.parent.parent.color = RED
-                    node = node.parent.parent
+                    grandparent.color = RED
+                    node = grandparent
                 else:
-                    if node == node.parent.left:
-                        node = node.parent
+                    if node is parent.left:
+                        if hooks is not None:
+                            hooks.on_fixup('insert_case2')
+                        node = parent
                         self._rotate_right(node)
+                        parent = node.parent
                     
-                    node.parent.color = BLACK
-                    node.parent.parent.color = RED
-                    self._rotate_left(node.parent.parent)
+                    if hooks is not None:
+                        hooks.on_fixup('insert_case3')
+                    parent.color = BLACK
+                    grandparent.color = RED
+                    self._rotate_left(grandparent)
+            parent = node.parent
         
         self.root.color = BLACK
     
@@ -96,20 +201,24 @@ class RBT:
         y = x.right
         x.right = y.left
         
-        if y.left != self.nil:
+        if y.left is not self.nil:
             y.left.parent = x
         
         y.parent = x.parent
         
         if x.parent is None:
             self.root = y
-        elif x == x.parent.left:
+        elif x is x.parent.left:
             x.parent.left = y
         else:
             x.parent.right = y
         
         y.left = x
         x.parent = y
+        
+        if self.order_statistics:
+            y.size = x.size
+            x.size = 1 + x.left.size + x.right.size
 
     
     def _rotate_right(self, x):
@@ -118,130 +227,649 @@ class RBT:
         y = x.left
         x.left = y.right
         
-        if y.right != self.nil:
+        if y.right is not self.nil:
             y.right.parent = x
         
         y.parent = x.parent
         
         if x.parent is None:
             self.root = y
-        elif x == x.parent.right:
+        elif x is x.parent.right:
             x.parent.right = y
         else:
             x.parent.left = y
         
         y.right = x
         x.parent = y
+        
+        if self.order_statistics:
+            y.size = x.size
+            x.size = 1 + x.left.size + x.right.size
     
     def search(self, key):
         """Busca um elemento na árvore"""
+        nil = self.nil
         current = self.root
-        while current != self.nil:
-            self.comparisons += 1
-            if key == current.key:
+        comparisons = 0
+        while current is not nil:
+            comparisons += 1
+            current_key = current.key
+            if key == current_key:
+                self.comparisons += comparisons
                 return True
-            elif key < current.key:
+            elif key < current_key:
                 current = current.left
             else:
                 current = current.right
+        self.comparisons += comparisons
         return False
     
     def remove(self, key):
-        """Remove um elemento (versão simplificada)"""
+        """Remove um elemento da árvore"""
+        self._remove_node(key)
+    
+    def _remove_node(self, key):
+        """Remove a chave e retorna o valor que ela guardava (_MISSING se ausente)"""
         node = self._find_node(key)
-        if node == self.nil:
-            return
+        if node is self.nil:
+            return _MISSING
+        self._size -= 1
+        value = node.value
         self._delete_node(node)
-    
-    def _find_node(self, key):
-        """Encontra um nó pela chave"""
-        current = self.root
-        while current != self.nil:
-            if key == current.key:
-                return current
-            elif key < current.key:
-                current = current.left
-            else:
-                current = current.right
-        return self.nil
+        return value
     
     def _delete_node(self, node):
-        """Remove um nó (implementação simplificada)"""
-        if node.left == self.nil:
-            self._transplant(node, node.right)
-        elif node.right == self.nil:
-            self._transplant(node, node.left)
+        """Remove um nó (CLRS) e restaura as propriedades com _fix_delete"""
+        nil = self.nil
+        
+        # y é o nó que sai fisicamente da estrutura: o próprio nó ou o sucessor
+        y = node
+        if node.left is not nil and node.right is not nil:
+            y = self._minimum(node.right)
+        y_original_color = y.color
+        
+        if self.order_statistics:
+            ancestor = y.parent
+            while ancestor is not None:
+                ancestor.size -= 1
+                ancestor = ancestor.parent
+        
+        if node.left is nil:
+            x = node.right
+            self._transplant(node, x)
+        elif node.right is nil:
+            x = node.left
+            self._transplant(node, x)
         else:
-            successor = self._minimum(node.right)
-            if successor.parent != node:
-                self._transplant(successor, successor.right)
-                successor.right = node.right
-                successor.right.parent = successor
-            self._transplant(node, successor)
-            successor.left = node.left
-            successor.left.parent = successor
+            x = y.right
+            if y.parent is node:
+                # x pode ser o sentinela: o pai é necessário em _fix_delete
+                x.parent = y
+            else:
+                self._transplant(y, x)
+                y.right = node.right
+                y.right.parent = y
+            self._transplant(node, y)
+            y.left = node.left
+            y.left.parent = y
+            y.color = node.color
+            y.size = node.size
+        
+        if y_original_color == BLACK:
+            self._fix_delete(x)
+    
+    def _fix_delete(self, x):
+        """Corrige as propriedades da árvore após remoção"""
+        hooks = self.hooks
+        while x is not self.root and x.color == BLACK:
+            parent = x.parent
+            if x is parent.left:
+                sibling = parent.right
+                if sibling.color == RED:
+                    # Caso 1: irmão vermelho
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case1')
+                    sibling.color = BLACK
+                    parent.color = RED
+                    self._rotate_left(parent)
+                    sibling = parent.right
+                if sibling.left.color == BLACK and sibling.right.color == BLACK:
+                    # Caso 2: irmão preto com dois filhos pretos
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case2')
+                    sibling.color = RED
+                    x = parent
+                else:
+                    if sibling.right.color == BLACK:
+                        # Caso 3: filho direito do irmão é preto
+                        if hooks is not None:
+                            hooks.on_fixup('remove_case3')
+                        sibling.left.color = BLACK
+                        sibling.color = RED
+                        self._rotate_right(sibling)
+                        sibling = parent.right
+                    # Caso 4: filho direito do irmão é vermelho
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case4')
+                    sibling.color = parent.color
+                    parent.color = BLACK
+                    sibling.right.color = BLACK
+                    self._rotate_left(parent)
+                    x = self.root
+            else:
+                sibling = parent.left
+                if sibling.color == RED:
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case1')
+                    sibling.color = BLACK
+                    parent.color = RED
+                    self._rotate_right(parent)
+                    sibling = parent.left
+                if sibling.right.color == BLACK and sibling.left.color == BLACK:
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case2')
+                    sibling.color = RED
+                    x = parent
+                else:
+                    if sibling.left.color == BLACK:
+                        if hooks is not None:
+                            hooks.on_fixup('remove_case3')
+                        sibling.right.color = BLACK
+                        sibling.color = RED
+                        self._rotate_left(sibling)
+                        sibling = parent.left
+                    if hooks is not None:
+                        hooks.on_fixup('remove_case4')
+                    sibling.color = parent.color
+                    parent.color = BLACK
+                    sibling.left.color = BLACK
+                    self._rotate_right(parent)
+                    x = self.root
+        x.color = BLACK
     
     def _transplant(self, u, v):
         """Substitui uma subárvore por outra"""
         if u.parent is None:
             self.root = v
-        elif u == u.parent.left:
+        elif u is u.parent.left:
             u.parent.left = v
         else:
             u.parent.right = v
         v.parent = u.parent
     
+    def rank(self, key):
+        """Quantidade de chaves estritamente menores que key, em O(log n)"""
+        self._require_order_statistics('rank')
+        return self._count_below(key, False)
+    
+    def _count_below(self, key, inclusive):
+        """Conta as chaves < key (ou <= key, se inclusive) somando tamanhos de subárvores"""
+        nil = self.nil
+        count = 0
+        node = self.root
+        comparisons = 0
+        while node is not nil:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                count += 1 + node.left.size
+                node = node.right
+            else:
+                count += node.left.size + (1 if inclusive else 0)
+                break
+        self.comparisons += comparisons
+        return count
+    
+    def select(self, k):
+        """Retorna a k-ésima menor chave (k a partir de 0; negativos contam do fim)"""
+        self._require_order_statistics('select')
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError("índice fora do intervalo da árvore")
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo.
+        
+        Custo O(log n + k) para k chaves no intervalo.
+        """
+        for node in self._range_nodes(lo, hi):
+            yield node.key
+    
+    def _range_nodes(self, lo, hi):
+        """Gera os nós com chave em [lo, hi] em ordem (ver range)"""
+        nil = self.nil
+        stack = []
+        node = self.root
+        while stack or node is not nil:
+            while node is not nil:
+                if node.key < lo:
+                    # Toda a subárvore esquerda é menor que lo
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi].
+        
+        Com order_statistics=True usa os tamanhos das subárvores (O(log n));
+        caso contrário percorre o intervalo com range().
+        """
+        if hi < lo:
+            return 0
+        if self.order_statistics:
+            return self._count_below(hi, True) - self._count_below(lo, False)
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def _require_order_statistics(self, operation):
+        if not self.order_statistics:
+            raise RuntimeError(f"{operation}() requer a árvore criada com order_statistics=True")
+    
+    def insert_many(self, keys):
+        """Insere um lote de chaves; retorna quantas eram novas.
+        
+        Em uma árvore vazia o lote é ordenado uma vez e a árvore é montada
+        já balanceada em O(n), sem rotações.
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        before = self._size
+        if self._size == 0:
+            self._load_sorted(sorted(set(keys)))
+            return self._size
+        insert = self.insert
+        for key in keys:
+            insert(key)
+        return self._size - before
+    
+    def search_many(self, keys):
+        """Busca um lote de chaves; retorna um bytearray com 1 para cada encontrada.
+        
+        Se o lote estiver ordenado, cada busca recomeça do ponto mais baixo do
+        caminho anterior cujo intervalo ainda contém a chave (busca com dedo),
+        em vez de recomeçar da raiz.
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        found = bytearray(len(keys))
+        if not _is_sorted(keys):
+            search = self.search
+            for i, key in enumerate(keys):
+                if search(key):
+                    found[i] = 1
+            return found
+        
+        nil = self.nil
+        # Pilha = caminho a partir da raiz; cada nó leva o limite superior
+        # (exclusivo) da sua subárvore, ou None se ilimitado
+        stack = []
+        comparisons = 0
+        for i, key in enumerate(keys):
+            while stack:
+                upper = stack[-1][1]
+                if upper is None or key < upper:
+                    break
+                stack.pop()
+            if stack:
+                node, upper = stack[-1]
+            else:
+                node = self.root
+                upper = None
+                if node is nil:
+                    break
+                stack.append((node, None))
+            
+            while True:
+                comparisons += 1
+                node_key = node.key
+                if key == node_key:
+                    found[i] = 1
+                    break
+                if key < node_key:
+                    child = node.left
+                    upper = node_key
+                else:
+                    child = node.right
+                if child is nil:
+                    break
+                node = child
+                stack.append((node, upper))
+        self.comparisons += comparisons
+        return found
+    
+    def remove_many(self, keys):
+        """Remove um lote de chaves; retorna quantas existiam"""
+        before = self._size
+        remove = self.remove
+        for key in keys:
+            remove(key)
+        return before - self._size
+    
+    def _find_node(self, key):
+        """Encontra o nó da chave (ou o sentinela), contando comparações como search()"""
+        nil = self.nil
+        node = self.root
+        comparisons = 0
+        while node is not nil:
+            comparisons += 1
+            node_key = node.key
+            if key == node_key:
+                break
+            elif key < node_key:
+                node = node.left
+            else:
+                node = node.right
+        self.comparisons += comparisons
+        return node
+    
+    # --- Modo mapa ordenado: cada nó guarda também um valor ---
+    
+    def put(self, key, value):
+        """Associa value à chave, inserindo-a se necessário (uma única descida)"""
+        self._insert_node(key).value = value
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not self.nil else default
+    
+    def pop(self, key, default=_MISSING):
+        """Remove a chave e retorna seu valor (KeyError se ausente e sem default)"""
+        value = self._remove_node(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def floor_entry(self, key):
+        """Par (chave, valor) com a maior chave <= key, ou None"""
+        nil = self.nil
+        best = None
+        node = self.root
+        while node is not nil:
+            if key < node.key:
+                node = node.left
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.right
+        return (best.key, best.value) if best is not None else None
+    
+    def ceiling_entry(self, key):
+        """Par (chave, valor) com a menor chave >= key, ou None"""
+        nil = self.nil
+        best = None
+        node = self.root
+        while node is not nil:
+            if key > node.key:
+                node = node.right
+            else:
+                best = node
+                if key == node.key:
+                    break
+                node = node.left
+        return (best.key, best.value) if best is not None else None
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is self.nil:
+            raise KeyError(key)
+        return node.value
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        self.pop(key)
+    
     def _minimum(self, node):
         """Encontra o nó mínimo"""
-        while node.left != self.nil:
+        while node.left is not self.nil:
             node = node.left
         return node
     
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente seguindo ponteiros de pai (memória O(1))"""
+        nil = self.nil
+        node = self.root
+        if node is nil:
+            return
+        while node.left is not nil:
+            node = node.left
+        while node is not None:
+            yield node
+            if node.right is not nil:
+                node = node.right
+                while node.left is not nil:
+                    node = node.left
+            else:
+                parent = node.parent
+                while parent is not None and node is parent.right:
+                    node = parent
+                    parent = parent.parent
+                node = parent
+    
+    def _iter_nodes_reversed(self):
+        """Gera os nós em ordem decrescente seguindo ponteiros de pai"""
+        nil = self.nil
+        node = self.root
+        if node is nil:
+            return
+        while node.right is not nil:
+            node = node.right
+        while node is not None:
+            yield node
+            if node.left is not nil:
+                node = node.left
+                while node.right is not nil:
+                    node = node.right
+            else:
+                parent = node.parent
+                while parent is not None and node is parent.left:
+                    node = parent
+                    parent = parent.parent
+                node = parent
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (pilha explícita)"""
+        for node in self._iter_nodes_preorder():
+            yield node.key
+    
+    def _iter_nodes_preorder(self):
+        """Gera os nós em pre-order (ver iter_preorder)"""
+        nil = self.nil
+        stack = [self.root] if self.root is not nil else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not nil:
+                stack.append(node.right)
+            if node.left is not nil:
+                stack.append(node.left)
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso (pilha explícita)"""
+        for node in self._iter_nodes_postorder():
+            yield node.key
+    
+    def _iter_nodes_postorder(self):
+        """Gera os nós em post-order (ver iter_postorder)"""
+        nil = self.nil
+        stack = []
+        node = self.root
+        last = None
+        while stack or node is not nil:
+            if node is not nil:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not nil and top.right is not last:
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.key
+    
     def inorder(self):
         """Percurso in-order"""
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
-    
-    def _inorder_recursive(self, node, result):
-        if node != self.nil:
-            self._inorder_recursive(node.left, result)
-            result.append(node.key)
-            self._inorder_recursive(node.right, result)
+        return list(self.iter_inorder())
     
     def preorder(self):
         """Percurso pre-order"""
-        result = []
-        self._preorder_recursive(self.root, result)
-        return result
-    
-    def _preorder_recursive(self, node, result):
-        if node != self.nil:
-            result.append(node.key)
-            self._preorder_recursive(node.left, result)
-            self._preorder_recursive(node.right, result)
+        return list(self.iter_preorder())
     
     def postorder(self):
         """Percurso post-order"""
-        result = []
-        self._postorder_recursive(self.root, result)
-        return result
-    
-    def _postorder_recursive(self, node, result):
-        if node != self.nil:
-            self._postorder_recursive(node.left, result)
-            self._postorder_recursive(node.right, result)
-            result.append(node.key)
+        return list(self.iter_postorder())
     
     def height(self):
-        """Calcula a altura da árvore"""
-        return self._height_recursive(self.root)
+        """Calcula a altura da árvore (percurso em largura, sem recursão)"""
+        nil = self.nil
+        height = 0
+        level = [self.root] if self.root is not nil else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not nil:
+                    next_level.append(node.left)
+                if node.right is not nil:
+                    next_level.append(node.right)
+            level = next_level
+        return height
     
-    def _height_recursive(self, node):
-        if node == self.nil:
-            return 0
-        return 1 + max(self._height_recursive(node.left), 
-                       self._height_recursive(node.right))
+    def is_valid(self):
+        """Verifica as propriedades rubro-negras.
+        
+        Confere raiz preta, ausência de vermelho com filho vermelho, mesma
+        altura negra em todos os caminhos, ordem das chaves, ponteiros de pai
+        e tamanhos de subárvore (com order_statistics). Iterativo: funciona
+        mesmo em árvores corrompidas e muito altas.
+        """
+        nil = self.nil
+        if self.root is nil:
+            return self._size == 0
+        if self.root.color != BLACK or self.root.parent is not None:
+            return False
+        
+        black_height = {nil: 1}
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                for child in (node.left, node.right):
+                    if child is not nil:
+                        if child.parent is not node:
+                            return False
+                        stack.append((child, False))
+                continue
+            
+            if node.color == RED and (node.left.color == RED or node.right.color == RED):
+                return False
+            left_height = black_height.pop(node.left, None) if node.left is not nil else 1
+            right_height = black_height.pop(node.right, None) if node.right is not nil else 1
+            if left_height != right_height:
+                return False
+            black_height[node] = left_height + (1 if node.color == BLACK else 0)
+            if self.order_statistics and node.size != 1 + node.left.size + node.right.size:
+                return False
+        
+        keys = [node.key for node in self._iter_nodes()]
+        if len(keys) != self._size:
+            return False
+        return all(keys[i] < keys[i + 1] for i in range(len(keys) - 1))
+    
+    def save(self, path):
+        """Grava um snapshot binário da árvore (ver snapshot.py)"""
+        from snapshot import save_tree
+        save_tree(self, path)
+    
+    @classmethod
+    def load(cls, path, order_statistics=False, key=None):
+        """Carrega um snapshot via mmap, sem reinserir nem rotacionar.
+        
+        Snapshots de árvores com key= exigem a mesma função em key.
+        """
+        from snapshot import load_tree
+        return load_tree(path, cls, order_statistics, key)
+    
+    def union(self, other):
+        """Passa a conter as chaves das duas árvores, em O(m log(n/m + 1)).
+        
+        Destrutiva: reaproveita os nós de other, que fica vazia (ver setops.py).
+        """
+        from setops import union
+        union(self, other)
+    
+    def intersection(self, other):
+        """Mantém só as chaves presentes também em other; other fica vazia"""
+        from setops import intersection
+        intersection(self, other)
+    
+    def difference(self, other):
+        """Remove as chaves presentes em other; other fica vazia"""
+        from setops import difference
+        difference(self, other)
+    
+    def merge(self, other):
+        """Nova árvore com as chaves das duas, montada em O(n + m); não altera as entradas"""
+        from setops import merge
+        return merge(self, other)
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
     
     def reset_metrics(self):
         """Reseta as métricas de comparações e rotações"""
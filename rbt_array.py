@@ -0,0 +1,494 @@
+"""
+Implementação de Árvore Rubro-Negra com armazenamento compacto em arrays
+
+Os nós não são objetos Python: cada campo fica numa coluna array.array
+(chave, filho esquerdo, filho direito, pai, cor) e um nó é apenas um índice.
+O índice 0 faz o papel do sentinela nil (sempre preto). Posições liberadas
+por remoções formam uma lista livre encadeada pela coluna de filhos
+esquerdos e são reutilizadas. Aceita apenas chaves inteiras de 64 bits.
+"""
+
+from array import array
+
+NIL = 0
+RED = 1
+BLACK = 0
+
+class ArrayRBT:
+    def __init__(self):
+        self.keys = array('q', [0])
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.parent = array('i', [NIL])
+        self.colors = array('b', [BLACK])
+        self.root = NIL
+        self._free = NIL
+        self._size = 0
+        self.comparisons = 0
+        self.rotations = 0
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False):
+        """Constrói uma árvore Rubro-Negra balanceada em O(n), sem rotações.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        Os nós ocupam as posições 1..n na ordem das chaves; apenas o último
+        nível (incompleto) fica vermelho.
+        """
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        n = len(keys)
+        tree = cls()
+        tree._size = n
+        tree.keys.extend(keys)
+        tree.left = array('i', bytes(4 * (n + 1)))
+        tree.right = array('i', bytes(4 * (n + 1)))
+        tree.parent = array('i', bytes(4 * (n + 1)))
+        tree.colors = array('b', bytes(n + 1))
+        root = tree._build_balanced(1, n + 1, 0, n.bit_length() - 1)
+        tree.colors[root] = BLACK
+        tree.root = root
+        return tree
+    
+    def _build_balanced(self, lo, hi, depth, red_depth):
+        """Liga as posições lo..hi-1 usando a do meio como raiz"""
+        if lo >= hi:
+            return NIL
+        mid = (lo + hi) // 2
+        left = self.left[mid] = self._build_balanced(lo, mid, depth + 1, red_depth)
+        right = self.right[mid] = self._build_balanced(mid + 1, hi, depth + 1, red_depth)
+        if left != NIL:
+            self.parent[left] = mid
+        if right != NIL:
+            self.parent[right] = mid
+        if depth == red_depth:
+            self.colors[mid] = RED
+        return mid
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
+    
+    def _new_node(self, key):
+        """Aloca um nó vermelho, reutilizando uma posição da lista livre"""
+        node = self._free
+        if node != NIL:
+            self._free = self.left[node]
+            self.keys[node] = key
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.parent[node] = NIL
+            self.colors[node] = RED
+            return node
+        self.keys.append(key)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.parent.append(NIL)
+        self.colors.append(RED)
+        return len(self.keys) - 1
+    
+    def _free_node(self, node):
+        """Devolve a posição de um nó removido à lista livre"""
+        self.left[node] = self._free
+        self.right[node] = NIL
+        self.parent[node] = NIL
+        self._free = node
+    
+    def insert(self, key):
+        """Insere um elemento na árvore Rubro-Negra"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        parent = NIL
+        current = self.root
+        
+        while current != NIL:
+            parent = current
+            self.comparisons += 1
+            node_key = keys[current]
+            if key < node_key:
+                current = left[current]
+            elif key > node_key:
+                current = right[current]
+            else:
+                return
+        
+        node = self._new_node(key)
+        self._size += 1
+        self.parent[node] = parent
+        
+        if parent == NIL:
+            self.root = node
+        elif key < keys[parent]:
+            left[parent] = node
+        else:
+            right[parent] = node
+        
+        self._fix_insert(node)
+    
+    def _fix_insert(self, node):
+        """Corrige as propriedades da árvore após inserção"""
+        left = self.left
+        right = self.right
+        parent = self.parent
+        colors = self.colors
+        while colors[parent[node]] == RED:
+            p = parent[node]
+            g = parent[p]
+            if p == left[g]:
+                uncle = right[g]
+                if colors[uncle] == RED:
+                    # Caso 1: tio é vermelho
+                    colors[p] = BLACK
+                    colors[uncle] = BLACK
+                    colors[g] = RED
+                    node = g
+                else:
+                    if node == right[p]:
+                        # Caso 2: nó é filho direito
+                        node = p
+                        self._rotate_left(node)
+                        p = parent[node]
+                    # Caso 3: nó é filho esquerdo
+                    colors[p] = BLACK
+                    colors[g] = RED
+                    self._rotate_right(g)
+            else:
+                uncle = left[g]
+                if colors[uncle] == RED:
+                    colors[p] = BLACK
+                    colors[uncle] = BLACK
+                    colors[g] = RED
+                    node = g
+                else:
+                    if node == left[p]:
+                        node = p
+                        self._rotate_right(node)
+                        p = parent[node]
+                    colors[p] = BLACK
+                    colors[g] = RED
+                    self._rotate_left(g)
+        
+        colors[self.root] = BLACK
+    
+    def _rotate_left(self, x):
+        """Rotação à esquerda"""
+        self.rotations += 1
+        left = self.left
+        right = self.right
+        parent = self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+        parent[y] = parent[x]
+        if parent[x] == NIL:
+            self.root = y
+        elif x == left[parent[x]]:
+            left[parent[x]] = y
+        else:
+            right[parent[x]] = y
+        left[y] = x
+        parent[x] = y
+    
+    def _rotate_right(self, x):
+        """Rotação à direita"""
+        self.rotations += 1
+        left = self.left
+        right = self.right
+        parent = self.parent
+        y = left[x]
+        left[x] = right[y]
+        if right[y] != NIL:
+            parent[right[y]] = x
+        parent[y] = parent[x]
+        if parent[x] == NIL:
+            self.root = y
+        elif x == right[parent[x]]:
+            right[parent[x]] = y
+        else:
+            left[parent[x]] = y
+        right[y] = x
+        parent[x] = y
+    
+    def search(self, key):
+        """Busca um elemento na árvore"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        current = self.root
+        while current != NIL:
+            self.comparisons += 1
+            node_key = keys[current]
+            if key == node_key:
+                return True
+            elif key < node_key:
+                current = left[current]
+            else:
+                current = right[current]
+        return False
+    
+    def remove(self, key):
+        """Remove um elemento da árvore"""
+        node = self._find_node(key)
+        if node == NIL:
+            return
+        self._delete_node(node)
+    
+    def _find_node(self, key):
+        """Encontra um nó pela chave"""
+        keys = self.keys
+        current = self.root
+        while current != NIL:
+            self.comparisons += 1
+            node_key = keys[current]
+            if key == node_key:
+                return current
+            elif key < node_key:
+                current = self.left[current]
+            else:
+                current = self.right[current]
+        return NIL
+    
+    def _delete_node(self, z):
+        """Remove um nó e restaura as propriedades rubro-negras"""
+        left = self.left
+        right = self.right
+        parent = self.parent
+        colors = self.colors
+        y = z
+        y_color = colors[y]
+        if left[z] == NIL:
+            x = right[z]
+            self._transplant(z, x)
+        elif right[z] == NIL:
+            x = left[z]
+            self._transplant(z, x)
+        else:
+            # Sucessor: conta a descida como o ArrayAVL
+            y = right[z]
+            self.comparisons += 1
+            while left[y] != NIL:
+                y = left[y]
+                self.comparisons += 1
+            y_color = colors[y]
+            x = right[y]
+            if parent[y] == z:
+                parent[x] = y
+            else:
+                self._transplant(y, x)
+                right[y] = right[z]
+                parent[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+            colors[y] = colors[z]
+        
+        self._free_node(z)
+        self._size -= 1
+        if y_color == BLACK:
+            self._fix_delete(x)
+    
+    def _fix_delete(self, x):
+        """Corrige as propriedades da árvore após remoção"""
+        left = self.left
+        right = self.right
+        parent = self.parent
+        colors = self.colors
+        while x != self.root and colors[x] == BLACK:
+            p = parent[x]
+            if x == left[p]:
+                w = right[p]
+                if colors[w] == RED:
+                    colors[w] = BLACK
+                    colors[p] = RED
+                    self._rotate_left(p)
+                    w = right[p]
+                if colors[left[w]] == BLACK and colors[right[w]] == BLACK:
+                    colors[w] = RED
+                    x = p
+                else:
+                    if colors[right[w]] == BLACK:
+                        colors[left[w]] = BLACK
+                        colors[w] = RED
+                        self._rotate_right(w)
+                        w = right[p]
+                    colors[w] = colors[p]
+                    colors[p] = BLACK
+                    colors[right[w]] = BLACK
+                    self._rotate_left(p)
+                    x = self.root
+            else:
+                w = left[p]
+                if colors[w] == RED:
+                    colors[w] = BLACK
+                    colors[p] = RED
+                    self._rotate_right(p)
+                    w = left[p]
+                if colors[left[w]] == BLACK and colors[right[w]] == BLACK:
+                    colors[w] = RED
+                    x = p
+                else:
+                    if colors[left[w]] == BLACK:
+                        colors[right[w]] = BLACK
+                        colors[w] = RED
+                        self._rotate_left(w)
+                        w = left[p]
+                    colors[w] = colors[p]
+                    colors[p] = BLACK
+                    colors[left[w]] = BLACK
+                    self._rotate_right(p)
+                    x = self.root
+        colors[x] = BLACK
+    
+    def _transplant(self, u, v):
+        """Substitui uma subárvore por outra"""
+        parent = self.parent
+        pu = parent[u]
+        if pu == NIL:
+            self.root = v
+        elif u == self.left[pu]:
+            self.left[pu] = v
+        else:
+            self.right[pu] = v
+        parent[v] = pu
+    
+    def _minimum(self, node):
+        """Encontra o nó mínimo"""
+        left = self.left
+        while left[node] != NIL:
+            node = left[node]
+        return node
+    
+    def _iter_nodes(self):
+        """Gera os índices dos nós em ordem crescente (pilha explícita)"""
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            yield node
+            node = right[node]
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso"""
+        keys = self.keys
+        for node in self._iter_nodes():
+            yield keys[node]
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            yield keys[node]
+            if right[node] != NIL:
+                stack.append(right[node])
+            if left[node] != NIL:
+                stack.append(left[node])
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        last = NIL
+        while stack or node != NIL:
+            if node != NIL:
+                stack.append(node)
+                node = left[node]
+            else:
+                top = stack[-1]
+                if right[top] != NIL and right[top] != last:
+                    node = right[top]
+                else:
+                    yield keys[top]
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = right[node]
+            node = stack.pop()
+            yield keys[node]
+            node = left[node]
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo"""
+        keys = self.keys
+        left = self.left
+        right = self.right
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                if keys[node] < lo:
+                    node = right[node]
+                else:
+                    stack.append(node)
+                    node = left[node]
+            if not stack:
+                return
+            node = stack.pop()
+            if keys[node] > hi:
+                return
+            yield keys[node]
+            node = right[node]
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi] (percorre o intervalo)"""
+        if hi < lo:
+            return 0
+        return sum(1 for _ in self.range(lo, hi))
+    
+    def inorder(self):
+        """Percurso in-order"""
+        return list(self.iter_inorder())
+    
+    def preorder(self):
+        """Percurso pre-order"""
+        return list(self.iter_preorder())
+    
+    def postorder(self):
+        """Percurso post-order"""
+        return list(self.iter_postorder())
+    
+    def height(self):
+        """Calcula a altura da árvore (percurso em largura, sem recursão)"""
+        left = self.left
+        right = self.right
+        height = 0
+        level = [self.root] if self.root != NIL else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if left[node] != NIL:
+                    next_level.append(left[node])
+                if right[node] != NIL:
+                    next_level.append(right[node])
+            level = next_level
+        return height
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações e rotações"""
+        self.comparisons = 0
+        self.rotations = 0
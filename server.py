@@ -0,0 +1,389 @@
+"""
+Serviço de índice em memória: as árvores expostas por um socket (asyncio)
+
+Protocolo de linhas (ASCII, uma requisição e uma resposta por linha):
+
+    CREATE <nome> <tipo>        tipo: BST, AVL, RBT, B-Tree, Splay, Treap
+    DROP <nome>
+    LIST                        OK nome:tipo ...
+    INSERT <nome> <k1> [k2 ...] OK
+    REMOVE <nome> <k1> [k2 ...] OK
+    SEARCH <nome> <k1> [k2 ...] OK 101   (um dígito por chave)
+    RANGE <nome> <lo> <hi>      OK k1 k2 ...
+    COUNT <nome> <lo> <hi>      OK n
+    LEN <nome>                  OK n
+    STATS <nome>                OK comparisons=... rotations=... size=...
+    PING                        OK PONG
+
+Erros voltam como "ERR <mensagem>". Chaves que parecem inteiros viram int,
+as demais ficam como texto. O primeiro INSERT fixa o tipo das chaves da
+árvore; requisições que misturam tipos ou usam o outro tipo recebem ERR
+antes de entrar na fila, sem alterar a árvore.
+
+Pipelining: o cliente pode enviar várias linhas sem esperar; as respostas
+saem na ordem das requisições. Micro-batching: cada árvore tem uma fila e
+uma tarefa que a esvazia; INSERT, REMOVE e SEARCH consecutivos na fila (de
+qualquer conexão) viram uma única chamada a insert_many/remove_many/
+search_many. Backpressure: cada conexão tem no máximo max_pipeline
+respostas pendentes e cada árvore no máximo max_queue requisições na fila;
+acima disso a conexão para de ler o socket e o TCP segura o cliente.
+
+Uso:
+    python server.py --port 7070 --tree idx:AVL
+"""
+
+import argparse
+import asyncio
+
+from main import TREE_TYPES, parse_key
+
+# Tipos aceitos em CREATE, pelo nome curto (sem diferenciar maiúsculas)
+TREE_CLASSES = {name.lower(): tree_class for tree_class, name, _ in TREE_TYPES.values()}
+
+# Comandos agrupados em uma única passada pela árvore
+BATCHED = {'INSERT': 'insert_many', 'REMOVE': 'remove_many', 'SEARCH': 'search_many'}
+
+def _run_many(tree, method, keys):
+    """Chama a operação em lote da árvore, ou a unitária chave a chave se não houver"""
+    many = getattr(tree, method, None)
+    if many is not None:
+        return many(keys)
+    if method == 'search_many':
+        return bytearray(1 if tree.search(key) else 0 for key in keys)
+    single = tree.insert if method == 'insert_many' else tree.remove
+    for key in keys:
+        single(key)
+    return None
+
+class _TreeEntry:
+    """Árvore nomeada com a sua fila de requisições"""
+    
+    __slots__ = ('tree', 'type_name', 'queue', 'task', 'key_type')
+    
+    def __init__(self, tree, type_name, max_queue):
+        self.tree = tree
+        self.type_name = type_name
+        self.queue = asyncio.Queue(max_queue)
+        self.task = None
+        # int ou str, fixado pelo primeiro INSERT
+        self.key_type = None
+    
+    def check_keys(self, keys, fix=False):
+        """Exige chaves de um só tipo e do tipo da árvore.
+        
+        Validar na entrada garante que o lote não falhe no meio por chaves
+        incomparáveis, o que deixaria parte dele aplicada.
+        """
+        kinds = {type(key) for key in keys}
+        if len(kinds) > 1:
+            raise ValueError("a requisição mistura chaves inteiras e de texto")
+        kind = kinds.pop()
+        if self.key_type is None:
+            if fix:
+                self.key_type = kind
+        elif kind is not self.key_type:
+            expected = "inteiras" if self.key_type is int else "de texto"
+            raise ValueError(f"a árvore usa chaves {expected}")
+        return keys
+
+class TreeServer:
+    """Servidor asyncio que guarda árvores nomeadas.
+    
+    Uso:
+        server = TreeServer()
+        await server.start(port=7070)        # ou start(path='/tmp/arvores.sock')
+        ...
+        await server.close()
+    
+    batch_delay (s) é quanto a tarefa de uma árvore espera, depois da
+    primeira requisição, para juntar outras no mesmo lote; com 0 ela cede o
+    laço uma vez, o suficiente para agrupar o que já chegou.
+    """
+    
+    def __init__(self, max_batch=4096, batch_delay=0, max_pipeline=1024, max_queue=8192,
+                 max_line=1 << 20):
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.max_pipeline = max_pipeline
+        self.max_queue = max_queue
+        self.max_line = max_line
+        self.trees = {}
+        self.batches = 0
+        self.requests = 0
+        self._server = None
+        self._connections = {}
+    
+    # --- Ciclo de vida ---
+    
+    async def start(self, host='127.0.0.1', port=7070, path=None):
+        """Começa a aceitar conexões TCP (ou Unix, se path for dado)"""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path,
+                                                           limit=self.max_line)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port,
+                                                      limit=self.max_line)
+        return self
+    
+    @property
+    def address(self):
+        """Endereço efetivo (útil com port=0)"""
+        return self._server.sockets[0].getsockname()
+    
+    async def serve_forever(self):
+        await self._server.serve_forever()
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Fecha as conexões abertas e espera os handlers terminarem
+        for writer in list(self._connections.values()):
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        for name in list(self.trees):
+            await self.drop(name)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    # --- Árvores nomeadas ---
+    
+    def create(self, name, type_name):
+        if name in self.trees:
+            raise ValueError(f"árvore já existe: {name}")
+        tree_class = TREE_CLASSES.get(type_name.lower())
+        if tree_class is None:
+            raise ValueError(f"tipo desconhecido: {type_name}")
+        entry = _TreeEntry(tree_class(), tree_class.__name__, self.max_queue)
+        entry.task = asyncio.get_running_loop().create_task(self._drain(entry))
+        self.trees[name] = entry
+        return entry.tree
+    
+    async def drop(self, name):
+        """Remove a árvore depois de atender o que já estava na fila dela"""
+        entry = self.trees.pop(name, None)
+        if entry is None:
+            raise KeyError(name)
+        await entry.queue.put(None)
+        await entry.task
+    
+    def _entry(self, name):
+        entry = self.trees.get(name)
+        if entry is None:
+            raise KeyError(f"árvore inexistente: {name}")
+        return entry
+    
+    # --- Execução em lotes ---
+    
+    async def _drain(self, entry):
+        """Tarefa de uma árvore: junta as requisições da fila e executa em lotes"""
+        queue = entry.queue
+        while True:
+            first = await queue.get()
+            if first is None:
+                return
+            await asyncio.sleep(self.batch_delay)
+            batch = [first]
+            closing = False
+            while len(batch) < self.max_batch and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            self._execute(entry.tree, batch)
+            if closing:
+                return
+    
+    def _execute(self, tree, batch):
+        """Executa um lote em ordem; comandos iguais consecutivos viram uma chamada só"""
+        self.batches += 1
+        self.requests += len(batch)
+        i = 0
+        while i < len(batch):
+            command = batch[i][0]
+            j = i + 1
+            if command in BATCHED:
+                while j < len(batch) and batch[j][0] == command:
+                    j += 1
+                self._execute_run(tree, command, batch[i:j])
+            else:
+                _, args, future = batch[i]
+                try:
+                    result = self._execute_single(tree, command, args)
+                except Exception as exc:
+                    future.set_result(f"ERR {exc}")
+                else:
+                    future.set_result(result)
+            i = j
+    
+    def _execute_run(self, tree, command, run):
+        keys = [key for _, request_keys, _ in run for key in request_keys]
+        try:
+            result = _run_many(tree, BATCHED[command], keys)
+        except Exception as exc:
+            if len(run) == 1:
+                run[0][2].set_result(f"ERR {exc}")
+                return
+            # Refaz requisição a requisição para só a culpada receber o erro
+            # (inserir, remover e buscar de novo não mudam o resultado)
+            for request in run:
+                self._execute_run(tree, command, [request])
+            return
+        if command != 'SEARCH':
+            for _, _, future in run:
+                future.set_result("OK")
+            return
+        start = 0
+        for _, request_keys, future in run:
+            end = start + len(request_keys)
+            future.set_result("OK " + "".join("1" if hit else "0" for hit in result[start:end]))
+            start = end
+    
+    def _execute_single(self, tree, command, args):
+        if command == 'RANGE':
+            lo, hi = args
+            return " ".join(["OK"] + [str(key) for key in tree.range(lo, hi)])
+        if command == 'COUNT':
+            lo, hi = args
+            return f"OK {tree.count_range(lo, hi)}"
+        if command == 'LEN':
+            return f"OK {len(tree)}"
+        if command == 'STATS':
+            return (f"OK comparisons={tree.comparisons} "
+                    f"rotations={getattr(tree, 'rotations', 0)} size={len(tree)}")
+        raise ValueError(f"comando desconhecido: {command}")
+    
+    # --- Conexões ---
+    
+    async def _submit(self, line):
+        """Interpreta uma linha; devolve um future com a resposta"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        parts = line.split()
+        if not parts:
+            future.set_result("ERR linha vazia")
+            return future
+        command = parts[0].upper()
+        try:
+            if command == 'PING':
+                future.set_result("OK PONG")
+            elif command == 'LIST':
+                future.set_result(" ".join(["OK"] + [f"{name}:{entry.type_name}"
+                                                     for name, entry in self.trees.items()]))
+            elif command == 'CREATE':
+                if len(parts) != 3:
+                    raise ValueError("uso: CREATE <nome> <tipo>")
+                self.create(parts[1], parts[2])
+                future.set_result("OK")
+            elif command == 'DROP':
+                if len(parts) != 2:
+                    raise ValueError("uso: DROP <nome>")
+                await self.drop(parts[1])
+                future.set_result("OK")
+            elif command in BATCHED:
+                if len(parts) < 3:
+                    raise ValueError(f"uso: {command} <nome> <chave> [chave ...]")
+                entry = self._entry(parts[1])
+                keys = entry.check_keys([parse_key(token) for token in parts[2:]],
+                                        fix=command == 'INSERT')
+                await entry.queue.put((command, keys, future))
+            elif command in ('RANGE', 'COUNT'):
+                if len(parts) != 4:
+                    raise ValueError(f"uso: {command} <nome> <lo> <hi>")
+                entry = self._entry(parts[1])
+                bounds = entry.check_keys([parse_key(parts[2]), parse_key(parts[3])])
+                await entry.queue.put((command, tuple(bounds), future))
+            elif command in ('LEN', 'STATS'):
+                if len(parts) != 2:
+                    raise ValueError(f"uso: {command} <nome>")
+                await self._entry(parts[1]).queue.put((command, None, future))
+            else:
+                raise ValueError(f"comando desconhecido: {command}")
+        except (KeyError, ValueError) as exc:
+            future.set_result(f"ERR {exc.args[0] if exc.args else exc}")
+        return future
+    
+    async def _handle(self, reader, writer):
+        """Uma conexão: lê requisições em pipeline e responde na mesma ordem"""
+        handler = asyncio.current_task()
+        self._connections[handler] = writer
+        pending = asyncio.Queue(self.max_pipeline)
+        sender = asyncio.get_running_loop().create_task(self._send(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await pending.put(self._error("linha longa demais"))
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                # Fila cheia: para de ler e deixa o TCP segurar o cliente
+                await pending.put(await self._submit(line.decode()))
+        finally:
+            await pending.put(None)
+            await sender
+            del self._connections[handler]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    def _error(self, message):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(f"ERR {message}")
+        return future
+    
+    async def _send(self, pending, writer):
+        """Escreve as respostas em ordem; esvazia o buffer quando não há mais prontas"""
+        try:
+            while True:
+                future = await pending.get()
+                if future is None:
+                    break
+                writer.write((await future).encode() + b"\n")
+                if pending.empty():
+                    await writer.drain()
+        except ConnectionError:
+            # Cliente foi embora: descarta as respostas restantes
+            while await pending.get() is not None:
+                pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serviço de árvores em memória")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7070)
+    parser.add_argument('--unix', help="caminho de um socket Unix (no lugar de TCP)")
+    parser.add_argument('--tree', action='append', default=[], metavar='NOME:TIPO',
+                        help="árvore criada na partida (pode repetir)")
+    parser.add_argument('--max-batch', type=int, default=4096)
+    parser.add_argument('--batch-delay', type=float, default=0,
+                        help="espera (s) para juntar requisições em um lote")
+    return parser.parse_args()
+
+async def main(args):
+    server = TreeServer(max_batch=args.max_batch, batch_delay=args.batch_delay)
+    for spec in args.tree:
+        name, _, type_name = spec.partition(':')
+        server.create(name, type_name or 'AVL')
+    await server.start(args.host, args.port, args.unix)
+    print(f"Servindo em {args.unix or server.address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
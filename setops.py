@@ -0,0 +1,417 @@
+"""
+Álgebra de conjuntos nas árvores balanceadas (AVL e RBT) baseada em join
+
+Tudo é construído sobre uma única primitiva por tipo de árvore:
+join(L, k, R), que junta duas árvores balanceadas com todas as chaves de L
+menores que k e todas as de R maiores, em tempo proporcional à diferença de
+altura. A partir dela, split, união, interseção e diferença seguem o
+esquema de divisão e conquista de Blelloch, Ferizovic e Sun ("Just Join
+for Parallel Ordered Sets"), em O(m log(n/m + 1)) para árvores de tamanhos
+m <= n. Com m pequeno isso é bem menos que reinserir ou percorrer tudo.
+
+As operações são destrutivas: reaproveitam os nós das duas árvores, o
+resultado fica em tree e other é esvaziada. Em chaves repetidas o valor
+(modo mapa) de tree prevalece.
+
+merge() é a alternativa linear e não destrutiva: intercala os percursos
+ordenados das duas árvores e monta uma árvore nova já balanceada em O(n + m).
+"""
+
+from avl import AVL
+from rbt import RBT, RBNode, RED, BLACK
+
+class _JoinAlgebra:
+    """Algoritmos genéricos; as subclasses definem is_empty, expose e join"""
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self.comparisons = 0
+        self.rotations = 0
+        # Chaves de uma árvore encontradas na outra durante os splits
+        self.found = 0
+    
+    def split(self, t, key):
+        """Divide t em (chaves < key, nó de key ou None, chaves > key)"""
+        if self.is_empty(t):
+            return t, None, t
+        left, node, right = self.expose(t)
+        self.comparisons += 1
+        if key < node.key:
+            left_left, found, left_right = self.split(left, key)
+            return left_left, found, self.join(left_right, node, right)
+        if key > node.key:
+            right_left, found, right_right = self.split(right, key)
+            return self.join(left, node, right_left), found, right_right
+        return left, node, right
+    
+    def split_last(self, t):
+        """Separa o nó da maior chave de t; retorna (resto, nó)"""
+        left, node, right = self.expose(t)
+        if self.is_empty(right):
+            return left, node
+        rest, last = self.split_last(right)
+        return self.join(left, node, rest), last
+    
+    def join2(self, left, right):
+        """join sem chave do meio: usa a maior chave de left"""
+        if self.is_empty(left):
+            return right
+        rest, last = self.split_last(left)
+        return self.join(rest, last, right)
+    
+    def union(self, t1, t2):
+        if self.is_empty(t1):
+            return t2
+        if self.is_empty(t2):
+            return t1
+        left1, node, right1 = self.expose(t1)
+        left2, found, right2 = self.split(t2, node.key)
+        if found is not None:
+            self.found += 1
+        return self.join(self.union(left1, left2), node, self.union(right1, right2))
+    
+    def intersection(self, t1, t2):
+        if self.is_empty(t1):
+            return t1
+        if self.is_empty(t2):
+            return t2
+        left1, node, right1 = self.expose(t1)
+        left2, found, right2 = self.split(t2, node.key)
+        left = self.intersection(left1, left2)
+        right = self.intersection(right1, right2)
+        if found is not None:
+            self.found += 1
+            return self.join(left, node, right)
+        return self.join2(left, right)
+    
+    def difference(self, t1, t2):
+        if self.is_empty(t1) or self.is_empty(t2):
+            return t1
+        left2, node, right2 = self.expose(t2)
+        left1, found, right1 = self.split(t1, node.key)
+        if found is not None:
+            self.found += 1
+        return self.join2(self.difference(left1, left2), self.difference(right1, right2))
+
+class _AVLAlgebra(_JoinAlgebra):
+    """Subárvore = nó (None para vazia); altura guardada em cada nó"""
+    
+    def is_empty(self, t):
+        return t is None
+    
+    def expose(self, t):
+        return t.left, t, t.right
+    
+    def _link(self, left, node, right):
+        """Pendura left e right em node e recalcula altura e tamanho"""
+        node.left = left
+        node.right = right
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        node.size = 1 + (left.size if left is not None else 0) + (right.size if right is not None else 0)
+        return node
+    
+    def _rotate_left(self, x):
+        self.rotations += 1
+        y = x.right
+        self._link(x.left, x, y.left)
+        return self._link(x, y, y.right)
+    
+    def _rotate_right(self, x):
+        self.rotations += 1
+        y = x.left
+        self._link(y.right, x, x.right)
+        return self._link(y.left, y, x)
+    
+    def join(self, left, node, right):
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        if left_height > right_height + 1:
+            return self._join_right(left, node, right)
+        if right_height > left_height + 1:
+            return self._join_left(left, node, right)
+        return self._link(left, node, right)
+    
+    def _join_right(self, tl, node, tr):
+        """left é mais alta: desce pela espinha direita dela até caber tr"""
+        left, middle = tl.left, tl.right
+        left_height = left.height if left is not None else 0
+        tr_height = tr.height if tr is not None else 0
+        if (middle.height if middle is not None else 0) <= tr_height + 1:
+            t = self._link(middle, node, tr)
+            if t.height <= left_height + 1:
+                return self._link(left, tl, t)
+            return self._rotate_left(self._link(left, tl, self._rotate_right(t)))
+        t = self._join_right(middle, node, tr)
+        joined = self._link(left, tl, t)
+        if t.height <= left_height + 1:
+            return joined
+        return self._rotate_left(joined)
+    
+    def _join_left(self, tl, node, tr):
+        """Espelho de _join_right: right é mais alta"""
+        middle, right = tr.left, tr.right
+        right_height = right.height if right is not None else 0
+        tl_height = tl.height if tl is not None else 0
+        if (middle.height if middle is not None else 0) <= tl_height + 1:
+            t = self._link(tl, node, middle)
+            if t.height <= right_height + 1:
+                return self._link(t, tr, right)
+            return self._rotate_right(self._link(self._rotate_left(t), tr, right))
+        t = self._join_left(tl, node, middle)
+        joined = self._link(t, tr, right)
+        if t.height <= right_height + 1:
+            return joined
+        return self._rotate_right(joined)
+    
+    def prepare(self, other):
+        """Subárvores iniciais das duas árvores"""
+        if self.tree.order_statistics and not other.order_statistics:
+            _fix_sizes(other.root, None)
+        return self.tree.root, other.root
+    
+    def finish(self, t, other):
+        self.tree.root = t
+        other.root = None
+
+class _RBAlgebra(_JoinAlgebra):
+    """Subárvore = (nó, altura negra); o sentinela de tree é a folha comum"""
+    
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.nil = tree.nil
+    
+    def is_empty(self, t):
+        return t[0] is self.nil
+    
+    def _black_height(self, node):
+        """Nós pretos no caminho até a folha pela esquerda, contando node"""
+        height = 0
+        while node is not self.nil:
+            if node.color == BLACK:
+                height += 1
+            node = node.left
+        return height
+    
+    def _black_root(self, node, black_height):
+        """Pinta uma raiz vermelha de preto (sempre válido); _join_right/_join_left
+        assumem as duas raízes pretas"""
+        if node.color == RED:
+            node.color = BLACK
+            black_height += 1
+        return node, black_height
+    
+    def expose(self, t):
+        node, black_height = t
+        child_height = black_height - (1 if node.color == BLACK else 0)
+        return (node.left, child_height), node, (node.right, child_height)
+    
+    def _link(self, left, node, right):
+        """Pendura left e right em node, ajustando pais e tamanho"""
+        nil = self.nil
+        node.left = left
+        node.right = right
+        if left is not nil:
+            left.parent = node
+        if right is not nil:
+            right.parent = node
+        node.size = 1 + left.size + right.size
+        return node
+    
+    def _rotate_left(self, x):
+        self.rotations += 1
+        y = x.right
+        self._link(x.left, x, y.left)
+        return self._link(x, y, y.right)
+    
+    def _rotate_right(self, x):
+        self.rotations += 1
+        y = x.left
+        self._link(y.right, x, x.right)
+        return self._link(y.left, y, x)
+    
+    def join(self, left, node, right):
+        left_node, left_height = self._black_root(*left)
+        right_node, right_height = self._black_root(*right)
+        if left_height > right_height:
+            t = self._join_right(left_node, left_height, node, right_node, right_height)
+            if t.color == RED and t.right.color == RED:
+                t.color = BLACK
+                return t, left_height + 1
+            return t, left_height
+        if right_height > left_height:
+            t = self._join_left(left_node, left_height, node, right_node, right_height)
+            if t.color == RED and t.left.color == RED:
+                t.color = BLACK
+                return t, right_height + 1
+            return t, right_height
+        # Raízes pretas: o nó do meio entra vermelho
+        node.color = RED
+        return self._link(left_node, node, right_node), left_height
+    
+    def _join_right(self, tl, tl_height, node, tr, tr_height):
+        """Desce pela espinha direita de tl até um nó preto com a altura negra de tr"""
+        if tl.color == BLACK and tl_height == tr_height:
+            node.color = RED
+            return self._link(tl, node, tr)
+        child_height = tl_height - (1 if tl.color == BLACK else 0)
+        t = self._join_right(tl.right, child_height, node, tr, tr_height)
+        self._link(tl.left, tl, t)
+        if tl.color == BLACK and t.color == RED and t.right.color == RED:
+            # Vermelho com filho vermelho abaixo de um preto: uma rotação resolve
+            t.right.color = BLACK
+            return self._rotate_left(tl)
+        return tl
+    
+    def _join_left(self, tl, tl_height, node, tr, tr_height):
+        """Espelho de _join_right: desce pela espinha esquerda de tr"""
+        if tr.color == BLACK and tr_height == tl_height:
+            node.color = RED
+            return self._link(tl, node, tr)
+        child_height = tr_height - (1 if tr.color == BLACK else 0)
+        t = self._join_left(tl, tl_height, node, tr.left, child_height)
+        self._link(t, tr, tr.right)
+        if tr.color == BLACK and t.color == RED and t.left.color == RED:
+            t.left.color = BLACK
+            return self._rotate_right(tr)
+        return tr
+    
+    def prepare(self, other):
+        """Unifica os sentinelas e retorna as subárvores iniciais das duas árvores.
+        
+        As folhas da árvore menor passam a apontar para o sentinela da maior,
+        então o custo extra é O(min(n, m)).
+        """
+        tree = self.tree
+        if len(other) > len(tree):
+            _replace_nil(tree.root, tree.nil, other.nil)
+            if tree.root is tree.nil:
+                tree.root = other.nil
+            tree.nil = other.nil
+        else:
+            _replace_nil(other.root, other.nil, tree.nil)
+            if other.root is other.nil:
+                other.root = tree.nil
+        nil = self.nil = tree.nil
+        if tree.order_statistics and not other.order_statistics:
+            _fix_sizes(other.root, nil)
+        return ((tree.root, self._black_height(tree.root)),
+                (other.root, self._black_height(other.root)))
+    
+    def finish(self, t, other):
+        root = t[0]
+        if root is not self.nil:
+            root.parent = None
+            root.color = BLACK
+        self.tree.root = root
+        other.nil = RBNode(None, BLACK)
+        other.nil.size = 0
+        other.root = other.nil
+
+def _fix_sizes(root, nil):
+    """Recalcula os tamanhos das subárvores (pós-ordem iterativa)"""
+    stack = [root] if root is not nil else []
+    order = []
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if node.left is not nil:
+            stack.append(node.left)
+        if node.right is not nil:
+            stack.append(node.right)
+    for node in reversed(order):
+        node.size = (1 + (node.left.size if node.left is not nil else 0)
+                     + (node.right.size if node.right is not nil else 0))
+
+def _replace_nil(root, old, new):
+    """Troca o sentinela old por new nas folhas da subárvore"""
+    stack = [root] if root is not old else []
+    while stack:
+        node = stack.pop()
+        if node.left is old:
+            node.left = new
+        else:
+            stack.append(node.left)
+        if node.right is old:
+            node.right = new
+        else:
+            stack.append(node.right)
+
+def _algebra(tree, other):
+    if other is tree:
+        raise ValueError("a operação requer duas árvores distintas")
+    if isinstance(tree, RBT) and isinstance(other, RBT):
+        return _RBAlgebra(tree)
+    if isinstance(tree, AVL) and isinstance(other, AVL):
+        return _AVLAlgebra(tree)
+    raise TypeError(f"operação entre {type(tree).__name__} e {type(other).__name__} "
+                    "não suportada (use merge())")
+
+def _run(tree, other, operation):
+    """Aplica a operação às duas árvores; retorna quantas chaves de uma estavam na outra"""
+    algebra = _algebra(tree, other)
+    t1, t2 = algebra.prepare(other)
+    algebra.finish(getattr(algebra, operation)(t1, t2), other)
+    tree.comparisons += algebra.comparisons
+    tree.rotations += algebra.rotations
+    other._size = 0
+    return algebra.found
+
+def union(tree, other):
+    """tree passa a conter tree | other; other fica vazia"""
+    size = len(tree) + len(other)
+    tree._size = size - _run(tree, other, 'union')
+
+def intersection(tree, other):
+    """tree passa a conter tree & other; other fica vazia"""
+    tree._size = _run(tree, other, 'intersection')
+
+def difference(tree, other):
+    """tree passa a conter tree - other; other fica vazia"""
+    size = len(tree)
+    tree._size = size - _run(tree, other, 'difference')
+
+def _merge_items(first, second):
+    """Intercala dois percursos ordenados de (chave, valor); em empate fica first"""
+    keys = []
+    values = []
+    first = iter(first)
+    second = iter(second)
+    a = next(first, None)
+    b = next(second, None)
+    while a is not None and b is not None:
+        if a[0] < b[0]:
+            keys.append(a[0])
+            values.append(a[1])
+            a = next(first, None)
+        elif b[0] < a[0]:
+            keys.append(b[0])
+            values.append(b[1])
+            b = next(second, None)
+        else:
+            keys.append(a[0])
+            values.append(a[1])
+            a = next(first, None)
+            b = next(second, None)
+    for rest, item in ((first, a), (second, b)):
+        if item is not None:
+            keys.append(item[0])
+            values.append(item[1])
+            for key, value in rest:
+                keys.append(key)
+                values.append(value)
+    return keys, values
+
+def merge(tree, other):
+    """Nova árvore do tipo de tree com as chaves das duas, em O(n + m).
+    
+    Não altera as entradas; em chaves repetidas o valor de tree prevalece.
+    """
+    keys, values = _merge_items(tree.items(), other.items())
+    merged = type(tree)(tree.order_statistics, key=tree.key)
+    merged._load_sorted(keys)
+    if any(value is not None for value in values):
+        for node, value in zip(merged._iter_nodes(), values):
+            node.value = value
+    return merged
@@ -0,0 +1,344 @@
+"""
+Árvore particionada entre processos (shards) para usar vários núcleos
+
+ShardedTree distribui as chaves entre N processos, cada um com a sua
+própria árvore (AVL ou RBT por padrão). Como cada processo tem o seu GIL,
+inserções e buscas em lote rodam em paralelo de verdade.
+
+Particionamento:
+    'hash'   shard = hash(chave) % N; distribui bem qualquer carga, mas o
+             percurso ordenado precisa intercalar os N fluxos (heapq.merge)
+    'range'  shard = bisect(boundaries, chave); cada shard guarda um
+             intervalo contínuo, então o percurso ordenado é a concatenação
+
+A comunicação é por pipes. Os lotes são cortados em pedaços de batch_size
+chaves e enviados em pipeline: até `window` pedidos ficam em voo por shard
+antes de esperar a primeira resposta, então todos os shards trabalham ao
+mesmo tempo; o envio corre numa thread por shard, para não travar contra
+respostas grandes ainda não lidas. Chaves inteiras de 64 bits viajam como array('q') (cópia de
+bytes, sem serializar objeto por objeto).
+"""
+
+import heapq
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+from array import array
+from bisect import bisect_right
+
+from avl import AVL
+
+PARTITIONS = ('hash', 'range')
+
+def _pack(keys):
+    """array('q') para inteiros de 64 bits (serialização barata), senão lista"""
+    try:
+        return array('q', keys)
+    except (TypeError, OverflowError):
+        return list(keys)
+
+def _worker(conn, tree_class, tree_args):
+    """Laço do processo de um shard: executa pedidos (op, argumento) em ordem"""
+    tree = tree_class(*tree_args)
+    while True:
+        try:
+            op, arg = conn.recv()
+        except EOFError:
+            break
+        try:
+            if op == 'insert_many':
+                result = tree.insert_many(arg)
+            elif op == 'remove_many':
+                result = tree.remove_many(arg)
+            elif op == 'search_many':
+                result = tree.search_many(arg)
+            elif op == 'inorder':
+                result = _pack(tree.inorder())
+            elif op == 'range':
+                result = _pack(list(tree.range(*arg)))
+            elif op == 'count_range':
+                result = tree.count_range(*arg)
+            elif op == 'len':
+                result = len(tree)
+            elif op == 'height':
+                result = tree.height()
+            elif op == 'metrics':
+                result = (tree.comparisons, getattr(tree, 'rotations', 0))
+            elif op == 'reset_metrics':
+                result = tree.reset_metrics()
+            elif op == 'close':
+                conn.send((True, None))
+                break
+            else:
+                raise ValueError(f"operação desconhecida: {op!r}")
+        except Exception as exc:
+            conn.send((False, exc))
+        else:
+            conn.send((True, result))
+    conn.close()
+
+class ShardedTree:
+    """Front-end de uma árvore particionada em processos.
+    
+    Uso:
+        with ShardedTree(shards=4, tree_class=RBT) as tree:
+            tree.insert_many(range(1_000_000))
+            tree.search_many([1, 2, 3])     # bytearray(b'\\x01\\x01\\x01')
+            tree.comparisons                # soma dos shards
+    
+    Com partition='range', boundaries lista as N - 1 chaves de corte em
+    ordem crescente: o shard i guarda as chaves em
+    [boundaries[i - 1], boundaries[i]).
+    """
+    
+    def __init__(self, shards=None, tree_class=AVL, partition='hash', boundaries=None,
+                 batch_size=8192, window=4, tree_args=()):
+        if partition not in PARTITIONS:
+            raise ValueError(f"particionamento inválido: {partition!r}")
+        shards = shards or os.cpu_count() or 1
+        if partition == 'range':
+            if boundaries is None or len(boundaries) != shards - 1:
+                raise ValueError("partition='range' requer shards - 1 chaves em boundaries")
+            boundaries = list(boundaries)
+            if any(a >= b for a, b in zip(boundaries, boundaries[1:])):
+                raise ValueError("boundaries deve estar em ordem estritamente crescente")
+        self.shards = shards
+        self.partition = partition
+        self.boundaries = boundaries
+        self.batch_size = batch_size
+        self.window = window
+        self._conns = []
+        self._processes = []
+        for _ in range(shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child, tree_class, tree_args),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+    
+    def _shard_of(self, key):
+        if self.partition == 'range':
+            return bisect_right(self.boundaries, key)
+        return hash(key) % self.shards
+    
+    def _split(self, keys):
+        """Separa as chaves por shard; retorna (chaves, posições originais) de cada um"""
+        parts = [[] for _ in range(self.shards)]
+        positions = [[] for _ in range(self.shards)]
+        shard_of = self._shard_of
+        for i, key in enumerate(keys):
+            shard = shard_of(key)
+            parts[shard].append(key)
+            positions[shard].append(i)
+        return parts, positions
+    
+    def _call_all(self, op, arg=None):
+        """Envia o mesmo pedido a todos os shards e junta as respostas em ordem"""
+        return self._call(self._conns, op, arg)
+    
+    def _call(self, conns, op, arg):
+        for conn in conns:
+            conn.send((op, arg))
+        # Lê todas as respostas antes de propagar um erro: uma resposta não
+        # lida ficaria no pipe e seria entregue à chamada seguinte
+        replies = [conn.recv() for conn in conns]
+        return [self._unwrap(reply) for reply in replies]
+    
+    @staticmethod
+    def _unwrap(reply):
+        ok, result = reply
+        if not ok:
+            raise result
+        return result
+    
+    def _pipeline(self, op, parts):
+        """Envia os lotes de cada shard em pedaços, com até `window` pedidos em voo.
+        
+        Cada shard tem uma thread que envia os pedaços enquanto esta lê as
+        respostas que ficam prontas: uma resposta maior que o buffer do pipe
+        não trava o envio do pedaço seguinte. Retorna, por shard, a lista de
+        respostas na ordem dos pedaços. Se um pedaço falha, os seguintes não
+        são enviados e o primeiro erro só é propagado depois de lidas as
+        respostas que já estavam em voo.
+        """
+        batch_size = self.batch_size
+        chunks = [[_pack(keys[i:i + batch_size]) for i in range(0, len(keys), batch_size)]
+                  for keys in parts]
+        credits = [threading.Semaphore(self.window) for _ in range(self.shards)]
+        sent = [0] * self.shards
+        errors = []
+        stop = threading.Event()
+        
+        def feed(shard):
+            conn = self._conns[shard]
+            for chunk in chunks[shard]:
+                credits[shard].acquire()
+                if stop.is_set():
+                    return
+                try:
+                    conn.send((op, chunk))
+                except Exception as exc:
+                    errors.append(exc)
+                    stop.set()
+                    return
+                sent[shard] += 1
+        
+        writers = {}
+        for shard in range(self.shards):
+            if chunks[shard]:
+                writers[shard] = threading.Thread(target=feed, args=(shard,), daemon=True)
+                writers[shard].start()
+        shard_of_conn = {self._conns[shard]: shard for shard in writers}
+        received = [0] * self.shards
+        results = [[] for _ in range(self.shards)]
+        while True:
+            # O shard ainda deve respostas enquanto o escritor envia ou há pedidos em voo
+            waiting = [self._conns[shard] for shard, writer in writers.items()
+                       if writer.is_alive() or received[shard] < sent[shard]]
+            if not waiting:
+                break
+            for conn in multiprocessing.connection.wait(waiting, timeout=0.1):
+                shard = shard_of_conn[conn]
+                ok, result = conn.recv()
+                received[shard] += 1
+                credits[shard].release()
+                if not ok:
+                    # Não envia mais nada, mas esvazia os pedidos em voo
+                    if not stop.is_set():
+                        errors.insert(0, result)
+                        stop.set()
+                        for credit in credits:
+                            credit.release()
+                    continue
+                results[shard].append(result)
+        if errors:
+            raise errors[0]
+        return results
+    
+    # --- Escritas ---
+    
+    def insert(self, key):
+        self.insert_many([key])
+    
+    def remove(self, key):
+        self.remove_many([key])
+    
+    def insert_many(self, keys):
+        """Insere um lote distribuído entre os shards; retorna quantas eram novas"""
+        parts, _ = self._split(keys)
+        return sum(sum(replies) for replies in self._pipeline('insert_many', parts))
+    
+    def remove_many(self, keys):
+        """Remove um lote; retorna quantas existiam"""
+        parts, _ = self._split(keys)
+        return sum(sum(replies) for replies in self._pipeline('remove_many', parts))
+    
+    # --- Leituras ---
+    
+    def search(self, key):
+        return bool(self.search_many([key])[0])
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def search_many(self, keys):
+        """Busca um lote; bytearray com 1 ou 0 por chave, na ordem da entrada"""
+        keys = keys if isinstance(keys, list) else list(keys)
+        parts, positions = self._split(keys)
+        found = bytearray(len(keys))
+        for shard, replies in enumerate(self._pipeline('search_many', parts)):
+            shard_positions = iter(positions[shard])
+            for reply in replies:
+                for hit, i in zip(reply, shard_positions):
+                    if hit:
+                        found[i] = 1
+        return found
+    
+    def _gather_sorted(self, streams):
+        if self.partition == 'range':
+            # Intervalos disjuntos e em ordem: basta concatenar
+            return [key for stream in streams for key in stream]
+        return list(heapq.merge(*streams))
+    
+    def inorder(self):
+        """Todas as chaves em ordem (intercalação dos fluxos ordenados dos shards)"""
+        return self._gather_sorted(self._call_all('inorder'))
+    
+    def __iter__(self):
+        return iter(self.inorder())
+    
+    def range(self, lo, hi):
+        """Chaves em [lo, hi] em ordem, consultando só os shards necessários"""
+        if self.partition == 'range':
+            first = self._shard_of(lo)
+            last = self._shard_of(hi)
+            conns = self._conns[first:last + 1]
+        else:
+            conns = self._conns
+        return self._gather_sorted(self._call(conns, 'range', (lo, hi)))
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi]"""
+        if hi < lo:
+            return 0
+        return sum(self._call_all('count_range', (lo, hi)))
+    
+    def __len__(self):
+        return sum(self._call_all('len'))
+    
+    def height(self):
+        """Maior altura entre os shards"""
+        return max(self._call_all('height'))
+    
+    def shard_sizes(self):
+        """Quantidade de chaves em cada shard"""
+        return self._call_all('len')
+    
+    # --- Métricas ---
+    
+    def metrics(self):
+        """Contadores agregados e por shard"""
+        per_shard = self._call_all('metrics')
+        return {
+            'comparisons': sum(c for c, _ in per_shard),
+            'rotations': sum(r for _, r in per_shard),
+            'shards': [{'comparisons': c, 'rotations': r} for c, r in per_shard],
+        }
+    
+    @property
+    def comparisons(self):
+        return self.metrics()['comparisons']
+    
+    @property
+    def rotations(self):
+        return self.metrics()['rotations']
+    
+    def reset_metrics(self):
+        self._call_all('reset_metrics')
+    
+    # --- Ciclo de vida ---
+    
+    def close(self):
+        """Encerra os processos dos shards"""
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+                conn.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._conns = []
+        self._processes = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,352 @@
+"""
+Snapshots binários das árvores, carregados via mmap
+
+Layout do arquivo (ordem de bytes nativa, registrada no cabeçalho):
+
+    cabeçalho    32 bytes (HEADER)
+    chaves       n x int64 ('q') ou double ('d'), em pré-ordem
+    esquerdas    n x uint32: tamanho da subárvore esquerda de cada nó
+    extras       n x int8: altura (AVL) ou cor (RBT); ausente na BST
+    valores      pickle da lista de valores em pré-ordem (modo mapa), opcional
+
+Pré-ordem mais o tamanho da subárvore esquerda determinam a forma exata da
+árvore: o filho esquerdo do nó i é i + 1 e o direito é i + 1 + esquerdas[i].
+Por isso o carregamento remonta os nós sem nenhuma comparação ou rotação, e
+SnapshotView consegue buscar direto no buffer mapeado, sem montar nada.
+"""
+
+import gc
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+
+from bst import BST, Node
+from avl import AVL, AVLNode
+from rbt import RBT, RBNode, RED, BLACK
+
+MAGIC = b'TREESNAP'
+VERSION = 1
+HEADER = struct.Struct('=8sHBcBBxxQQ')
+
+KIND_BST, KIND_AVL, KIND_RBT = 0, 1, 2
+KINDS = {KIND_BST: BST, KIND_AVL: AVL, KIND_RBT: RBT}
+
+FLAG_VALUES = 1
+# Árvore com key= (keyed.py): chaves de ordenação + elementos nos valores
+FLAG_KEYED = 2
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+def _kind_of(tree):
+    for kind, cls in KINDS.items():
+        if isinstance(tree, cls):
+            return kind
+    raise TypeError(f"snapshot não suportado para {type(tree).__name__}")
+
+def _key_typecode(keys):
+    """'q' para inteiros de 64 bits, 'd' para floats; outros tipos não cabem no layout"""
+    if all(type(k) is int for k in keys):
+        if keys and (min(keys) < INT64_MIN or max(keys) > INT64_MAX):
+            raise OverflowError("chave inteira fora do intervalo de 64 bits")
+        return 'q'
+    if all(type(k) is float for k in keys):
+        return 'd'
+    raise TypeError("snapshot aceita apenas chaves todas int (64 bits) ou todas float")
+
+def _pad(offset):
+    """Alinha o deslocamento a 8 bytes"""
+    return (offset + 7) & ~7
+
+def _layout(count, has_extras):
+    """Deslocamentos (chaves, esquerdas, extras, valores) das seções"""
+    keys_at = HEADER.size
+    left_at = keys_at + 8 * count
+    extras_at = left_at + 4 * count
+    values_at = _pad(extras_at + (count if has_extras else 0))
+    return keys_at, left_at, extras_at, values_at
+
+def save_tree(tree, path):
+    """Grava a árvore em path (escrita atômica via arquivo temporário)"""
+    kind = _kind_of(tree)
+    nil = tree.nil if kind == KIND_RBT else None
+    
+    keys = []
+    values = []
+    extras = array('b')
+    children = bytearray()
+    node = tree.root
+    stack = [node] if node is not None and node is not nil else []
+    while stack:
+        node = stack.pop()
+        keys.append(node.key)
+        values.append(node.value)
+        if kind == KIND_AVL:
+            extras.append(node.height)
+        elif kind == KIND_RBT:
+            extras.append(1 if node.color == RED else 0)
+        has_left = node.left is not None and node.left is not nil
+        has_right = node.right is not None and node.right is not nil
+        children.append(has_left | (has_right << 1))
+        if has_right:
+            stack.append(node.right)
+        if has_left:
+            stack.append(node.left)
+    
+    # Tamanhos das subárvores esquerdas: pré-ordem ao contrário, com uma pilha
+    # dos tamanhos das subárvores já vistas (a esquerda sai primeiro)
+    count = len(keys)
+    left_sizes = array('I', bytes(4 * count))
+    sizes = []
+    for i in range(count - 1, -1, -1):
+        flags = children[i]
+        left_size = sizes.pop() if flags & 1 else 0
+        right_size = sizes.pop() if flags & 2 else 0
+        left_sizes[i] = left_size
+        sizes.append(1 + left_size + right_size)
+    
+    typecode = _key_typecode(keys)
+    flags = 0
+    values_blob = b''
+    if getattr(tree, 'key', None) is not None:
+        # A função de chave não vai para o arquivo; load() precisa recebê-la
+        flags |= FLAG_KEYED | FLAG_VALUES
+    if any(value is not None for value in values):
+        flags |= FLAG_VALUES
+    if flags & FLAG_VALUES:
+        # Gravado sempre que o flag vai no cabeçalho, mesmo vazio ou só com None
+        values_blob = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+    has_extras = kind != KIND_BST
+    values_at = _layout(count, has_extras)[3]
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind, typecode.encode(),
+                            sys.byteorder == 'big', flags, count, len(values_blob)))
+        f.write(array(typecode, keys).tobytes())
+        f.write(left_sizes.tobytes())
+        if has_extras:
+            f.write(extras.tobytes())
+        f.write(bytes(values_at - f.tell()))
+        f.write(values_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class _Mapped:
+    """Arquivo de snapshot mapeado em memória, com as seções como memoryview"""
+    
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+    
+    def _parse(self):
+        mm = self.mm
+        if len(mm) < HEADER.size:
+            raise ValueError("arquivo de snapshot truncado")
+        (magic, version, kind, typecode, big_endian, flags,
+         count, values_len) = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("arquivo não é um snapshot de árvore")
+        if version != VERSION:
+            raise ValueError(f"versão de snapshot não suportada: {version}")
+        if bool(big_endian) != (sys.byteorder == 'big'):
+            raise ValueError("snapshot gravado com outra ordem de bytes")
+        if kind not in KINDS:
+            raise ValueError(f"tipo de árvore desconhecido no snapshot: {kind}")
+        
+        self.kind = kind
+        self.count = count
+        self.flags = flags
+        self.typecode = typecode.decode()
+        keys_at, left_at, extras_at, values_at = _layout(count, kind != KIND_BST)
+        if len(mm) < values_at + values_len:
+            raise ValueError("arquivo de snapshot truncado")
+        
+        buffer = memoryview(mm)
+        self._buffer = buffer
+        self.keys = buffer[keys_at:left_at].cast(self.typecode)
+        self.left_sizes = buffer[left_at:extras_at].cast('I')
+        self.extras = buffer[extras_at:extras_at + count].cast('b') if kind != KIND_BST else None
+        self.values_blob = buffer[values_at:values_at + values_len]
+    
+    def close(self):
+        for name in ('keys', 'left_sizes', 'extras', 'values_blob', '_buffer'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self.mm.close()
+
+def load_tree(path, cls=None, order_statistics=False, key=None):
+    """Remonta a árvore do snapshot sem comparações nem rotações.
+    
+    cls=None usa o tipo gravado. Pedir outro tipo (ex.: snapshot de AVL
+    carregado como RBT) descarta a forma e monta uma árvore balanceada
+    com as chaves ordenadas, em O(n log n). Snapshots de árvores com key=
+    exigem a mesma função em key (ela não é gravada no arquivo).
+    """
+    mapped = _Mapped(path)
+    try:
+        kind = mapped.kind
+        count = mapped.count
+        keys = mapped.keys.tolist()
+        left_sizes = mapped.left_sizes.tolist()
+        extras = mapped.extras.tolist() if mapped.extras is not None else None
+        flags = mapped.flags
+        values = (pickle.loads(mapped.values_blob)
+                  if flags & FLAG_VALUES and len(mapped.values_blob) else None)
+    finally:
+        mapped.close()
+    
+    keyed = bool(flags & FLAG_KEYED)
+    if keyed != (key is not None):
+        raise ValueError("snapshot de árvore com key= requer key= no load" if keyed
+                         else "snapshot sem key=; carregue sem a função de chave")
+    if cls is None:
+        cls = KINDS[kind]
+    tree = cls(order_statistics, key)
+    if cls is not KINDS[kind]:
+        _load_reshaped(tree, keys, values)
+        return tree
+    
+    # Milhões de nós novos disparariam o coletor cíclico repetidas vezes;
+    # nenhum lixo é gerado aqui, então ele fica pausado durante a montagem
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        root = _build_nodes(tree, kind, count, keys, left_sizes, extras, values)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    tree.root = root
+    tree._size = count
+    return tree
+
+def _build_nodes(tree, kind, count, keys, left_sizes, extras, values):
+    """Cria todos os nós de uma vez e depois liga pelos índices da pré-ordem:
+    filho esquerdo em i + 1, direito em i + 1 + esquerdas[i]. Retorna a raiz."""
+    if kind == KIND_BST:
+        nodes = list(map(Node, keys))
+    elif kind == KIND_AVL:
+        nodes = list(map(AVLNode, keys))
+        for node, height in zip(nodes, extras):
+            node.height = height
+    else:
+        nil = tree.nil
+        nodes = [RBNode(key, RED if color else BLACK) for key, color in zip(keys, extras)]
+        for node in nodes:
+            node.left = nil
+            node.right = nil
+    if values is not None:
+        for node, value in zip(nodes, values):
+            node.value = value
+    
+    sizes = [0] * count
+    if count:
+        sizes[0] = count
+    link_parent = kind == KIND_RBT
+    for i in range(count):
+        node = nodes[i]
+        size = sizes[i]
+        node.size = size
+        left_size = left_sizes[i]
+        if left_size:
+            child = node.left = nodes[i + 1]
+            sizes[i + 1] = left_size
+            if link_parent:
+                child.parent = node
+        right_size = size - 1 - left_size
+        if right_size:
+            child = node.right = nodes[i + 1 + left_size]
+            sizes[i + 1 + left_size] = right_size
+            if link_parent:
+                child.parent = node
+    
+    if not count:
+        return tree.nil if kind == KIND_RBT else None
+    return nodes[0]
+
+def _load_reshaped(tree, keys, values):
+    """Carrega as chaves em outro tipo de árvore, montando-a balanceada"""
+    if values is None:
+        tree._load_sorted(sorted(keys))
+        return
+    pairs = sorted(zip(keys, values))
+    tree._load_sorted([key for key, _ in pairs])
+    for node, (_, value) in zip(tree._iter_nodes(), pairs):
+        node.value = value
+
+class SnapshotView:
+    """Busca somente leitura direto no snapshot mapeado, sem montar a árvore.
+    
+    Abrir custa O(1) independente do tamanho; as páginas são lidas sob
+    demanda pelo sistema operacional conforme as buscas as tocam.
+    """
+    
+    def __init__(self, path):
+        self._mapped = _Mapped(path)
+        self.comparisons = 0
+    
+    def __len__(self):
+        return self._mapped.count
+    
+    def search(self, key):
+        """Busca um elemento percorrendo a forma gravada em pré-ordem"""
+        keys = self._mapped.keys
+        left_sizes = self._mapped.left_sizes
+        comparisons = 0
+        i = 0
+        size = self._mapped.count
+        while size:
+            node_key = keys[i]
+            comparisons += 1
+            if key == node_key:
+                self.comparisons += comparisons
+                return True
+            left_size = left_sizes[i]
+            if key < node_key:
+                size = left_size
+                i += 1
+            else:
+                size = size - 1 - left_size
+                i += 1 + left_size
+        self.comparisons += comparisons
+        return False
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def height(self):
+        """Altura da forma gravada (O(n))"""
+        left_sizes = self._mapped.left_sizes
+        best = 0
+        stack = [(0, self._mapped.count, 1)] if self._mapped.count else []
+        while stack:
+            i, size, depth = stack.pop()
+            if depth > best:
+                best = depth
+            left_size = left_sizes[i]
+            if left_size:
+                stack.append((i + 1, left_size, depth + 1))
+            if size - 1 - left_size:
+                stack.append((i + 1 + left_size, size - 1 - left_size, depth + 1))
+        return best
+    
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
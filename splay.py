@@ -0,0 +1,382 @@
+"""
+Implementação de Árvore Splay (top-down, Sleator e Tarjan)
+
+Toda busca, inserção e remoção traz a chave acessada (ou a última visitada)
+para a raiz. Chaves acessadas com frequência ficam perto do topo, então
+cargas com localidade temporal ou distribuição enviesada fazem menos
+comparações que numa árvore balanceada; o custo amortizado é O(log n).
+"""
+
+# Marca "valor ausente" em pop(), já que None é um valor válido
+_MISSING = object()
+
+class SplayNode:
+    __slots__ = ('key', 'value', 'left', 'right')
+    
+    def __init__(self, key, value=None):
+        self.key = key
+        self.value = value
+        self.left = None
+        self.right = None
+
+class SplayTree:
+    def __init__(self, key=None):
+        """Com key=f os elementos são ordenados por f(elemento) (ver keyed.py)"""
+        self.root = None
+        self.comparisons = 0
+        self.rotations = 0
+        self._size = 0
+        # Nó auxiliar reutilizado como cabeça das árvores esquerda e direita do splay
+        self._header = SplayNode(None)
+        self.key = key
+        if key is not None:
+            from keyed import attach_key
+            attach_key(self, key)
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, key=None):
+        """Constrói uma árvore perfeitamente balanceada em O(n).
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        if key is not None:
+            tree = cls(key)
+            tree._load_items(iterable, assume_sorted)
+            return tree
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls()
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pela árvore balanceada das chaves já ordenadas"""
+        self.root = self._build_balanced(keys, 0, len(keys))
+        self._size = len(keys)
+    
+    def _build_balanced(self, keys, lo, hi):
+        """Monta a subárvore de keys[lo:hi] usando o elemento do meio como raiz"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = SplayNode(keys[mid])
+        node.left = self._build_balanced(keys, lo, mid)
+        node.right = self._build_balanced(keys, mid + 1, hi)
+        return node
+    
+    def __len__(self):
+        """Número de elementos, mantido a cada inserção/remoção (O(1))"""
+        return self._size
+    
+    def _splay(self, node, key):
+        """Splay top-down: reorganiza a subárvore de node e retorna a nova raiz.
+        
+        A nova raiz é o nó da chave, ou o último nó visitado na busca por ela.
+        Os nós menores que key vão sendo pendurados na árvore esquerda e os
+        maiores na direita; no fim as duas são remontadas sob a nova raiz.
+        """
+        header = self._header
+        header.left = header.right = None
+        left_max = right_min = header
+        comparisons = 0
+        rotations = 0
+        while True:
+            comparisons += 1
+            if key < node.key:
+                child = node.left
+                if child is None:
+                    break
+                comparisons += 1
+                if key < child.key:
+                    # Zig-zig: rotação à direita
+                    node.left = child.right
+                    child.right = node
+                    node = child
+                    rotations += 1
+                    if node.left is None:
+                        break
+                # Liga à árvore direita
+                right_min.left = node
+                right_min = node
+                node = node.left
+            elif key > node.key:
+                child = node.right
+                if child is None:
+                    break
+                comparisons += 1
+                if key > child.key:
+                    # Zag-zag: rotação à esquerda
+                    node.right = child.left
+                    child.left = node
+                    node = child
+                    rotations += 1
+                    if node.right is None:
+                        break
+                # Liga à árvore esquerda
+                left_max.right = node
+                left_max = node
+                node = node.right
+            else:
+                break
+        
+        left_max.right = node.left
+        right_min.left = node.right
+        node.left = header.right
+        node.right = header.left
+        header.left = header.right = None
+        self.comparisons += comparisons
+        self.rotations += rotations
+        return node
+    
+    def insert(self, key):
+        """Insere um elemento na árvore (a nova chave vira a raiz)"""
+        self._insert_node(key)
+    
+    def _insert_node(self, key):
+        """Insere a chave se ausente e retorna o seu nó (novo ou existente)"""
+        if self.root is None:
+            self.root = SplayNode(key)
+            self._size = 1
+            return self.root
+        
+        root = self._splay(self.root, key)
+        if key == root.key:
+            self.root = root
+            return root
+        
+        node = SplayNode(key)
+        if key < root.key:
+            node.left = root.left
+            node.right = root
+            root.left = None
+        else:
+            node.right = root.right
+            node.left = root
+            root.right = None
+        self.root = node
+        self._size += 1
+        return node
+    
+    def search(self, key):
+        """Busca um elemento na árvore, trazendo-o para a raiz"""
+        return self._find_node(key) is not None
+    
+    def _find_node(self, key):
+        """Faz o splay da chave e retorna o seu nó (a raiz) ou None"""
+        if self.root is None:
+            return None
+        root = self.root = self._splay(self.root, key)
+        return root if key == root.key else None
+    
+    def remove(self, key):
+        """Remove um elemento da árvore"""
+        self._remove_node(key)
+    
+    def _remove_node(self, key):
+        """Remove a chave e retorna o seu valor, ou _MISSING se ausente"""
+        root = self._find_node(key)
+        if root is None:
+            return _MISSING
+        if root.left is None:
+            self.root = root.right
+        else:
+            # O splay da mesma chave na subárvore esquerda sobe o máximo dela,
+            # que fica sem filho direito
+            left = self._splay(root.left, key)
+            left.right = root.right
+            self.root = left
+        self._size -= 1
+        return root.value
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo.
+        
+        Não faz splay: consultas de intervalo não reorganizam a árvore.
+        """
+        for node in self._range_nodes(lo, hi):
+            yield node.key
+    
+    def _range_nodes(self, lo, hi):
+        """Gera os nós com chave em [lo, hi] em ordem (ver range)"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi]"""
+        if hi < lo:
+            return 0
+        return sum(1 for _ in self.range(lo, hi))
+    
+    # --- Modo mapa ordenado: cada nó guarda também um valor ---
+    
+    def put(self, key, value):
+        """Associa value à chave, inserindo-a se necessário"""
+        self._insert_node(key).value = value
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not None else default
+    
+    def pop(self, key, default=_MISSING):
+        """Remove a chave e retorna seu valor (KeyError se ausente e sem default)"""
+        value = self._remove_node(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        self.pop(key)
+    
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente usando uma pilha explícita (memória O(h))"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    
+    def _iter_nodes_reversed(self):
+        """Gera os nós em ordem decrescente usando uma pilha explícita"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (esquerda, raiz, direita)"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (raiz, esquerda, direita)"""
+        for node in self._iter_nodes_preorder():
+            yield node.key
+    
+    def _iter_nodes_preorder(self):
+        """Gera os nós em pre-order (ver iter_preorder)"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso (esquerda, direita, raiz)"""
+        for node in self._iter_nodes_postorder():
+            yield node.key
+    
+    def _iter_nodes_postorder(self):
+        """Gera os nós em post-order (ver iter_postorder)"""
+        stack = []
+        node = self.root
+        last = None
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not None and top.right is not last:
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.key
+    
+    def inorder(self):
+        """Percurso in-order (esquerda, raiz, direita)"""
+        return list(self.iter_inorder())
+    
+    def preorder(self):
+        """Percurso pre-order (raiz, esquerda, direita)"""
+        return list(self.iter_preorder())
+    
+    def postorder(self):
+        """Percurso post-order (esquerda, direita, raiz)"""
+        return list(self.iter_postorder())
+    
+    def height(self):
+        """Calcula a altura da árvore (percurso em largura, sem recursão)"""
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações e rotações"""
+        self.comparisons = 0
+        self.rotations = 0
@@ -0,0 +1,226 @@
+"""
+Índice estático (imutável) para cargas de leitura
+
+FrozenIndex congela o conteúdo de qualquer árvore num único array contíguo,
+sem nós nem ponteiros. Layouts disponíveis:
+
+    'sorted'     array.array ordenado; busca com bisect (laço em C)
+    'eytzinger'  array.array em ordem de Eytzinger (BFS da árvore implícita:
+                 filhos de i em 2i e 2i + 1); a descida não tem desvios
+                 dependentes de dados além do índice calculado
+    'numpy'      ndarray ordenado; search_many vetorizado com np.searchsorted
+
+'auto' usa NumPy quando disponível e as chaves são numéricas, senão
+'sorted'. No CPython o custo de interpretar a descida de Eytzinger supera o
+ganho de localidade, então ela é mais lenta que o bisect em C; o layout
+fica disponível para comparação nos benchmarks.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LAYOUTS = ('auto', 'sorted', 'eytzinger', 'numpy')
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+def _typecode(keys):
+    """'q' para inteiros de 64 bits, 'd' para floats, None para outros tipos"""
+    if all(type(k) is int for k in keys):
+        if not keys or (min(keys) >= INT64_MIN and max(keys) <= INT64_MAX):
+            return 'q'
+        return None
+    if all(type(k) is float for k in keys):
+        return 'd'
+    return None
+
+def _eytzinger(keys, typecode):
+    """Reordena as chaves ordenadas em BFS da árvore implícita (posição 0 sem uso)"""
+    n = len(keys)
+    if typecode is not None:
+        layout = array(typecode, bytes(8 * (n + 1)))
+    else:
+        layout = [None] * (n + 1)
+    # Percurso in-order iterativo dos índices 1..n preenchendo em ordem crescente
+    stack = []
+    i = 1
+    j = 0
+    while stack or i <= n:
+        while i <= n:
+            stack.append(i)
+            i *= 2
+        i = stack.pop()
+        layout[i] = keys[j]
+        j += 1
+        i = 2 * i + 1
+    return layout
+
+class FrozenIndex:
+    def __init__(self, keys, layout='auto', assume_sorted=False):
+        """Com assume_sorted=True keys já deve estar em ordem estritamente crescente"""
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout inválido: {layout!r}")
+        keys = list(keys) if assume_sorted else sorted(set(keys))
+        typecode = _typecode(keys)
+        if layout == 'auto':
+            layout = 'numpy' if np is not None and typecode is not None else 'sorted'
+        if layout == 'numpy':
+            if np is None:
+                raise ImportError("layout 'numpy' requer NumPy")
+            if typecode is None:
+                raise TypeError("layout 'numpy' aceita apenas chaves int64 ou float")
+        
+        self.layout = layout
+        self.comparisons = 0
+        self._size = len(keys)
+        if layout == 'eytzinger':
+            self.keys = _eytzinger(keys, typecode)
+            self._sorted = None
+        else:
+            if layout == 'numpy':
+                self.keys = np.array(keys, dtype=np.int64 if typecode == 'q' else np.float64)
+                # Visão sem cópia: indexar devolve int/float do Python, rápido para bisect
+                self._sorted = memoryview(self.keys)
+            else:
+                self.keys = array(typecode, keys) if typecode is not None else keys
+                self._sorted = self.keys
+    
+    @classmethod
+    def from_tree(cls, tree, layout='auto'):
+        """Congela qualquer árvore iterável em ordem (BST, AVL, RBT, BTree...)"""
+        return cls(iter(tree), layout, assume_sorted=True)
+    
+    def thaw(self, tree_class):
+        """Monta uma árvore mutável balanceada com o conteúdo do índice"""
+        return tree_class.from_iterable(iter(self), assume_sorted=True)
+    
+    def __len__(self):
+        return self._size
+    
+    def _lower_bound_eytzinger(self, key):
+        """Índice de Eytzinger da primeira chave >= key (0 se não houver)"""
+        layout = self.keys
+        n = self._size
+        i = 1
+        steps = 0
+        while i <= n:
+            # Desce à esquerda (2i) ou à direita (2i + 1) sem desvio
+            i = 2 * i + (layout[i] < key)
+            steps += 1
+        self.comparisons += steps
+        # Remove os passos à direita finais e o último passo à esquerda
+        return i >> (i ^ (i + 1)).bit_length()
+    
+    def search(self, key):
+        """Busca um elemento no índice"""
+        if self.layout == 'eytzinger':
+            i = self._lower_bound_eytzinger(key)
+            return i != 0 and self.keys[i] == key
+        keys = self._sorted
+        i = bisect_left(keys, key)
+        # bisect faz ~log2(n + 1) comparações
+        self.comparisons += self._size.bit_length()
+        return i < self._size and keys[i] == key
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def search_many(self, keys):
+        """Busca várias chaves; retorna bytearray com 1 (presente) ou 0 por chave"""
+        if self.layout == 'numpy':
+            queries = np.asarray(keys)
+            if queries.dtype != self.keys.dtype:
+                # Converter truncaria (2.5 viraria 2 num índice int); busca uma a uma
+                search = self.search
+                return bytearray(search(key) for key in keys)
+            n = self._size
+            if n == 0:
+                return bytearray(len(queries))
+            positions = np.searchsorted(self.keys, queries)
+            found = self.keys[np.minimum(positions, n - 1)] == queries
+            found &= positions < n
+            self.comparisons += len(queries) * n.bit_length()
+            return bytearray(found.tobytes())
+        search = self.search
+        return bytearray(search(key) for key in keys)
+    
+    def _iter_eytzinger(self, i):
+        """Gera as chaves em ordem a partir do índice de Eytzinger i"""
+        layout = self.keys
+        n = self._size
+        while i:
+            yield layout[i]
+            # Sucessor in-order: menor da subárvore direita, ou o primeiro
+            # ancestral do qual viemos pela esquerda
+            if 2 * i + 1 <= n:
+                i = 2 * i + 1
+                while 2 * i <= n:
+                    i *= 2
+            else:
+                while i & 1:
+                    i >>= 1
+                i >>= 1
+    
+    def __iter__(self):
+        if self.layout == 'eytzinger':
+            if self._size == 0:
+                return iter(())
+            i = 1
+            while 2 * i <= self._size:
+                i *= 2
+            return self._iter_eytzinger(i)
+        if self.layout == 'numpy':
+            return iter(self.keys.tolist())
+        return iter(self.keys)
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, em O(log n + k)"""
+        if self.layout == 'eytzinger':
+            for key in self._iter_eytzinger(self._lower_bound_eytzinger(lo)):
+                if key > hi:
+                    return
+                yield key
+            return
+        keys = self._sorted
+        start = bisect_left(keys, lo)
+        stop = bisect_right(keys, hi)
+        if self.layout == 'numpy':
+            yield from self.keys[start:stop].tolist()
+        else:
+            yield from keys[start:stop]
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi]; O(log n) nos layouts ordenados"""
+        if lo > hi:
+            return 0
+        if self.layout == 'eytzinger':
+            count = 0
+            for _ in self.range(lo, hi):
+                count += 1
+            return count
+        return max(0, bisect_right(self._sorted, hi) - bisect_left(self._sorted, lo))
+    
+    def inorder(self):
+        """Chaves em ordem crescente"""
+        return list(self)
+    
+    def height(self):
+        """Altura da árvore implícita (completa) da busca binária"""
+        return self._size.bit_length()
+    
+    def nbytes(self):
+        """Bytes ocupados pelo array de chaves"""
+        if self.layout == 'numpy':
+            return self.keys.nbytes
+        if isinstance(self.keys, array):
+            return self.keys.itemsize * len(self.keys)
+        return 8 * len(self.keys)
+    
+    def reset_metrics(self):
+        """Reseta a métrica de comparações"""
+        self.comparisons = 0
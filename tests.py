@@ -2,73 +2,226 @@
 Script de testes de desempenho para as três árvores
 """
 
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import math
+import os
+import platform
 import random
+import statistics
+import tempfile
+import threading
 import time
+import tracemalloc
+from functools import total_ordering
+from operator import attrgetter, itemgetter
 from bst import BST
 from avl import AVL
 from rbt import RBT
+from btree import BTree
+from splay import SplayTree
+from treap import Treap
+from avl_array import ArrayAVL
+from rbt_array import ArrayRBT
+from snapshot import SnapshotView
+from wal import DurableTree
+from static_index import FrozenIndex, np
+from cache import CachedTree
+from threadsafe import ConcurrentTree
+from sharded import ShardedTree
+from persistent import PersistentAVL, PersistentRBT
+from keyed import int_key
 
-def test_tree(tree_class, tree_name, data_sizes):
-    """Testa uma árvore com diferentes tamanhos de dados"""
+# Árvores comparadas: (classe, rótulo curto, nome completo)
+TREE_TYPES = [
+    (BST, "BST", "BST (Árvore Binária de Busca)"),
+    (AVL, "AVL", "AVL (Árvore Balanceada)"),
+    (RBT, "RBT", "RBT (Árvore Rubro-Negra)"),
+    (BTree, "B-Tree", "B-Tree (Árvore B, order=64)"),
+    (SplayTree, "Splay", "Splay (Árvore autoajustável)"),
+    (Treap, "Treap", "Treap (Árvore aleatorizada)"),
+]
+
+DEFAULT_SEED = 42
+
+# Perfis de carga: ordem de inserção, distribuição das buscas e, nos perfis
+# mistos, a fração de leituras numa sequência intercalada de operações
+WORKLOADS = {
+    'random': {'order': 'random', 'skew': False, 'read_ratio': None},
+    'sorted': {'order': 'sorted', 'skew': False, 'read_ratio': None},
+    'reverse': {'order': 'reverse', 'skew': False, 'read_ratio': None},
+    'zipf': {'order': 'random', 'skew': True, 'read_ratio': None},
+    'mixed-r90': {'order': 'random', 'skew': False, 'read_ratio': 0.9},
+    'mixed-r50': {'order': 'random', 'skew': False, 'read_ratio': 0.5},
+}
+
+@total_ordering
+class _Record:
+    """Registro comparado por (a, b) com operadores escritos em Python"""
+    __slots__ = ('a', 'b')
+    
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+    
+    def __eq__(self, other):
+        return (self.a, self.b) == (other.a, other.b)
+    
+    def __lt__(self, other):
+        return (self.a, self.b) < (other.a, other.b)
+    
+    def __hash__(self):
+        return hash((self.a, self.b))
+
+# A BST degenera em lista com entradas ordenadas (custo O(n^2)); acima deste
+# tamanho esses perfis são pulados para ela
+DEGENERATE_LIMIT = 20000
+
+def percentile(values, p):
+    """Percentil p (0-100) pelo método do posto mais próximo"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def zipf_sample(rng, population, count, s=1.1):
+    """Sorteia count elementos de population com distribuição de Zipf (expoente s)"""
+    cumulative = list(itertools.accumulate(1 / (rank ** s)
+                                           for rank in range(1, len(population) + 1)))
+    total = cumulative[-1]
+    return [population[bisect.bisect_left(cumulative, rng.random() * total)]
+            for _ in range(count)]
+
+def generate_workload(name, size, rng):
+    """Gera as chaves de cada fase de um perfil de carga de forma reprodutível"""
+    profile = WORKLOADS[name]
+    data = rng.sample(range(1, size * 10), size)
+    if profile['order'] == 'sorted':
+        data.sort()
+    elif profile['order'] == 'reverse':
+        data.sort(reverse=True)
+    
+    num_search = min(1000, size)
+    if profile['skew']:
+        # Poucas chaves "quentes" concentram a maior parte das buscas
+        hot_order = rng.sample(data, size)
+        search_keys = zipf_sample(rng, hot_order, num_search)
+    else:
+        search_keys = rng.sample(data, num_search)
+    remove_keys = rng.sample(data, min(50, size))
+    
+    mixed = []
+    if profile['read_ratio'] is not None:
+        fresh = iter(rng.sample(range(size * 10, size * 20), num_search))
+        for _ in range(num_search):
+            if rng.random() < profile['read_ratio']:
+                mixed.append(('search', rng.choice(data)))
+            elif rng.random() < 0.5:
+                mixed.append(('insert', next(fresh)))
+            else:
+                mixed.append(('remove', rng.choice(data)))
+    
+    return {'insert': data, 'search': search_keys, 'remove': remove_keys, 'mixed': mixed}
+
+def run_trial(tree_class, workload):
+    """Executa as fases de um perfil numa árvore nova; tempos em nanossegundos"""
+    tree = tree_class()
+    
+    start = time.perf_counter_ns()
+    for key in workload['insert']:
+        tree.insert(key)
+    insert_ns = time.perf_counter_ns() - start
+    insert_comparisons = tree.comparisons
+    rotations = getattr(tree, 'rotations', 0)
+    tree.reset_metrics()
+    
+    start = time.perf_counter_ns()
+    for key in workload['search']:
+        tree.search(key)
+    search_ns = time.perf_counter_ns() - start
+    search_comparisons = tree.comparisons
+    tree.reset_metrics()
+    
+    mixed_ns = 0
+    if workload['mixed']:
+        operations = {'search': tree.search, 'insert': tree.insert, 'remove': tree.remove}
+        start = time.perf_counter_ns()
+        for op, key in workload['mixed']:
+            operations[op](key)
+        mixed_ns = time.perf_counter_ns() - start
+        tree.reset_metrics()
+    
+    start = time.perf_counter_ns()
+    for key in workload['remove']:
+        tree.remove(key)
+    remove_ns = time.perf_counter_ns() - start
+    remove_comparisons = tree.comparisons
+    
+    return {
+        'insert_ns': insert_ns,
+        'search_ns': search_ns,
+        'mixed_ns': mixed_ns,
+        'remove_ns': remove_ns,
+        'total_ns': insert_ns + search_ns + mixed_ns + remove_ns,
+        'height': tree.height(),
+        'rotations': rotations,
+        'avg_insert_comp': insert_comparisons / len(workload['insert']),
+        'avg_search_comp': search_comparisons / len(workload['search']),
+        'avg_remove_comp': remove_comparisons / len(workload['remove']),
+    }
+
+def test_tree(tree_class, tree_name, data_sizes, workload='random', trials=3,
+              warmup=1, seed=DEFAULT_SEED):
+    """Testa uma árvore com diferentes tamanhos de dados.
+    
+    Cada tamanho roda `warmup` execuções descartadas e `trials` execuções
+    medidas; os tempos reportados são medianas, com mínimo e p95 das
+    execuções. Os dados de cada execução vêm de um gerador semeado por
+    (seed, perfil, tamanho, execução), então rodadas repetidas são comparáveis.
+    """
     print(f"\n{'='*70}")
-    print(f"TESTES PARA {tree_name}")
+    print(f"TESTES PARA {tree_name} - perfil '{workload}'")
     print(f"{'='*70}\n")
     
     results = []
     
     for size in data_sizes:
+        if (tree_class is BST and WORKLOADS[workload]['order'] != 'random'
+                and size > DEGENERATE_LIMIT):
+            print(f"Pulando {size} elementos (BST degenerada em entrada ordenada)")
+            results.append({'size': size, 'workload': workload, 'skipped': True})
+            continue
         print(f"Testando com {size} elementos...")
         
-        # Gera dados aleatórios
-        data = random.sample(range(1, size * 10), size)
-        search_keys = random.sample(data, min(100, size))
-        remove_keys = random.sample(data, min(50, size))
-        
-        # Cria a árvore
-        tree = tree_class()
-        
-        # Teste de inserção
-        start_time = time.time()
-        for key in data:
-            tree.insert(key)
-        insert_time = time.time() - start_time
-        
-        insert_comparisons = tree.comparisons
-        rotations = tree.rotations if hasattr(tree, 'rotations') else 0
-        tree.reset_metrics()
-        
-        # Teste de busca
-        start_time = time.time()
-        for key in search_keys:
-            tree.search(key)
-        search_time = time.time() - start_time
+        runs = []
+        for trial in range(warmup + trials):
+            rng = random.Random(f"{seed}-{workload}-{size}-{trial}")
+            run = run_trial(tree_class, generate_workload(workload, size, rng))
+            if trial >= warmup:
+                runs.append(run)
         
-        search_comparisons = tree.comparisons
-        tree.reset_metrics()
-        
-        # Teste de remoção
-        start_time = time.time()
-        for key in remove_keys:
-            tree.remove(key)
-        remove_time = time.time() - start_time
-        
-        remove_comparisons = tree.comparisons
-        
-        # Calcula altura final
-        final_height = tree.height()
-        
-        # Armazena resultados
+        totals = [run['total_ns'] for run in runs]
         result = {
             'size': size,
-            'insert_time': insert_time,
-            'search_time': search_time,
-            'remove_time': remove_time,
-            'total_time': insert_time + search_time + remove_time,
-            'height': final_height,
-            'rotations': rotations,
-            'avg_insert_comp': insert_comparisons / size if size > 0 else 0,
-            'avg_search_comp': search_comparisons / len(search_keys) if search_keys else 0,
-            'avg_remove_comp': remove_comparisons / len(remove_keys) if remove_keys else 0
+            'workload': workload,
+            'skipped': False,
+            'trials': trials,
+            'insert_time': statistics.median(run['insert_ns'] for run in runs) / 1e9,
+            'search_time': statistics.median(run['search_ns'] for run in runs) / 1e9,
+            'mixed_time': statistics.median(run['mixed_ns'] for run in runs) / 1e9,
+            'remove_time': statistics.median(run['remove_ns'] for run in runs) / 1e9,
+            'total_time': statistics.median(totals) / 1e9,
+            'total_time_min': min(totals) / 1e9,
+            'total_time_p95': percentile(totals, 95) / 1e9,
+            'height': max(run['height'] for run in runs),
+            'rotations': statistics.median(run['rotations'] for run in runs),
+            'avg_insert_comp': statistics.median(run['avg_insert_comp'] for run in runs),
+            'avg_search_comp': statistics.median(run['avg_search_comp'] for run in runs),
+            'avg_remove_comp': statistics.median(run['avg_remove_comp'] for run in runs),
         }
         results.append(result)
     
@@ -81,68 +234,866 @@ def print_results_table(tree_name, results):
     """Imprime tabela formatada com os resultados"""
     print(f"\n{tree_name} - RESULTADOS DETALHADOS")
     print("-" * 100)
-    print(f"{'Tamanho':<10} {'Tempo Total':<15} {'Altura':<10} {'Rotações':<12} "
-          f"{'Comp/Insert':<15} {'Comp/Search':<15}")
+    print(f"{'Tamanho':<10} {'Mediana (s)':<14} {'P95 (s)':<12} {'Altura':<8} "
+          f"{'Rotações':<12} {'Comp/Insert':<13} {'Comp/Search':<13}")
     print("-" * 100)
     
     for r in results:
-        print(f"{r['size']:<10} {r['total_time']:<15.6f} {r['height']:<10} "
-              f"{r['rotations']:<12} {r['avg_insert_comp']:<15.2f} "
-              f"{r['avg_search_comp']:<15.2f}")
+        if r['skipped']:
+            print(f"{r['size']:<10} {'N/A':<14}")
+            continue
+        print(f"{r['size']:<10} {r['total_time']:<14.6f} {r['total_time_p95']:<12.6f} "
+              f"{r['height']:<8} {r['rotations']:<12.0f} {r['avg_insert_comp']:<13.2f} "
+              f"{r['avg_search_comp']:<13.2f}")
     
     print("-" * 100)
 
-def compare_trees(data_sizes):
-    """Compara as três árvores"""
+def print_comparison_table(title, data_sizes, results_by_tree, field, fmt):
+    """Imprime uma tabela comparativa de um campo entre todas as árvores"""
+    labels = list(results_by_tree)
+    width = 16 * (len(labels) + 1)
+    print("\n" + "="*width)
+    print(title)
+    print("="*width)
+    print(f"{'Tamanho':<15} " + " ".join(f"{label:<15}" for label in labels))
+    print("-" * width)
+    
+    for i, size in enumerate(data_sizes):
+        cells = []
+        for label in labels:
+            r = results_by_tree[label][i]
+            value = r.get(field) if not r['skipped'] else None
+            cells.append(f"{format(value, fmt) if value is not None else 'N/A':<15}")
+        print(f"{size:<15} " + " ".join(cells))
+
+def compare_trees(data_sizes, workload='random', trials=3, warmup=1, seed=DEFAULT_SEED):
+    """Compara as árvores num perfil de carga; retorna os resultados de todas"""
+    print("\n" + "="*70)
+    print(f"COMPARAÇÃO DE DESEMPENHO DAS ÁRVORES - perfil '{workload}'")
+    print("="*70)
+    
+    results_by_tree = {}
+    all_results = []
+    for tree_class, label, tree_name in TREE_TYPES:
+        results = test_tree(tree_class, tree_name, data_sizes, workload, trials, warmup, seed)
+        results_by_tree[label] = results
+        for r in results:
+            all_results.append(dict(r, tree=label))
+    
+    print_comparison_table("TABELA COMPARATIVA - TEMPO TOTAL (mediana, segundos)",
+                           data_sizes, results_by_tree, 'total_time', '.6f')
+    print_comparison_table("TABELA COMPARATIVA - ALTURA FINAL",
+                           data_sizes, results_by_tree, 'height', 'd')
+    print_comparison_table("TABELA COMPARATIVA - ROTAÇÕES",
+                           data_sizes, results_by_tree, 'rotations', '.0f')
+    print_comparison_table("TABELA COMPARATIVA - COMPARAÇÕES POR BUSCA",
+                           data_sizes, results_by_tree, 'avg_search_comp', '.2f')
+    
+    print("\n")
+    return all_results
+
+def write_results(results, path, metadata=None):
+    """Grava os resultados em JSON ou CSV (pela extensão) para acompanhar regressões"""
+    if path.endswith('.csv'):
+        fields = []
+        for r in results:
+            for field in r:
+                if field not in fields:
+                    fields.append(field)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w') as f:
+            json.dump({'metadata': metadata or {}, 'results': results}, f, indent=2)
+    print(f"Resultados gravados em {path}")
+
+def compare_bulk_load(data_sizes):
+    """Compara a carga por inserções sucessivas com a construção em O(n)"""
     print("\n" + "="*70)
-    print("COMPARAÇÃO DE DESEMPENHO DAS TRÊS ÁRVORES")
+    print("CARGA INICIAL - insert() um a um x from_iterable()")
     print("="*70)
+    print(f"{'Tamanho':<12} {'Árvore':<8} {'Insert (s)':<14} {'Bulk (s)':<14} "
+          f"{'Alt. insert':<12} {'Alt. bulk':<10}")
+    print("-" * 70)
     
-    bst_results = test_tree(BST, "BST (Árvore Binária de Busca)", data_sizes)
-    avl_results = test_tree(AVL, "AVL (Árvore Balanceada)", data_sizes)
-    rbt_results = test_tree(RBT, "RBT (Árvore Rubro-Negra)", data_sizes)
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+            start_time = time.perf_counter()
+            tree = tree_class()
+            for key in data:
+                tree.insert(key)
+            insert_time = time.perf_counter() - start_time
+            insert_height = tree.height()
+            
+            start_time = time.perf_counter()
+            tree = tree_class.from_iterable(data)
+            bulk_time = time.perf_counter() - start_time
+            
+            print(f"{size:<12} {tree_name:<8} {insert_time:<14.6f} {bulk_time:<14.6f} "
+                  f"{insert_height:<12} {tree.height():<10}")
     
-    # Tabela comparativa
+    print("-" * 70)
+
+def measure_memory(tree_class, data):
+    """Retorna os bytes alocados para manter uma árvore com as chaves de data"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tree = tree_class()
+    for key in data:
+        tree.insert(key)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used, tree
+
+def compare_memory(data_sizes):
+    """Compara bytes por chave entre os nós-objeto e o armazenamento em arrays"""
     print("\n" + "="*70)
-    print("TABELA COMPARATIVA - TEMPO TOTAL (segundos)")
+    print("MEMÓRIA - nós-objeto x colunas array.array")
     print("="*70)
-    print(f"{'Tamanho':<15} {'BST':<20} {'AVL':<20} {'RBT':<20}")
+    print(f"{'Tamanho':<12} {'Árvore':<12} {'Bytes/chave':<14} {'Insert (s)':<14}")
     print("-" * 70)
     
-    for i, size in enumerate(data_sizes):
-        print(f"{size:<15} {bst_results[i]['total_time']:<20.6f} "
-              f"{avl_results[i]['total_time']:<20.6f} "
-              f"{rbt_results[i]['total_time']:<20.6f}")
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        for tree_class, tree_name in [(AVL, "AVL"), (ArrayAVL, "ArrayAVL"),
+                                      (RBT, "RBT"), (ArrayRBT, "ArrayRBT")]:
+            used, _ = measure_memory(tree_class, data)
+            
+            start_time = time.perf_counter()
+            tree = tree_class()
+            for key in data:
+                tree.insert(key)
+            insert_time = time.perf_counter() - start_time
+            
+            print(f"{size:<12} {tree_name:<12} {used / size:<14.1f} {insert_time:<14.6f}")
     
+    print("-" * 70)
+
+def benchmark_node_footprint(data_sizes):
+    """Mede memória por nó e vazão de inserção (inserções/s) das árvores de objetos"""
     print("\n" + "="*70)
-    print("TABELA COMPARATIVA - ALTURA FINAL")
+    print("NÓS - MEMÓRIA POR NÓ E VAZÃO DE INSERÇÃO")
     print("="*70)
-    print(f"{'Tamanho':<15} {'BST':<20} {'AVL':<20} {'RBT':<20}")
+    print(f"{'Tamanho':<12} {'Árvore':<8} {'Bytes/nó':<12} {'Inserções/s':<16}")
     print("-" * 70)
     
-    for i, size in enumerate(data_sizes):
-        print(f"{size:<15} {bst_results[i]['height']:<20} "
-              f"{avl_results[i]['height']:<20} "
-              f"{rbt_results[i]['height']:<20}")
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+            used, _ = measure_memory(tree_class, data)
+            
+            start_time = time.perf_counter()
+            tree = tree_class()
+            for key in data:
+                tree.insert(key)
+            insert_time = time.perf_counter() - start_time
+            
+            print(f"{size:<12} {tree_name:<8} {used / size:<12.1f} "
+                  f"{size / insert_time:<16.0f}")
     
+    print("-" * 70)
+
+def benchmark_range_queries(data_sizes, num_queries=200):
+    """Compara consultas de intervalo: inorder() filtrado x range() x count_range()"""
     print("\n" + "="*70)
-    print("TABELA COMPARATIVA - ROTAÇÕES")
+    print("CONSULTAS DE INTERVALO - inorder() filtrado x range() x count_range()")
     print("="*70)
-    print(f"{'Tamanho':<15} {'BST':<20} {'AVL':<20} {'RBT':<20}")
+    print(f"{'Tamanho':<10} {'Árvore':<8} {'Filtro (s)':<14} {'range (s)':<14} "
+          f"{'count_range (s)':<16}")
     print("-" * 70)
     
-    for i, size in enumerate(data_sizes):
-        print(f"{size:<15} {'N/A':<20} "
-              f"{avl_results[i]['rotations']:<20} "
-              f"{rbt_results[i]['rotations']:<20}")
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        width = max(1, size // 10)
+        queries = []
+        for _ in range(num_queries):
+            lo = random.randint(1, size * 10)
+            queries.append((lo, lo + width))
+        
+        for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+            tree = tree_class(order_statistics=True)
+            for key in data:
+                tree.insert(key)
+            
+            start_time = time.perf_counter()
+            for lo, hi in queries:
+                [key for key in tree.inorder() if lo <= key <= hi]
+            filter_time = time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            for lo, hi in queries:
+                list(tree.range(lo, hi))
+            range_time = time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            for lo, hi in queries:
+                tree.count_range(lo, hi)
+            count_time = time.perf_counter() - start_time
+            
+            print(f"{size:<10} {tree_name:<8} {filter_time:<14.6f} {range_time:<14.6f} "
+                  f"{count_time:<16.6f}")
     
-    print("\n")
+    print("-" * 70)
+
+def soak_rbt(size, operations, checkpoints=10, seed=42):
+    """Carga longa de inserções/remoções aleatórias na RBT.
+    
+    A cada checkpoint confere as propriedades rubro-negras e se a altura
+    continua dentro do limite teórico 2*log2(n+1).
+    """
+    print("\n" + "="*70)
+    print(f"SOAK RBT - {operations} operações sobre ~{size} chaves")
+    print("="*70)
+    print(f"{'Operações':<12} {'Elementos':<12} {'Altura':<10} {'Limite':<10} "
+          f"{'Rotações':<12} {'Válida':<8}")
+    print("-" * 70)
+    
+    rng = random.Random(seed)
+    key_space = size * 2
+    tree = RBT()
+    for key in rng.sample(range(key_space), size):
+        tree.insert(key)
+    
+    step = max(1, operations // checkpoints)
+    all_ok = True
+    for done in range(1, operations + 1):
+        key = rng.randrange(key_space)
+        if rng.random() < 0.5:
+            tree.insert(key)
+        else:
+            tree.remove(key)
+        
+        if done % step == 0:
+            n = len(tree)
+            limit = 2 * math.log2(n + 1)
+            valid = tree.is_valid() and tree.height() <= limit
+            all_ok = all_ok and valid
+            print(f"{done:<12} {n:<12} {tree.height():<10} {limit:<10.2f} "
+                  f"{tree.rotations:<12} {'sim' if valid else 'NÃO':<8}")
+    
+    print("-" * 70)
+    return all_ok
+
+def benchmark_batch_operations(data_sizes, batch_size=5000):
+    """Compara laços chave a chave com insert_many/search_many/remove_many"""
+    print("\n" + "="*70)
+    print(f"OPERAÇÕES EM LOTE - lote de {batch_size} chaves ordenadas")
+    print("="*70)
+    print(f"{'Tamanho':<10} {'Árvore':<8} {'Operação':<10} {'Laço (s)':<12} "
+          f"{'Lote (s)':<12} {'Comp laço':<12} {'Comp lote':<12}")
+    print("-" * 80)
+    
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        present = sorted(random.sample(data, min(batch_size, size)))
+        fresh = sorted(random.sample(range(size * 10, size * 20), min(batch_size, size * 10)))
+        
+        for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+            loop_tree = tree_class()
+            batch_tree = tree_class()
+            for key in data:
+                loop_tree.insert(key)
+                batch_tree.insert(key)
+            
+            operations = [
+                ("insert", fresh, loop_tree.insert, batch_tree.insert_many),
+                ("search", present, loop_tree.search, batch_tree.search_many),
+                ("remove", present, loop_tree.remove, batch_tree.remove_many),
+            ]
+            for op_name, keys, single, batch in operations:
+                loop_tree.reset_metrics()
+                batch_tree.reset_metrics()
+                
+                start_time = time.perf_counter()
+                for key in keys:
+                    single(key)
+                loop_time = time.perf_counter() - start_time
+                
+                start_time = time.perf_counter()
+                batch(keys)
+                batch_time = time.perf_counter() - start_time
+                
+                print(f"{size:<10} {tree_name:<8} {op_name:<10} {loop_time:<12.6f} "
+                      f"{batch_time:<12.6f} {loop_tree.comparisons:<12} "
+                      f"{batch_tree.comparisons:<12}")
+    
+    print("-" * 80)
+
+def benchmark_snapshot(data_sizes, num_queries=1000):
+    """Compara a reconstrução por inserções com save()/load() de snapshot"""
+    print("\n" + "="*70)
+    print("SNAPSHOT - reinserção x load() x busca direta no mmap")
+    print("="*70)
+    print(f"{'Tamanho':<12} {'Árvore':<8} {'Insert (s)':<12} {'Save (s)':<12} "
+          f"{'Load (s)':<12} {'Abrir view (s)':<16} {'Buscas view (s)':<16}")
+    print("-" * 90)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in data_sizes:
+            data = random.sample(range(1, size * 10), size)
+            queries = random.sample(data, min(num_queries, size))
+            for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+                path = os.path.join(tmp, f"{tree_name}-{size}.snap")
+                
+                start_time = time.perf_counter()
+                tree = tree_class()
+                for key in data:
+                    tree.insert(key)
+                insert_time = time.perf_counter() - start_time
+                
+                start_time = time.perf_counter()
+                tree.save(path)
+                save_time = time.perf_counter() - start_time
+                
+                start_time = time.perf_counter()
+                loaded = tree_class.load(path)
+                load_time = time.perf_counter() - start_time
+                assert loaded.height() == tree.height()
+                
+                start_time = time.perf_counter()
+                view = SnapshotView(path)
+                open_time = time.perf_counter() - start_time
+                start_time = time.perf_counter()
+                for key in queries:
+                    view.search(key)
+                view_time = time.perf_counter() - start_time
+                view.close()
+                
+                print(f"{size:<12} {tree_name:<8} {insert_time:<12.4f} {save_time:<12.4f} "
+                      f"{load_time:<12.4f} {open_time:<16.6f} {view_time:<16.6f}")
+        
+        # Árvores key= vazias também precisam fazer a volta save()/load()
+        for tree_class in (BST, AVL, RBT):
+            path = os.path.join(tmp, f"{tree_class.__name__}-vazia.snap")
+            tree_class(key=itemgetter(0)).save(path)
+            assert len(tree_class.load(path, key=itemgetter(0))) == 0
+    
+    print("-" * 90)
+
+def benchmark_wal(data_sizes, policies=('never', 'interval', 'batch')):
+    """Vazão de insert/remove em memória x com log de escrita antecipada"""
+    print("\n" + "="*70)
+    print("WAL - vazão em memória x DurableTree (por política de fsync)")
+    print("="*70)
+    print(f"{'Tamanho':<12} {'Árvore':<8} {'Modo':<12} {'Ops/s':<14} {'Fator':<8} "
+          f"{'Recuperação (s)':<16}")
+    print("-" * 75)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in data_sizes:
+            data = random.sample(range(1, size * 10), size)
+            removals = data[:size // 2]
+            operations = size + len(removals)
+            for tree_class, tree_name in [(BST, "BST"), (AVL, "AVL"), (RBT, "RBT")]:
+                start_time = time.perf_counter()
+                tree = tree_class()
+                for key in data:
+                    tree.insert(key)
+                for key in removals:
+                    tree.remove(key)
+                base_time = time.perf_counter() - start_time
+                print(f"{size:<12} {tree_name:<8} {'memória':<12} "
+                      f"{operations / base_time:<14.0f} {1.0:<8.2f} {'-':<16}")
+                
+                for policy in policies:
+                    directory = os.path.join(tmp, f"{tree_name}-{size}-{policy}")
+                    start_time = time.perf_counter()
+                    durable = DurableTree(directory, tree_class, fsync=policy)
+                    for key in data:
+                        durable.insert(key)
+                    for key in removals:
+                        durable.remove(key)
+                    durable.close()
+                    wal_time = time.perf_counter() - start_time
+                    
+                    start_time = time.perf_counter()
+                    recovered = DurableTree(directory, tree_class)
+                    recovery_time = time.perf_counter() - start_time
+                    assert len(recovered) == len(tree)
+                    recovered.close()
+                    
+                    print(f"{size:<12} {tree_name:<8} {policy:<12} "
+                          f"{operations / wal_time:<14.0f} {wal_time / base_time:<8.2f} "
+                          f"{recovery_time:<16.4f}")
+    
+    print("-" * 75)
+
+def benchmark_frozen_index(data_sizes, num_queries=10000):
+    """Vazão de busca das árvores vivas x índices congelados"""
+    print("\n" + "="*70)
+    print("ÍNDICE CONGELADO - buscas por segundo")
+    print("="*70)
+    print(f"{'Tamanho':<12} {'Estrutura':<20} {'search (ops/s)':<16} "
+          f"{'search_many (ops/s)':<20} {'Bytes/chave':<12}")
+    print("-" * 80)
+    
+    layouts = ['sorted', 'eytzinger'] + (['numpy'] if np is not None else [])
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        # Metade das buscas acerta, metade erra
+        queries = random.sample(data, min(num_queries // 2, size))
+        queries += random.sample(range(size * 10, size * 20), len(queries))
+        random.shuffle(queries)
+        
+        structures = [(tree_name, tree_class.from_iterable(data))
+                      for tree_class, tree_name in [(AVL, "AVL"), (RBT, "RBT"), (BTree, "B-Tree")]]
+        for layout in layouts:
+            structures.append((f"Frozen ({layout})", FrozenIndex(data, layout)))
+        
+        for name, structure in structures:
+            search = structure.search
+            start_time = time.perf_counter()
+            for key in queries:
+                search(key)
+            search_time = time.perf_counter() - start_time
+            
+            many_rate = f"{'-':<20}"
+            if hasattr(structure, 'search_many'):
+                start_time = time.perf_counter()
+                structure.search_many(queries)
+                many_time = time.perf_counter() - start_time
+                many_rate = f"{len(queries) / many_time:<20.0f}"
+            key_bytes = (f"{structure.nbytes() / size:<12.1f}"
+                         if isinstance(structure, FrozenIndex) else f"{'-':<12}")
+            print(f"{size:<12} {name:<20} {len(queries) / search_time:<16.0f} "
+                  f"{many_rate} {key_bytes}")
+    
+    print("-" * 80)
+
+def benchmark_cache(data_sizes, num_queries=50000, seed=DEFAULT_SEED):
+    """Latência de busca com e sem cache de chaves quentes (buscas Zipf)"""
+    print("\n" + "="*70)
+    print("CACHE DE CHAVES QUENTES - buscas com distribuição de Zipf")
+    print("="*70)
+    print(f"{'Tamanho':<12} {'Árvore':<8} {'Cache':<14} {'ns/busca':<12} "
+          f"{'Acertos':<10} {'Comp/busca':<12}")
+    print("-" * 75)
+    
+    for size in data_sizes:
+        rng = random.Random(f"{seed}-cache-{size}")
+        data = rng.sample(range(1, size * 10), size)
+        queries = zipf_sample(rng, rng.sample(data, size), num_queries)
+        capacity = max(64, size // 100)
+        for tree_class, tree_name in [(AVL, "AVL"), (RBT, "RBT")]:
+            tree = tree_class.from_iterable(data)
+            variants = [("sem cache", tree)]
+            for policy in ('lru', 'lfu', 'clock'):
+                variants.append((f"{policy} ({capacity})", CachedTree(tree, capacity, policy)))
+            
+            for label, structure in variants:
+                tree.reset_metrics()
+                search = structure.search
+                start = time.perf_counter_ns()
+                for key in queries:
+                    search(key)
+                elapsed = time.perf_counter_ns() - start
+                hit_rate = (f"{structure.stats()['hit_rate']:<10.1%}"
+                            if isinstance(structure, CachedTree) else f"{'-':<10}")
+                print(f"{size:<12} {tree_name:<8} {label:<14} {elapsed / len(queries):<12.0f} "
+                      f"{hit_rate} {tree.comparisons / len(queries):<12.2f}")
+            
+            # Árvore key=: o cache é indexado pela chave de ordenação, não pelo elemento
+            keyed = CachedTree(tree_class.from_iterable(((key, 0) for key in data),
+                                                        key=itemgetter(0)), capacity)
+            sample = queries[:1000]
+            assert all(keyed.search((key, 1)) for key in sample)
+            keyed.remove((sample[0], 1))
+            assert not keyed.search((sample[0], 0))
+    
+    print("-" * 75)
+
+def benchmark_skewed_search(data_sizes, exponents=(1.1, 1.3), num_queries=50000,
+                            seed=DEFAULT_SEED):
+    """Comparações por busca em sequências longas de buscas Zipf (favorece a Splay)"""
+    print("\n" + "="*80)
+    print("BUSCAS ENVIESADAS - comparações por busca (distribuição de Zipf)")
+    print("="*80)
+    print(f"{'Tamanho':<12} {'Expoente':<10} "
+          + " ".join(f"{label:<10}" for _, label, _ in TREE_TYPES))
+    print("-" * 80)
+    
+    for size in data_sizes:
+        rng = random.Random(f"{seed}-skew-{size}")
+        data = rng.sample(range(1, size * 10), size)
+        hot_order = rng.sample(data, size)
+        for s in exponents:
+            queries = zipf_sample(rng, hot_order, num_queries, s)
+            row = []
+            for tree_class, _, _ in TREE_TYPES:
+                tree = tree_class()
+                for key in data:
+                    tree.insert(key)
+                tree.reset_metrics()
+                for key in queries:
+                    tree.search(key)
+                row.append(f"{tree.comparisons / num_queries:<10.2f}")
+            print(f"{size:<12} {s:<10} " + " ".join(row))
+    
+    print("-" * 80)
+
+def benchmark_split_join(data_sizes, fraction=0.1):
+    """Recorte e reinserção de um intervalo: split/join da Treap vs chave a chave na AVL"""
+    print("\n" + "="*70)
+    print(f"SPLIT/JOIN - mover {fraction:.0%} das chaves (intervalo central) e devolver")
+    print("="*70)
+    print(f"{'Tamanho':<12} {'Chaves':<10} {'Treap split+join (s)':<22} "
+          f"{'AVL remove+insert (s)':<22} {'Razão':<8}")
+    print("-" * 76)
+    
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        ordered = sorted(data)
+        lo = ordered[int(size * (0.5 - fraction / 2))]
+        hi = ordered[int(size * (0.5 + fraction / 2))]
+        moved = [key for key in ordered if lo <= key < hi]
+        
+        treap = Treap.from_iterable(data)
+        start = time.perf_counter()
+        middle = treap.split(lo)
+        right = middle.split(hi)
+        middle.join(right)
+        treap.join(middle)
+        treap_time = time.perf_counter() - start
+        
+        avl = AVL.from_iterable(data)
+        start = time.perf_counter()
+        for key in moved:
+            avl.remove(key)
+        for key in moved:
+            avl.insert(key)
+        avl_time = time.perf_counter() - start
+        
+        print(f"{size:<12} {len(moved):<10} {treap_time:<22.6f} {avl_time:<22.6f} "
+              f"{avl_time / treap_time:<8.0f}")
+    
+    print("-" * 76)
+
+def benchmark_set_operations(data_sizes, small_sizes=(100, 10000, None)):
+    """União e diferença: reinserção chave a chave x join (setops.py) x merge linear.
+    
+    None em small_sizes usa árvores do mesmo tamanho (m = n).
+    """
+    print("\n" + "="*86)
+    print("ÁLGEBRA DE CONJUNTOS - árvore grande (n) com árvore pequena (m)")
+    print("="*86)
+    print(f"{'n':<10} {'m':<8} {'Árvore':<8} {'Operação':<10} {'Ingênuo (s)':<14} "
+          f"{'Join (s)':<14} {'Merge (s)':<14}")
+    print("-" * 86)
+    
+    for size in data_sizes:
+        for small in small_sizes:
+            small = size if small is None else small
+            if small > size:
+                continue
+            data = random.sample(range(1, size * 10), size)
+            # Metade das chaves da árvore pequena também está na grande
+            other = random.sample(data, small // 2) + random.sample(range(size * 10, size * 20),
+                                                                    small - small // 2)
+            for tree_class, tree_name in [(AVL, "AVL"), (RBT, "RBT")]:
+                # Ingênuo: despeja a árvore pequena com inorder() e reinsere/remove
+                big = tree_class.from_iterable(data)
+                small_tree = tree_class.from_iterable(other)
+                start = time.perf_counter()
+                for key in small_tree.inorder():
+                    big.insert(key)
+                naive_union = time.perf_counter() - start
+                
+                big = tree_class.from_iterable(data)
+                start = time.perf_counter()
+                for key in small_tree.inorder():
+                    big.remove(key)
+                naive_difference = time.perf_counter() - start
+                
+                big = tree_class.from_iterable(data)
+                small_tree = tree_class.from_iterable(other)
+                start = time.perf_counter()
+                merged = big.merge(small_tree)
+                merge_time = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                big.union(small_tree)
+                join_union = time.perf_counter() - start
+                assert len(big) == len(merged)
+                
+                big = tree_class.from_iterable(data)
+                small_tree = tree_class.from_iterable(other)
+                start = time.perf_counter()
+                big.difference(small_tree)
+                join_difference = time.perf_counter() - start
+                
+                print(f"{size:<10} {small:<8} {tree_name:<8} {'união':<10} {naive_union:<14.6f} "
+                      f"{join_union:<14.6f} {merge_time:<14.6f}")
+                print(f"{size:<10} {small:<8} {tree_name:<8} {'diferença':<10} "
+                      f"{naive_difference:<14.6f} {join_difference:<14.6f} {'-':<14}")
+    
+    print("-" * 86)
+
+def benchmark_concurrency(size=100000, thread_counts=(1, 2, 4, 8),
+                          read_ratios=(0.99, 0.9, 0.5), operations=40000, seed=DEFAULT_SEED):
+    """Vazão do ConcurrentTree com várias threads e proporções de leitura/escrita.
+    
+    As operações são divididas entre as threads. No modo 'cow' cada thread
+    abre um snapshot a cada 1000 operações e percorre 100 chaves dele.
+    """
+    print("\n" + "="*78)
+    print(f"CONCORRÊNCIA - ConcurrentTree(AVL), {size} chaves, {operations} operações")
+    print("="*78)
+    print(f"{'Threads':<10} {'Leituras':<10} {'Modo':<8} {'Tempo (s)':<12} {'ops/s':<12} "
+          f"{'Comparações':<14}")
+    print("-" * 78)
+    
+    rng = random.Random(f"{seed}-concurrency")
+    data = rng.sample(range(1, size * 10), size)
+    for read_ratio in read_ratios:
+        for threads in thread_counts:
+            for mode in ('rwlock', 'cow'):
+                tree = ConcurrentTree(AVL.from_iterable(data), snapshots=(mode == 'cow'))
+                per_thread = operations // threads
+                plans = []
+                for t in range(threads):
+                    plan_rng = random.Random(f"{seed}-{t}")
+                    plans.append([(plan_rng.random() < read_ratio, plan_rng.choice(data),
+                                   plan_rng.randrange(size * 10, size * 20))
+                                  for _ in range(per_thread)])
+                barrier = threading.Barrier(threads + 1)
+                
+                def worker(plan):
+                    barrier.wait()
+                    for i, (is_read, key, fresh) in enumerate(plan):
+                        if is_read:
+                            tree.search(key)
+                        elif i % 2:
+                            tree.insert(fresh)
+                        else:
+                            tree.remove(fresh)
+                        if mode == 'cow' and i % 1000 == 0:
+                            with tree.snapshot() as snap:
+                                for _ in zip(range(100), snap):
+                                    pass
+                
+                workers = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+                for w in workers:
+                    w.start()
+                barrier.wait()
+                start = time.perf_counter()
+                for w in workers:
+                    w.join()
+                elapsed = time.perf_counter() - start
+                print(f"{threads:<10} {read_ratio:<10.0%} {mode:<8} {elapsed:<12.4f} "
+                      f"{per_thread * threads / elapsed:<12.0f} {tree.comparisons:<14}")
+    
+    print("-" * 78)
+
+def benchmark_persistent(data_sizes, num_versions=1000):
+    """Memória e tempo por versão: árvores persistentes x cópia completa a cada versão"""
+    print("\n" + "="*74)
+    print(f"VERSÕES - {num_versions} versões sucessivas (uma inserção por versão)")
+    print("="*74)
+    print(f"{'Tamanho':<12} {'Estratégia':<22} {'Bytes/versão':<16} {'µs/versão':<12}")
+    print("-" * 74)
+    
+    for size in data_sizes:
+        data = random.sample(range(1, size * 10), size)
+        fresh = random.sample(range(size * 10, size * 20), num_versions)
+        for tree_class, label in [(PersistentAVL, "PersistentAVL"), (PersistentRBT, "PersistentRBT")]:
+            version = tree_class.from_iterable(data)
+            history = [version]
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            for key in fresh:
+                version = version.insert(key)
+                history.append(version)
+            elapsed = time.perf_counter() - start
+            used = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            print(f"{size:<12} {label:<22} {used / num_versions:<16.0f} "
+                  f"{elapsed / num_versions * 1e6:<12.1f}")
+        
+        # Cópia completa: mede poucas versões e extrapola por versão
+        copies = min(num_versions, 10)
+        for tree_class, label in [(AVL, "AVL (cópia completa)"), (RBT, "RBT (cópia completa)")]:
+            tree = tree_class.from_iterable(data)
+            history = []
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            for key in fresh[:copies]:
+                tree = tree_class.from_iterable(tree.iter_inorder(), assume_sorted=True)
+                tree.insert(key)
+                history.append(tree)
+            elapsed = time.perf_counter() - start
+            used = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            print(f"{size:<12} {label:<22} {used / copies:<16.0f} {elapsed / copies * 1e6:<12.1f}")
+    
+    print("-" * 74)
+
+def benchmark_sharded(size=200000, shard_counts=(1, 2, 4, 8), num_queries=200000,
+                      seed=DEFAULT_SEED):
+    """Vazão do ShardedTree por número de processos x uma AVL no próprio processo.
+    
+    Metade das chaves é carregada antes; mede-se a inserção da outra metade
+    (incremental, com rotações) e um lote de buscas aleatórias.
+    """
+    print("\n" + "="*86)
+    print(f"SHARDS - {size} chaves, {num_queries} buscas, {os.cpu_count()} núcleos")
+    print("="*86)
+    print(f"{'Shards':<8} {'Partição':<10} {'Inserção (s)':<14} {'Busca (s)':<12} "
+          f"{'ops/s':<12} {'Aceleração':<12} {'Comparações':<14}")
+    print("-" * 86)
+    
+    rng = random.Random(f"{seed}-sharded")
+    data = rng.sample(range(size * 10), size)
+    initial, fresh = data[:size // 2], data[size // 2:]
+    queries = [rng.randrange(size * 10) for _ in range(num_queries)]
+    operations = len(fresh) + num_queries
+    
+    tree = AVL.from_iterable(initial)
+    start = time.perf_counter()
+    tree.insert_many(fresh)
+    insert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    tree.search_many(queries)
+    search_time = time.perf_counter() - start
+    baseline = operations / (insert_time + search_time)
+    print(f"{'-':<8} {'AVL':<10} {insert_time:<14.4f} {search_time:<12.4f} "
+          f"{baseline:<12.0f} {1.0:<12.2f} {tree.comparisons:<14}")
+    
+    for shards in shard_counts:
+        boundaries = [size * 10 * i // shards for i in range(1, shards)]
+        for partition in ('hash', 'range'):
+            with ShardedTree(shards, AVL, partition, boundaries=boundaries) as sharded:
+                sharded.insert_many(initial)
+                sharded.reset_metrics()
+                start = time.perf_counter()
+                sharded.insert_many(fresh)
+                insert_time = time.perf_counter() - start
+                start = time.perf_counter()
+                sharded.search_many(queries)
+                search_time = time.perf_counter() - start
+                throughput = operations / (insert_time + search_time)
+                print(f"{shards:<8} {partition:<10} {insert_time:<14.4f} {search_time:<12.4f} "
+                      f"{throughput:<12.0f} {throughput / baseline:<12.2f} "
+                      f"{sharded.comparisons:<14}")
+    
+    # Lotes enormes: respostas maiores que o buffer do pipe não podem travar o envio
+    everything = list(range(size * 10))
+    with ShardedTree(1, AVL, batch_size=len(everything) // 2) as sharded:
+        sharded.insert_many(initial)
+        start = time.perf_counter()
+        found = sharded.search_many(everything)
+        search_time = time.perf_counter() - start
+        assert sum(found) == len(initial)
+        print(f"{1:<8} {'lote':<10} {'-':<14} {search_time:<12.4f} "
+              f"{len(everything) / search_time:<12.0f} {'-':<12} {sharded.comparisons:<14}")
+    
+    print("-" * 86)
+
+def benchmark_key_types(data_sizes, num_queries=50000, seed=DEFAULT_SEED):
+    """Custo de inserção e busca na AVL por tipo de chave.
+    
+    Compara inteiros com textos, tuplas e objetos com __lt__ em Python, e as
+    mesmas chaves compostas com key= (chave calculada uma vez e guardada no
+    nó) e com int_key (tupla empacotada num único int).
+    """
+    print("\n" + "="*84)
+    print(f"TIPOS DE CHAVE - AVL, inserção uma a uma e {num_queries} buscas")
+    print("="*84)
+    print(f"{'Tamanho':<12} {'Chave':<26} {'Inserção (s)':<14} {'ns/busca':<12} "
+          f"{'Comp/busca':<12}")
+    print("-" * 84)
+    
+    pack = int_key(32, 32)
+    for size in data_sizes:
+        rng = random.Random(f"{seed}-keys-{size}")
+        pairs = list({(rng.randrange(1000), rng.randrange(1 << 20)) for _ in range(size)})
+        rng.shuffle(pairs)
+        records = [_Record(a, b) for a, b in pairs]
+        picks = [rng.randrange(len(pairs)) for _ in range(num_queries)]
+        variants = [
+            ("int", lambda: AVL(), [a << 32 | b for a, b in pairs]),
+            ("str", lambda: AVL(), [f"{a:04d}-{b:07d}" for a, b in pairs]),
+            ("tuple", lambda: AVL(), pairs),
+            ("tuple, key=int_key", lambda: AVL(key=pack), pairs),
+            ("objeto (__lt__)", lambda: AVL(), records),
+            ("objeto, key=attrgetter", lambda: AVL(key=attrgetter('a', 'b')), records),
+            ("objeto, key=int_key", lambda: AVL(key=lambda r: pack((r.a, r.b))), records),
+        ]
+        for label, factory, keys in variants:
+            tree = factory()
+            insert = tree.insert
+            start = time.perf_counter()
+            for key in keys:
+                insert(key)
+            insert_time = time.perf_counter() - start
+            queries = [keys[i] for i in picks]
+            tree.reset_metrics()
+            search = tree.search
+            start = time.perf_counter_ns()
+            for key in queries:
+                search(key)
+            elapsed = time.perf_counter_ns() - start
+            print(f"{len(keys):<12} {label:<26} {insert_time:<14.4f} "
+                  f"{elapsed / num_queries:<12.0f} {tree.comparisons / num_queries:<12.2f}")
+    
+    print("-" * 84)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks das árvores")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="tamanhos testados (ex.: 1000 100000 1000000)")
+    parser.add_argument('--workloads', nargs='+', default=['random'],
+                        choices=sorted(WORKLOADS), help="perfis de carga")
+    parser.add_argument('--trials', type=int, default=3, help="execuções medidas")
+    parser.add_argument('--warmup', type=int, default=1, help="execuções descartadas")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="semente do gerador")
+    parser.add_argument('--output', help="arquivo .json ou .csv para os resultados")
+    parser.add_argument('--skip-extras', action='store_true',
+                        help="roda apenas a comparação principal")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    # Define os tamanhos de teste
-    data_sizes = [100, 1000, 10000]
+    args = parse_args()
+    data_sizes = args.sizes
+    random.seed(args.seed)
     
     # Executa os testes
-    compare_trees(data_sizes)
+    results = []
+    for workload in args.workloads:
+        results.extend(compare_trees(data_sizes, workload, args.trials, args.warmup, args.seed))
+    
+    if args.output:
+        write_results(results, args.output, {
+            'seed': args.seed,
+            'trials': args.trials,
+            'warmup': args.warmup,
+            'sizes': data_sizes,
+            'workloads': args.workloads,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        })
+    
+    if not args.skip_extras:
+        compare_bulk_load(data_sizes)
+        compare_memory(data_sizes)
+        benchmark_node_footprint([100000, 1000000])
+        benchmark_range_queries(data_sizes)
+        soak_rbt(10000, 200000, seed=args.seed)
+        benchmark_batch_operations(data_sizes)
+        benchmark_snapshot(data_sizes + [1000000])
+        benchmark_wal(data_sizes)
+        benchmark_frozen_index(data_sizes + [1000000])
+        benchmark_cache(data_sizes + [1000000], seed=args.seed)
+        benchmark_skewed_search(data_sizes, seed=args.seed)
+        benchmark_split_join(data_sizes + [1000000])
+        benchmark_set_operations(data_sizes + [1000000])
+        benchmark_concurrency(seed=args.seed)
+        benchmark_persistent(data_sizes + [1000000])
+        benchmark_sharded(seed=args.seed)
+        benchmark_key_types(data_sizes + [100000], seed=args.seed)
     
     print("\nTestes concluídos!")
@@ -0,0 +1,420 @@
+"""
+Camada de concorrência para as árvores (BST, AVL, RBT e afins)
+
+ConcurrentTree envolve uma árvore com um lock de leitores e escritor
+(RWLock): várias buscas simultâneas ou uma única mutação por vez. Os
+contadores comparisons/rotations da árvore são trocados por ThreadCounter,
+que acumula separadamente por thread (nenhuma atualização se perde entre
+leitores concorrentes) e soma tudo na leitura.
+
+Com snapshots=True o wrapper faz cópia na escrita (copy-on-write):
+snapshot() devolve em O(1) uma visão da versão atual, que nunca mais é
+alterada; a primeira escrita depois de um snapshot copia a árvore e passa a
+mutar a cópia. Leitores iteram a versão deles sem lock enquanto os
+escritores seguem em frente.
+"""
+
+import copy
+import operator
+import threading
+from array import array
+from contextlib import contextmanager
+
+from avl_array import ArrayAVL
+from cache import CachedTree
+from rbt_array import ArrayRBT
+from splay import SplayTree
+
+# Estruturas cujas leituras também reorganizam a árvore ou o estado interno
+_MUTATING_READS = (SplayTree, CachedTree)
+
+class RWLock:
+    """Lock de leitores e escritor com preferência para escritores.
+    
+    Enquanto há escritor esperando, novos leitores aguardam, então um fluxo
+    contínuo de buscas não impede as escritas de avançarem.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+    
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+    
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+    
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+    
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+    
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class ThreadCounter:
+    """Contador com uma parcela por thread, somadas na leitura.
+    
+    A árvore continua fazendo self.comparisons += n: o += chama __iadd__, que
+    soma só na parcela da thread atual e devolve o próprio contador. As demais
+    operações aritméticas e comparações usam o total e devolvem int. Como o
+    objeto continua mudando, guarde int(contador) para medir diferenças.
+    """
+    
+    def __init__(self, initial=0):
+        self._counts = {threading.get_ident(): initial}
+    
+    def __iadd__(self, n):
+        ident = threading.get_ident()
+        counts = self._counts
+        counts[ident] = counts.get(ident, 0) + n
+        return self
+    
+    def per_thread(self):
+        """Parcela de cada thread (identificador -> valor)"""
+        return dict(self._counts)
+    
+    def __int__(self):
+        return sum(list(self._counts.values()))
+    
+    __index__ = __int__
+    
+    def __float__(self):
+        return float(int(self))
+    
+    def __bool__(self):
+        return int(self) != 0
+    
+    def __neg__(self):
+        return -int(self)
+    
+    def __eq__(self, other):
+        return int(self) == other
+    
+    def __hash__(self):
+        return hash(int(self))
+    
+    def __format__(self, spec):
+        return format(int(self), spec)
+    
+    def __repr__(self):
+        return f"ThreadCounter({int(self)})"
+
+def _total_operator(op, reflected=False):
+    """Operador de ThreadCounter aplicado ao total (int) do contador"""
+    if reflected:
+        return lambda self, other: op(other, int(self))
+    return lambda self, other: op(int(self), other)
+
+for _name in ('add', 'sub', 'mul', 'truediv', 'floordiv', 'mod'):
+    _op = getattr(operator, _name)
+    setattr(ThreadCounter, f'__{_name}__', _total_operator(_op))
+    setattr(ThreadCounter, f'__r{_name}__', _total_operator(_op, reflected=True))
+for _name in ('lt', 'le', 'gt', 'ge', 'ne'):
+    setattr(ThreadCounter, f'__{_name}__', _total_operator(getattr(operator, _name)))
+
+def _copy_tree(tree):
+    """Cópia balanceada e independente da árvore (mesmos contadores e parâmetros)"""
+    if isinstance(tree, CachedTree):
+        # copy.copy dividiria a árvore interna; copia ela e começa um cache novo
+        clone = CachedTree(_copy_tree(tree.tree), tree.cache.capacity, tree.policy)
+        clone.hits = tree.hits
+        clone.misses = tree.misses
+        return clone
+    if isinstance(tree, (ArrayAVL, ArrayRBT)):
+        # Sem objetos de nó: copiar as colunas (memcpy) preserva forma e lista livre
+        clone = copy.copy(tree)
+        for name, column in vars(tree).items():
+            if isinstance(column, array):
+                setattr(clone, name, column[:])
+        return clone
+    if hasattr(tree, 'items') and hasattr(tree, '_iter_nodes'):
+        items = list(tree.items())
+        keys = [key for key, _ in items]
+    else:
+        items = None
+        keys = list(tree)
+    clone = copy.copy(tree)
+    if 'nil' in vars(tree):
+        # Sentinela próprio: a remoção na RBT escreve em nil.parent
+        clone.nil = copy.copy(tree.nil)
+    clone._load_sorted(keys)
+    if items is not None and any(value is not None for _, value in items):
+        for node, (_, value) in zip(clone._iter_nodes(), items):
+            node.value = value
+    return clone
+
+class TreeSnapshot:
+    """Visão imutável de uma versão da árvore (ver ConcurrentTree.snapshot)"""
+    
+    def __init__(self, owner, tree):
+        self._owner = owner
+        self.tree = tree
+    
+    def __iter__(self):
+        return iter(self.tree)
+    
+    def __len__(self):
+        return len(self.tree)
+    
+    def __contains__(self, key):
+        return self.tree.search(key)
+    
+    def search(self, key):
+        return self.tree.search(key)
+    
+    def range(self, lo, hi):
+        return self.tree.range(lo, hi)
+    
+    def close(self):
+        """Libera a versão: escritas seguintes não precisam mais copiá-la"""
+        if self._owner is not None:
+            self._owner._release_snapshot(self.tree)
+            self._owner = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class ConcurrentTree:
+    """Árvore segura para várias threads.
+    
+    Uso:
+        tree = ConcurrentTree(AVL(), snapshots=True)
+        tree.insert(10)                 # escritor exclusivo
+        tree.search(10)                 # leitores em paralelo
+        with tree.snapshot() as snap:   # versão congelada, sem lock
+            for key in snap:
+                ...
+    
+    Leituras que devolvem várias chaves (inorder, range, items...) são
+    materializadas em lista dentro do lock, para não segurá-lo entre
+    iterações. Árvores cujas buscas mutam a estrutura (SplayTree,
+    CachedTree) fazem as leituras com o lock de escrita e, com snapshots
+    abertos, copiam a versão antes de buscar; nos snapshots delas, busque de
+    uma thread por vez.
+    """
+    
+    def __init__(self, tree, snapshots=False):
+        self.tree = tree
+        self.snapshots = snapshots
+        self._lock = RWLock()
+        self._mutating_reads = isinstance(tree, _MUTATING_READS)
+        if self._mutating_reads:
+            self._read_locked = self._lock.write_locked
+        else:
+            self._read_locked = self._lock.read_locked
+        self._write_locked = self._lock.write_locked
+        # Snapshots abertos sobre a versão atual de self.tree
+        self._shared = 0
+        self._shared_lock = threading.Lock()
+        self._install_counters()
+    
+    def _install_counters(self):
+        tree = self.tree
+        for name in ('comparisons', 'rotations'):
+            # Só atributos de instância (a rotations da BTree é uma property)
+            value = vars(tree).get(name)
+            if isinstance(value, int):
+                setattr(tree, name, ThreadCounter(value))
+    
+    def detach(self):
+        """Devolve a árvore com os contadores de volta a inteiros"""
+        with self._write_locked():
+            tree = self.tree
+            for name in ('comparisons', 'rotations'):
+                value = vars(tree).get(name)
+                if isinstance(value, ThreadCounter):
+                    setattr(tree, name, int(value))
+            return tree
+    
+    # --- Métricas ---
+    
+    @property
+    def comparisons(self):
+        return int(self.tree.comparisons)
+    
+    @property
+    def rotations(self):
+        return int(getattr(self.tree, 'rotations', 0))
+    
+    def thread_metrics(self):
+        """Contadores separados por thread: {nome: {identificador: valor}}"""
+        return {name: value.per_thread() for name, value in vars(self.tree).items()
+                if isinstance(value, ThreadCounter)}
+    
+    def reset_metrics(self):
+        with self._write_locked():
+            self.tree.reset_metrics()
+            self._install_counters()
+    
+    # --- Escritas ---
+    
+    def _writable(self):
+        """Árvore a mutar; com snapshots abertos, copia antes (copy-on-write)"""
+        if self._shared:
+            with self._shared_lock:
+                self.tree = _copy_tree(self.tree)
+                self._shared = 0
+        return self.tree
+    
+    def _readable(self):
+        """Árvore a consultar; buscas que mutam a estrutura também respeitam o COW"""
+        return self._writable() if self._mutating_reads else self.tree
+    
+    def insert(self, key):
+        with self._write_locked():
+            self._writable().insert(key)
+    
+    def remove(self, key):
+        with self._write_locked():
+            self._writable().remove(key)
+    
+    def put(self, key, value):
+        with self._write_locked():
+            self._writable().put(key, value)
+    
+    def pop(self, key, *default):
+        with self._write_locked():
+            return self._writable().pop(key, *default)
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        with self._write_locked():
+            del self._writable()[key]
+    
+    def insert_many(self, keys):
+        keys = list(keys)
+        with self._write_locked():
+            return self._writable().insert_many(keys)
+    
+    def remove_many(self, keys):
+        keys = list(keys)
+        with self._write_locked():
+            return self._writable().remove_many(keys)
+    
+    # --- Leituras ---
+    
+    def search(self, key):
+        with self._read_locked():
+            return self._readable().search(key)
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def get(self, key, default=None):
+        with self._read_locked():
+            return self._readable().get(key, default)
+    
+    def __getitem__(self, key):
+        with self._read_locked():
+            return self._readable()[key]
+    
+    def search_many(self, keys):
+        keys = list(keys)
+        with self._read_locked():
+            return self._readable().search_many(keys)
+    
+    def floor_entry(self, key):
+        with self._read_locked():
+            return self._readable().floor_entry(key)
+    
+    def ceiling_entry(self, key):
+        with self._read_locked():
+            return self._readable().ceiling_entry(key)
+    
+    def rank(self, key):
+        with self._read_locked():
+            return self._readable().rank(key)
+    
+    def select(self, k):
+        with self._read_locked():
+            return self._readable().select(k)
+    
+    def count_range(self, lo, hi):
+        with self._read_locked():
+            return self._readable().count_range(lo, hi)
+    
+    def range(self, lo, hi):
+        """Chaves em [lo, hi] (lista)"""
+        with self._read_locked():
+            return list(self._readable().range(lo, hi))
+    
+    def inorder(self):
+        with self._read_locked():
+            return self._readable().inorder()
+    
+    def items(self):
+        """Pares (chave, valor) em ordem (lista)"""
+        with self._read_locked():
+            return list(self._readable().items())
+    
+    def height(self):
+        with self._read_locked():
+            return self._readable().height()
+    
+    def __len__(self):
+        with self._read_locked():
+            return len(self._readable())
+    
+    def __iter__(self):
+        """Itera uma versão consistente: snapshot com COW, senão uma cópia das chaves"""
+        if self.snapshots:
+            return self._iter_snapshot()
+        return iter(self.inorder())
+    
+    def _iter_snapshot(self):
+        with self.snapshot() as snap:
+            yield from snap
+    
+    # --- Snapshots (copy-on-write) ---
+    
+    def snapshot(self):
+        """Visão imutável da versão atual em O(1); requer snapshots=True"""
+        if not self.snapshots:
+            raise RuntimeError("snapshot() requer ConcurrentTree criado com snapshots=True")
+        # O lock de leitura garante que nenhum escritor está no meio de uma mutação
+        with self._lock.read_locked():
+            with self._shared_lock:
+                self._shared += 1
+                return TreeSnapshot(self, self.tree)
+    
+    def _release_snapshot(self, tree):
+        with self._shared_lock:
+            # Versões antigas já foram substituídas e não contam mais
+            if tree is self.tree and self._shared:
+                self._shared -= 1
@@ -0,0 +1,560 @@
+"""
+Implementação de Treap (árvore de busca aleatorizada)
+
+Cada nó recebe uma prioridade aleatória e a árvore é, ao mesmo tempo, uma
+BST pelas chaves e um heap (máximo) pelas prioridades. A forma resultante é
+a de uma BST construída em ordem aleatória, então a altura esperada é
+O(log n) para qualquer ordem de inserção, inclusive ordenada.
+
+split(key) e join(other) cortam e juntam intervalos de chaves em O(log n)
+esperado, sem reinserir chave por chave.
+"""
+
+import random
+
+# Marca "valor ausente" em pop(), já que None é um valor válido
+_MISSING = object()
+
+class TreapNode:
+    __slots__ = ('key', 'value', 'priority', 'left', 'right', 'size')
+    
+    def __init__(self, key, priority, value=None):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = 1
+
+def _size(node):
+    return node.size if node is not None else 0
+
+class Treap:
+    def __init__(self, seed=None, key=None):
+        """seed fixa a sequência de prioridades (árvores reprodutíveis); com
+        key=f os elementos são ordenados por f(elemento) (ver keyed.py)"""
+        self.root = None
+        self.comparisons = 0
+        self.rotations = 0
+        self._priority = random.Random(seed).random
+        self.key = key
+        if key is not None:
+            from keyed import attach_key
+            attach_key(self, key)
+    
+    @classmethod
+    def from_iterable(cls, iterable, assume_sorted=False, seed=None, key=None):
+        """Constrói a treap em O(n) a partir das chaves ordenadas.
+        
+        A entrada é ordenada e sem duplicatas uma única vez; com
+        assume_sorted=True ela já deve estar em ordem estritamente crescente.
+        """
+        if key is not None:
+            tree = cls(seed, key)
+            tree._load_items(iterable, assume_sorted)
+            return tree
+        keys = list(iterable) if assume_sorted else sorted(set(iterable))
+        tree = cls(seed)
+        tree._load_sorted(keys)
+        return tree
+    
+    def _load_sorted(self, keys):
+        """Substitui o conteúdo pela treap (árvore cartesiana) das chaves ordenadas"""
+        priority = self._priority
+        # Espinha direita da árvore em construção; cada chave nova entra nela
+        spine = []
+        for key in keys:
+            node = TreapNode(key, priority())
+            last = None
+            while spine and spine[-1].priority < node.priority:
+                last = spine.pop()
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+        self.root = spine[0] if spine else None
+        self._fix_sizes(self.root)
+    
+    def _fix_sizes(self, root):
+        """Recalcula os tamanhos de todas as subárvores (pós-ordem iterativa)"""
+        stack = [root] if root is not None else []
+        order = []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        for node in reversed(order):
+            node.size = 1 + _size(node.left) + _size(node.right)
+    
+    def __len__(self):
+        """Número de elementos (tamanho da subárvore da raiz, O(1))"""
+        return _size(self.root)
+    
+    def _rotate_up(self, node, parent, grandparent):
+        """Sobe node acima de parent com uma rotação simples"""
+        if parent.left is node:
+            parent.left = node.right
+            node.right = parent
+        else:
+            parent.right = node.left
+            node.left = parent
+        node.size = parent.size
+        parent.size = 1 + _size(parent.left) + _size(parent.right)
+        if grandparent is None:
+            self.root = node
+        elif grandparent.left is parent:
+            grandparent.left = node
+        else:
+            grandparent.right = node
+        self.rotations += 1
+    
+    def insert(self, key):
+        """Insere um elemento na árvore"""
+        self._insert_node(key)
+    
+    def _insert_node(self, key):
+        """Insere a chave se ausente e retorna o seu nó (novo ou existente)"""
+        path = []
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                path.append(node)
+                node = node.left
+            elif key > node_key:
+                path.append(node)
+                node = node.right
+            else:
+                self.comparisons += comparisons
+                return node
+        self.comparisons += comparisons
+        
+        new_node = TreapNode(key, self._priority())
+        if not path:
+            self.root = new_node
+            return new_node
+        for ancestor in path:
+            ancestor.size += 1
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        
+        # Sobe o nó novo enquanto a prioridade dele violar o heap
+        while path and path[-1].priority < new_node.priority:
+            parent = path.pop()
+            self._rotate_up(new_node, parent, path[-1] if path else None)
+        return new_node
+    
+    def search(self, key):
+        """Busca um elemento na árvore"""
+        return self._find_node(key) is not None
+    
+    def _find_node(self, key):
+        """Retorna o nó da chave ou None"""
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                node = node.right
+            else:
+                break
+        self.comparisons += comparisons
+        return node
+    
+    def remove(self, key):
+        """Remove um elemento da árvore"""
+        self._remove_node(key)
+    
+    def _remove_node(self, key):
+        """Remove a chave e retorna o seu valor, ou _MISSING se ausente"""
+        path = []
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                path.append(node)
+                node = node.left
+            elif key > node_key:
+                path.append(node)
+                node = node.right
+            else:
+                break
+        self.comparisons += comparisons
+        if node is None:
+            return _MISSING
+        
+        for ancestor in path:
+            ancestor.size -= 1
+        # Junta as subárvores do nó removido; cada passo do join equivale a
+        # uma rotação da remoção clássica (descer o nó até virar folha)
+        replacement = self._join(node.left, node.right)
+        if not path:
+            self.root = replacement
+        elif path[-1].left is node:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
+        return node.value
+    
+    def _split(self, node, key):
+        """Divide a subárvore em (chaves < key, chaves >= key)"""
+        left_spine = []
+        right_spine = []
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            if node.key < key:
+                # O nó e a sua subárvore esquerda ficam na parte menor
+                if left_spine:
+                    left_spine[-1].right = node
+                left_spine.append(node)
+                node = node.right
+            else:
+                if right_spine:
+                    right_spine[-1].left = node
+                right_spine.append(node)
+                node = node.left
+        self.comparisons += comparisons
+        
+        if left_spine:
+            left_spine[-1].right = None
+        if right_spine:
+            right_spine[-1].left = None
+        # Só os nós das espinhas mudaram de filhos; tamanhos de baixo para cima
+        for spine in (left_spine, right_spine):
+            for spine_node in reversed(spine):
+                spine_node.size = 1 + _size(spine_node.left) + _size(spine_node.right)
+        return (left_spine[0] if left_spine else None,
+                right_spine[0] if right_spine else None)
+    
+    def _join(self, left, right):
+        """Junta duas subárvores em que todas as chaves de left < as de right"""
+        root = None
+        parent = None
+        attach_left = False
+        while left is not None and right is not None:
+            self.rotations += 1
+            if left.priority > right.priority:
+                # left fica por cima; a sua subárvore direita se junta com right
+                left.size += right.size
+                node = left
+                left = left.right
+                next_attach_left = False
+            else:
+                right.size += left.size
+                node = right
+                right = right.left
+                next_attach_left = True
+            if parent is None:
+                root = node
+            elif attach_left:
+                parent.left = node
+            else:
+                parent.right = node
+            parent = node
+            attach_left = next_attach_left
+        
+        rest = left if left is not None else right
+        if parent is None:
+            return rest
+        if attach_left:
+            parent.left = rest
+        else:
+            parent.right = rest
+        return root
+    
+    def split(self, key):
+        """Corta a árvore em key: esta fica com as chaves < key e a nova
+        treap retornada com as chaves >= key, em O(log n) esperado."""
+        self.root, right_root = self._split(self.root, key)
+        other = type(self)(key=self.key)
+        other._priority = self._priority
+        other.root = right_root
+        return other
+    
+    def join(self, other):
+        """Anexa as chaves de other (todas maiores que as desta árvore) e o esvazia.
+        
+        Custo O(log n) esperado; ValueError se os intervalos se sobrepõem.
+        """
+        if self.root is not None and other.root is not None:
+            if self._max_node().key >= other._min_node().key:
+                raise ValueError("join requer que todas as chaves de other sejam maiores")
+        self.root = self._join(self.root, other.root)
+        other.root = None
+    
+    def _min_node(self):
+        node = self.root
+        while node.left is not None:
+            node = node.left
+        return node
+    
+    def _max_node(self):
+        node = self.root
+        while node.right is not None:
+            node = node.right
+        return node
+    
+    def rank(self, key):
+        """Quantidade de chaves estritamente menores que key, em O(altura)"""
+        return self._count_below(key, False)
+    
+    def _count_below(self, key, inclusive):
+        """Conta as chaves < key (ou <= key, se inclusive) somando tamanhos de subárvores"""
+        count = 0
+        node = self.root
+        comparisons = 0
+        while node is not None:
+            comparisons += 1
+            node_key = node.key
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                count += 1 + _size(node.left)
+                node = node.right
+            else:
+                count += _size(node.left) + (1 if inclusive else 0)
+                break
+        self.comparisons += comparisons
+        return count
+    
+    def select(self, k):
+        """Retorna a k-ésima menor chave (k a partir de 0; negativos contam do fim)"""
+        size = _size(self.root)
+        if k < 0:
+            k += size
+        if not 0 <= k < size:
+            raise IndexError("índice fora do intervalo da árvore")
+        node = self.root
+        while True:
+            left_size = _size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+    
+    def range(self, lo, hi):
+        """Gera as chaves em [lo, hi] em ordem, podando subárvores fora do intervalo.
+        
+        Custo O(altura + k) para k chaves no intervalo.
+        """
+        for node in self._range_nodes(lo, hi):
+            yield node.key
+    
+    def _range_nodes(self, lo, hi):
+        """Gera os nós com chave em [lo, hi] em ordem (ver range)"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+    
+    def count_range(self, lo, hi):
+        """Quantidade de chaves em [lo, hi], em O(altura)"""
+        if hi < lo:
+            return 0
+        return self._count_below(hi, True) - self._count_below(lo, False)
+    
+    # --- Modo mapa ordenado: cada nó guarda também um valor ---
+    
+    def put(self, key, value):
+        """Associa value à chave, inserindo-a se necessário"""
+        self._insert_node(key).value = value
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, ou default se ela não existir"""
+        node = self._find_node(key)
+        return node.value if node is not None else default
+    
+    def pop(self, key, default=_MISSING):
+        """Remove a chave e retorna seu valor (KeyError se ausente e sem default)"""
+        value = self._remove_node(key)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+    
+    def items(self):
+        """Gera os pares (chave, valor) em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+    
+    def keys(self):
+        """Gera as chaves em ordem crescente"""
+        return self.iter_inorder()
+    
+    def values(self):
+        """Gera os valores em ordem crescente de chave"""
+        for node in self._iter_nodes():
+            yield node.value
+    
+    def __contains__(self, key):
+        return self.search(key)
+    
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    
+    def __setitem__(self, key, value):
+        self.put(key, value)
+    
+    def __delitem__(self, key):
+        self.pop(key)
+    
+    def _iter_nodes(self):
+        """Gera os nós em ordem crescente usando uma pilha explícita (memória O(h))"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    
+    def _iter_nodes_reversed(self):
+        """Gera os nós em ordem decrescente usando uma pilha explícita"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+    
+    def iter_inorder(self):
+        """Percurso in-order preguiçoso (esquerda, raiz, direita)"""
+        for node in self._iter_nodes():
+            yield node.key
+    
+    def iter_preorder(self):
+        """Percurso pre-order preguiçoso (raiz, esquerda, direita)"""
+        for node in self._iter_nodes_preorder():
+            yield node.key
+    
+    def _iter_nodes_preorder(self):
+        """Gera os nós em pre-order (ver iter_preorder)"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+    
+    def iter_postorder(self):
+        """Percurso post-order preguiçoso (esquerda, direita, raiz)"""
+        for node in self._iter_nodes_postorder():
+            yield node.key
+    
+    def _iter_nodes_postorder(self):
+        """Gera os nós em post-order (ver iter_postorder)"""
+        stack = []
+        node = self.root
+        last = None
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if top.right is not None and top.right is not last:
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+    
+    def __iter__(self):
+        return self.iter_inorder()
+    
+    def __reversed__(self):
+        for node in self._iter_nodes_reversed():
+            yield node.key
+    
+    def inorder(self):
+        """Percurso in-order (esquerda, raiz, direita)"""
+        return list(self.iter_inorder())
+    
+    def preorder(self):
+        """Percurso pre-order (raiz, esquerda, direita)"""
+        return list(self.iter_preorder())
+    
+    def postorder(self):
+        """Percurso post-order (esquerda, direita, raiz)"""
+        return list(self.iter_postorder())
+    
+    def height(self):
+        """Calcula a altura da árvore (percurso em largura, sem recursão)"""
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
+    
+    def is_valid(self):
+        """Verifica ordem das chaves, heap de prioridades e tamanhos das subárvores"""
+        stack = [(self.root, None, None)] if self.root is not None else []
+        while stack:
+            node, lo, hi = stack.pop()
+            if (lo is not None and node.key <= lo) or (hi is not None and node.key >= hi):
+                return False
+            if node.size != 1 + _size(node.left) + _size(node.right):
+                return False
+            for child, child_lo, child_hi in ((node.left, lo, node.key),
+                                              (node.right, node.key, hi)):
+                if child is not None:
+                    if child.priority > node.priority:
+                        return False
+                    stack.append((child, child_lo, child_hi))
+        return True
+    
+    def freeze(self, layout='auto'):
+        """Congela o conteúdo num índice imutável para leituras (ver static_index.py)"""
+        from static_index import FrozenIndex
+        return FrozenIndex.from_tree(self, layout)
+    
+    def reset_metrics(self):
+        """Reseta as métricas de comparações e rotações"""
+        self.comparisons = 0
+        self.rotations = 0
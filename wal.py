@@ -0,0 +1,354 @@
+"""
+Log de escrita antecipada (write-ahead log) para as árvores
+
+DurableTree envolve uma BST, AVL ou RBT e registra cada insert/remove num
+log somente de acréscimo antes de aplicá-lo em memória. Os registros são
+acumulados e gravados em grupo (um write e, conforme a política, um fsync
+por lote). Na abertura, o estado é recuperado do snapshot mais recente
+(snapshot.py) mais a reexecução dos logs posteriores a ele.
+
+Arquivos no diretório, por geração G:
+
+    snapshot-G.snap   estado completo no início da geração G (G > 0)
+    wal-G.log         mutações feitas durante a geração G
+
+A compactação abre a geração G + 1, grava o snapshot dela e só então apaga
+os arquivos anteriores; uma queda no meio do caminho deixa a geração antiga
+intacta e a recuperação reexecuta os dois logs.
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from avl import AVL
+
+LOG_MAGIC = b'TREEWAL1'
+LOG_HEADER = struct.Struct('=8sc7x')
+# Cada lote gravado: tamanho em bytes e CRC32 dos registros
+FRAME = struct.Struct('=II')
+
+OP_INSERT = b'I'
+OP_REMOVE = b'R'
+
+FSYNC_POLICIES = ('always', 'batch', 'interval', 'never')
+
+# Mutações da árvore que o log (só chaves) não registra; o wrapper as recusa
+_UNLOGGED_MUTATORS = frozenset({
+    'put', 'pop', 'union', 'intersection', 'difference', 'split', 'join',
+    '_load_sorted', '_insert_node', '_remove_node',
+})
+
+_FILE_PATTERN = re.compile(r'^(snapshot|wal)-(\d+)\.(snap|log)$')
+
+def _fsync_directory(directory):
+    """Garante que criações/renomeações no diretório cheguem ao disco (POSIX)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def read_log(path, typecode):
+    """Lê os registros íntegros de um log.
+    
+    Retorna (registros, bytes válidos). Um lote final truncado ou com CRC
+    inválido (escrita interrompida por queda) marca o fim do log.
+    """
+    record = struct.Struct('=c' + typecode)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < LOG_HEADER.size:
+        return [], 0
+    magic, stored_typecode = LOG_HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC:
+        raise ValueError(f"{path} não é um log de árvore")
+    if stored_typecode.decode() != typecode:
+        raise ValueError(f"{path} usa chaves '{stored_typecode.decode()}', "
+                         f"esperado '{typecode}'")
+    
+    records = []
+    offset = LOG_HEADER.size
+    while offset + FRAME.size <= len(data):
+        length, crc = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc or length % record.size:
+            break
+        records.extend(record.iter_unpack(payload))
+        offset = start + length
+    return records, offset
+
+class DurableTree:
+    """Árvore com persistência incremental por log e snapshots.
+    
+    fsync controla quando os lotes chegam ao disco:
+        'always'    cada operação é gravada e sincronizada antes de retornar
+        'batch'     um fsync por lote de batch_size operações
+        'interval'  no máximo um fsync a cada sync_interval segundos
+        'never'     gravação delegada ao sistema operacional
+    Fora de 'always', as operações ainda no buffer (até batch_size) se
+    perdem numa queda; sync() força a gravação.
+    
+    Mutações devem passar por este objeto; leituras não listadas aqui são
+    repassadas à árvore (range, rank, iteração...). As mutações do modo mapa
+    e da álgebra de conjuntos (put, pop, union...) não cabem no log e são
+    recusadas com AttributeError.
+    """
+    
+    def __init__(self, directory, tree_class=AVL, key_type='q', fsync='batch',
+                 batch_size=1024, sync_interval=1.0, compact_bytes=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"política de fsync inválida: {fsync!r}")
+        if key_type not in ('q', 'd'):
+            raise ValueError("key_type deve ser 'q' (int64) ou 'd' (float)")
+        self.directory = directory
+        self.tree_class = tree_class
+        self.typecode = key_type
+        self.fsync = fsync
+        self.batch_size = 1 if fsync == 'always' else batch_size
+        self.sync_interval = sync_interval
+        # Tamanho do log que dispara uma compactação em segundo plano
+        self.compact_bytes = compact_bytes
+        self._record = struct.Struct('=c' + key_type)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._compaction = None
+        self._log = None
+        self.records_replayed = 0
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+    
+
+    def _path(self, kind, generation):
+        extension = 'snap' if kind == 'snapshot' else 'log'
+        return os.path.join(self.directory, f"{kind}-{generation}.{extension}")
+    
+    def _scan(self):
+        """Gerações com snapshot e com log presentes no diretório"""
+        snapshots, logs = [], []
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match:
+                (snapshots if match.group(1) == 'snapshot' else logs).append(int(match.group(2)))
+        return sorted(snapshots), sorted(logs)
+    
+    def _recover(self):
+        """Snapshot mais recente + reexecução dos logs da mesma geração em diante"""
+        snapshots, logs = self._scan()
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            self.tree = self.tree_class.load(self._path('snapshot', base))
+        else:
+            self.tree = self.tree_class()
+        
+        tree = self.tree
+        for generation in logs:
+            if generation < base:
+                continue
+            path = self._path('wal', generation)
+            records, valid_bytes = read_log(path, self.typecode)
+            for op, key in records:
+                if op == OP_INSERT:
+                    tree.insert(key)
+                else:
+                    tree.remove(key)
+            self.records_replayed += len(records)
+            if valid_bytes < os.path.getsize(path):
+                # Descarta o lote incompleto do fim (ou o cabeçalho incompleto,
+                # com valid_bytes 0) antes de voltar a acrescentar
+                os.truncate(path, valid_bytes)
+        
+        self.generation = max([base] + logs)
+        self._open_log(self.generation)
+        self._remove_older_than(base)
+    
+    def _open_log(self, generation):
+        path = self._path('wal', generation)
+        log = open(path, 'ab')
+        if log.tell() < LOG_HEADER.size:
+            # Arquivo novo ou cabeçalho cortado por uma queda: regrava do zero
+            log.truncate(0)
+            log.write(LOG_HEADER.pack(LOG_MAGIC, self.typecode.encode()))
+            log.flush()
+            if self.fsync != 'never':
+                os.fsync(log.fileno())
+                _fsync_directory(self.directory)
+        self._log = log
+    
+    def _remove_older_than(self, generation):
+        snapshots, logs = self._scan()
+        for old in snapshots:
+            if old < generation:
+                os.remove(self._path('snapshot', old))
+        for old in logs:
+            if old < generation:
+                os.remove(self._path('wal', old))
+    
+
+    def _append(self, op, key):
+        """Acumula o registro no buffer; a gravação vem depois, em _after_append"""
+        try:
+            self._buffer += self._record.pack(op, key)
+        except struct.error:
+            raise TypeError(f"chave {key!r} não cabe no log (tipo '{self.typecode}')") from None
+        self._pending += 1
+    
+    def _after_append(self):
+        """Grava o lote cheio e, se o log cresceu demais, compacta.
+        
+        Chamado só depois de a mutação estar aplicada na árvore: a
+        compactação copia a árvore e apaga o log antigo, então a chave
+        registrada precisa já estar na cópia.
+        """
+        if self._pending >= self.batch_size:
+            self._flush()
+            if (self.compact_bytes is not None and self._log.tell() >= self.compact_bytes
+                    and (self._compaction is None or not self._compaction.is_alive())):
+                self.compact(background=True)
+    
+    def insert(self, key):
+        """Registra e aplica uma inserção"""
+        self._append(OP_INSERT, key)
+        self.tree.insert(key)
+        self._after_append()
+    
+    def remove(self, key):
+        """Registra e aplica uma remoção"""
+        self._append(OP_REMOVE, key)
+        self.tree.remove(key)
+        self._after_append()
+    
+    def _append_many(self, op, keys):
+        """Acumula os registros de um lote; nenhum entra se alguma chave não couber"""
+        pack = self._record.pack
+        records = bytearray()
+        for key in keys:
+            try:
+                records += pack(op, key)
+            except struct.error:
+                raise TypeError(f"chave {key!r} não cabe no log (tipo '{self.typecode}')") from None
+        self._buffer += records
+        self._pending += len(keys)
+    
+    def insert_many(self, keys):
+        """Registra e aplica um lote; retorna quantas chaves eram novas"""
+        keys = list(keys)
+        self._append_many(OP_INSERT, keys)
+        inserted = self.tree.insert_many(keys)
+        self._after_append()
+        return inserted
+    
+    def remove_many(self, keys):
+        """Registra e aplica um lote de remoções; retorna quantas chaves existiam"""
+        keys = list(keys)
+        self._append_many(OP_REMOVE, keys)
+        removed = self.tree.remove_many(keys)
+        self._after_append()
+        return removed
+    
+    def _flush(self, force_sync=False):
+        """Grava o lote pendente como um quadro (tamanho, CRC) e aplica a política de fsync"""
+        with self._lock:
+            if self._buffer:
+                payload = bytes(self._buffer)
+                self._log.write(FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+                self._log.flush()
+                self._buffer.clear()
+                self._pending = 0
+                if self.fsync in ('always', 'batch') or force_sync:
+                    os.fsync(self._log.fileno())
+                    self._last_sync = time.monotonic()
+                elif self.fsync == 'interval':
+                    now = time.monotonic()
+                    if now - self._last_sync >= self.sync_interval:
+                        os.fsync(self._log.fileno())
+                        self._last_sync = now
+            elif force_sync:
+                os.fsync(self._log.fileno())
+    
+    def sync(self):
+        """Grava e sincroniza tudo que está no buffer"""
+        self._flush(force_sync=True)
+    
+
+    def compact(self, background=False):
+        """Dobra o log num snapshot novo.
+        
+        A troca de geração e a cópia das chaves (O(n)) ocorrem na chamada;
+        a montagem e gravação do snapshot podem rodar numa thread, enquanto
+        as mutações seguem para o log da nova geração.
+        """
+        self.wait_compaction()
+        self._flush(force_sync=True)
+        with self._lock:
+            old_log = self._log
+            self.generation += 1
+            generation = self.generation
+            self._open_log(generation)
+            old_log.close()
+            keys = list(self.tree)
+        
+        if background:
+            self._compaction = threading.Thread(target=self._write_snapshot,
+                                                args=(generation, keys))
+            self._compaction.start()
+        else:
+            self._write_snapshot(generation, keys)
+    
+    def _write_snapshot(self, generation, keys):
+        snapshot = self.tree_class.from_iterable(keys, assume_sorted=True)
+        snapshot.save(self._path('snapshot', generation))
+        _fsync_directory(self.directory)
+        self._remove_older_than(generation)
+    
+    def wait_compaction(self):
+        """Aguarda uma compactação em segundo plano em andamento"""
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+    
+    def close(self):
+        if self._log is None:
+            return
+        self.sync()
+        self.wait_compaction()
+        self._log.close()
+        self._log = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+
+    def search(self, key):
+        return self.tree.search(key)
+    
+    def __contains__(self, key):
+        return self.tree.search(key)
+    
+    def __len__(self):
+        return len(self.tree)
+    
+    def __iter__(self):
+        return iter(self.tree)
+    
+    def __getattr__(self, name):
+        if name == 'tree':
+            raise AttributeError(name)
+        if name in _UNLOGGED_MUTATORS:
+            # Repassar à árvore mudaria o estado sem registro no log
+            raise AttributeError(f"{name}() não é registrado no log; use insert/remove")
+        return getattr(self.tree, name)